@@ -43,6 +43,8 @@ export interface PlaceDetails {
   };
   photoUrl?: string | null;
   hashtags?: string[];
+  error?: string;
+  pending?: boolean;
 }
 
 export const getPlaceDetailsBatch = async (
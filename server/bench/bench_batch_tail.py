@@ -0,0 +1,128 @@
+"""장소 배치 조회의 꼬리 지연: hedged request와 deadlineMs 적용 전후 비교.
+
+fake_places 대역이 일부 호출(기본 3%)을 아주 느리게 응답하게 두고, 처음 보는 이름 20개짜리 배치를
+모드별로 흘려 배치 응답 시간 분위수와 업스트림 호출 수를 본다. deadline 모드는 pending으로 남은 이름을
+곧바로 다시 요청해(후속 호출) 나머지를 받는 데 걸린 시간도 잰다.
+
+    cd server && python bench/bench_batch_tail.py
+    cd server && python bench/bench_batch_tail.py --slow-rate 0.05 --deadline-ms 300
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fake_places import FakePlacesConfig, FakePlacesServer  # noqa: E402
+
+
+def percentile(sorted_samples: list[float], pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, round(pct / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def reset_state(main):
+    main.place_details_cache = main.TTLCache(
+        "place_details",
+        max_entries=main.PLACE_CACHE_MAX_ENTRIES,
+        max_bytes=main.PLACE_CACHE_MAX_BYTES,
+        ttl_sec=main.PLACE_CACHE_TTL_SEC,
+        negative_ttl_sec=main.PLACE_CACHE_NEGATIVE_TTL_SEC,
+    )
+    for key in main.places_hedge_counters:
+        main.places_hedge_counters[key] = 0
+
+
+async def run_mode(main, http, server, label: str, batches: int, batch_size: int, deadline_ms: int | None) -> dict:
+    latencies = []
+    followups = []
+    pending_names = 0
+    calls_before = server.calls["total"]
+    for batch in range(batches):
+        names = [f"{label} landmark {batch}-{idx}" for idx in range(batch_size)]
+        payload = {"destination": "Helsinki", "placeNames": names}
+        if deadline_ms is not None:
+            payload["deadlineMs"] = deadline_ms
+        start = time.perf_counter()
+        body = (await http.post("/api/get-place-details-batch", json=payload)).json()
+        latencies.append((time.perf_counter() - start) * 1e3)
+        if body["pending"]:
+            pending_names += len(body["pending"])
+            start = time.perf_counter()
+            follow = (await http.post("/api/get-place-details-batch", json={"destination": "Helsinki", "placeNames": body["pending"]})).json()
+            followups.append((time.perf_counter() - start) * 1e3)
+            assert not follow["pending"]
+    latencies.sort()
+    return {
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "max": latencies[-1],
+        "calls": server.calls["total"] - calls_before,
+        "hedged": main.places_hedge_counters["hedged"],
+        "pending": pending_names,
+        "followup": max(followups) if followups else 0.0,
+    }
+
+
+async def run(main, server, args):
+    import httpx
+
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as http:
+            # hedge 기준이 될 지연 표본을 먼저 쌓는다
+            main.PLACES_HEDGE_ENABLED = False
+            await run_mode(main, http, server, "warmup", 5, args.batch_size, None)
+
+            print(f"{'mode':<18}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'calls':>7}{'hedged':>8}{'pending':>9}{'follow-up ms':>14}")
+            modes = (
+                ("baseline", False, None),
+                ("hedged", True, None),
+                (f"hedged+{args.deadline_ms}ms", True, args.deadline_ms),
+            )
+            for label, hedge, deadline_ms in modes:
+                reset_state(main)
+                main.PLACES_HEDGE_ENABLED = hedge
+                row = await run_mode(main, http, server, label, args.batches, args.batch_size, deadline_ms)
+                print(f"{label:<18}{row['p50']:>9.0f}{row['p95']:>9.0f}{row['p99']:>9.0f}{row['max']:>9.0f}"
+                      f"{row['calls']:>7}{row['hedged']:>8}{row['pending']:>9}{row['followup']:>14.0f}")
+            stats = (await http.get("/api/cache/stats")).json()["placesHedging"]
+    print(f"\nsearchText latency window: p50 {stats['p50Ms']} ms, p95 {stats['p95Ms']} ms, p99 {stats['p99Ms']} ms")
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description="batch tail latency with hedging and deadlines")
+    parser.add_argument("--batches", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--slow-rate", type=float, default=0.03)
+    parser.add_argument("--slow-ms", type=float, default=1500.0)
+    parser.add_argument("--deadline-ms", type=int, default=400)
+    args = parser.parse_args()
+
+    config = FakePlacesConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 2, empty_rate=0.0,
+        slow_rate=args.slow_rate, slow_ms=args.slow_ms, seed=7,
+    )
+    server = FakePlacesServer(config, port=8767).start()
+    os.environ["PLACES_API_BASE_URL"] = server.base_url
+    os.environ.setdefault("GOOGLE_MAPS_API_KEY", "bench-key")
+    os.environ["PLACE_CACHE_DB_PATH"] = ""
+    os.environ["PLACES_QPS"] = "0"
+    # 배치 하나(20개)가 한꺼번에 나갈 수 있게 한다
+    os.environ.setdefault("PLACES_MAX_CONCURRENCY", "32")
+    try:
+        import main
+
+        asyncio.run(run(main, server, args))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,135 @@
+"""모델 응답 JSON 추출 마이크로 벤치마크.
+
+기존 _extract_json_object(json.loads → 코드펜스 정규식 → greedy 정규식)와
+현재 구현(_extract_json_object / _JsonStreamExtractor)을 큰 합성 응답에서 비교한다.
+
+    cd server && python bench/bench_extract_json.py
+"""
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main  # noqa: E402
+
+
+def legacy_extract_json_object(text: str):
+    text = (text or "").strip()
+    if not text:
+        raise ValueError("Empty response from model")
+
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+
+    match = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    if match:
+        block = match.group(1).strip()
+        try:
+            return json.loads(block)
+        except json.JSONDecodeError:
+            pass
+
+    obj_match = re.search(r"\{.*\}", text, re.DOTALL)
+    if obj_match:
+        return json.loads(obj_match.group(0))
+
+    raise ValueError("No parseable JSON object found in model response")
+
+
+def synthetic_plan(days: int, places_per_day: int = 8) -> dict:
+    return {
+        "title": "Synthetic {benchmark} trip",
+        "days": [
+            {
+                "dayNumber": day,
+                "places": [
+                    {
+                        "placeName": f"Place \"{day}-{idx}\" Museum of {{Things}}",
+                        "activityType": "meal" if idx % 3 == 0 else "sightseeing",
+                        "description": "A long description with commas, [brackets] and \\ escapes. " * 4,
+                        "durationMin": 90,
+                    }
+                    for idx in range(places_per_day)
+                ],
+            }
+            for day in range(1, days + 1)
+        ],
+    }
+
+
+def make_cases() -> dict[str, str]:
+    cases = {}
+    for days in (7, 30):
+        body = json.dumps(synthetic_plan(days), ensure_ascii=False, indent=2)
+        cases[f"clean/{days}d"] = body
+        cases[f"fenced/{days}d"] = f"Here is your itinerary:\n```json\n{body}\n```\nHave a great trip!"
+        # 코드펜스 없이 앞뒤 설명문에 중괄호가 섞인 웹 검색 응답 형태
+        prose = "Based on my search {see sources}, the places below are open in 2026. " * 20
+        cases[f"prose/{days}d"] = f"{prose}\n{body}\nNotes: prices may vary {{approx}}. " + prose
+    return cases
+
+
+def bench(fn, text: str, number: int) -> float:
+    return min(timeit.repeat(lambda: fn(text), number=number, repeat=5)) / number * 1e6
+
+
+def stream_new(text: str, chunk_size: int = 64):
+    extractor = main._JsonStreamExtractor()
+    days = []
+    for i in range(0, len(text), chunk_size):
+        days.extend(extractor.feed(text[i:i + chunk_size]))
+    return extractor.result(), days
+
+
+def stream_legacy(text: str, chunk_size: int = 64):
+    # 스트리밍 중 완성된 일자를 알려면 기존 함수로는 청크마다 전체를 다시 파싱해 보는 수밖에 없다
+    buffer = ""
+    result = None
+    for i in range(0, len(text), chunk_size):
+        buffer += text[i:i + chunk_size]
+        try:
+            result = legacy_extract_json_object(buffer)
+        except ValueError:
+            pass
+    return result
+
+
+def main_bench():
+    cases = make_cases()
+    print(f"{'case':<14}{'bytes':>9}{'legacy µs':>12}{'new µs':>10}{'speedup':>9}")
+    for name, text in cases.items():
+        try:
+            legacy_result = legacy_extract_json_object(text)
+        except ValueError:
+            legacy_result = None
+        new_result = main._extract_json_object(text)
+        streamed_result, streamed_days = stream_new(text)
+        assert streamed_result == new_result
+        assert streamed_days == new_result["days"]
+        if legacy_result is not None:
+            assert legacy_result == new_result
+
+        number = 200 if "7d" in name else 50
+        new_us = bench(main._extract_json_object, text, number)
+        if legacy_result is None:
+            print(f"{name:<14}{len(text):>9}{'fails':>12}{new_us:>10.1f}{'-':>9}")
+            continue
+        legacy_us = bench(legacy_extract_json_object, text, number)
+        print(f"{name:<14}{len(text):>9}{legacy_us:>12.1f}{new_us:>10.1f}{legacy_us / new_us:>8.1f}x")
+
+    print()
+    print(f"{'stream (64B chunks)':<22}{'legacy ms':>12}{'new ms':>10}{'speedup':>9}")
+    for name in ("fenced/7d", "fenced/30d"):
+        text = cases[name]
+        legacy_ms = min(timeit.repeat(lambda: stream_legacy(text), number=1, repeat=3)) * 1e3
+        new_ms = min(timeit.repeat(lambda: stream_new(text), number=1, repeat=3)) * 1e3
+        print(f"{name:<22}{legacy_ms:>12.2f}{new_ms:>10.2f}{legacy_ms / new_ms:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main_bench()
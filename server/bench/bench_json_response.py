@@ -0,0 +1,75 @@
+"""API 응답 직렬화 비교: FastAPI 기본 경로 vs _json_response.
+
+기본 경로는 엔드포인트가 dict를 돌려줄 때 FastAPI가 하는 일(jsonable_encoder → JSONResponse.render의 json.dumps)을
+그대로 재현한다. 60곳짜리 장소 배치 응답과 7일/14일 일정으로 요청당 CPU 시간과 전송 바이트를 비교한다.
+
+    cd server && python bench/bench_json_response.py
+"""
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+
+import main  # noqa: E402
+from fake_genai import build_plan  # noqa: E402
+from fake_places import DEFAULT_CENTER, _candidate  # noqa: E402
+
+
+def make_request(accept_encoding: str) -> Request:
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    return Request({"type": "http", "method": "POST", "path": "/", "headers": headers})
+
+
+def batch_response(count: int) -> dict:
+    results = {}
+    for idx in range(count):
+        name = f"Helsinki Place Number {idx}"
+        details = main._to_place_response(_candidate(name, 0, DEFAULT_CENTER))
+        # 실제 photoUrl 길이(사진 참조 + 쿼리 문자열)에 맞춘다
+        details["photoUrl"] = (
+            f"https://places.googleapis.com/v1/places/ChIJ{idx:020d}/photos/"
+            f"{'AXCi2Q' * 60}/media?maxHeightPx=400&maxWidthPx=400&key={'k' * 39}"
+        )
+        results[name] = details
+    return {"results": results}
+
+
+def normalized_plan(days: int) -> dict:
+    return main._normalize_plan_schema(build_plan("Helsinki", days, 8), days, "Helsinki", "relaxed")
+
+
+def legacy_render(data) -> bytes:
+    return JSONResponse(jsonable_encoder(data)).body
+
+
+def per_call_us(fn, number: int = 300) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main_bench():
+    payloads = {
+        "batch 60 places": batch_response(60),
+        "plan 7 days": normalized_plan(7),
+        "plan 14 days": normalized_plan(14),
+    }
+    print(f"{'payload':<18}{'encoding':<10}{'legacy µs':>11}{'new µs':>9}{'legacy bytes':>14}{'new bytes':>11}")
+    for name, data in payloads.items():
+        legacy_body = legacy_render(data)
+        assert json.loads(main._json_response(data, make_request("")).body) == json.loads(legacy_body)
+        legacy_us = per_call_us(lambda: legacy_render(data))
+        for accept_encoding in ("", "gzip", "gzip, br"):
+            request = make_request(accept_encoding)
+            response = main._json_response(data, request)
+            new_us = per_call_us(lambda: main._json_response(data, request))
+            encoding = response.headers.get("content-encoding", "identity")
+            print(f"{name:<18}{encoding:<10}{legacy_us:>11.1f}{new_us:>9.1f}{len(legacy_body):>14}{len(response.body):>11}")
+
+
+if __name__ == "__main__":
+    main_bench()
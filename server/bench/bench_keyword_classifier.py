@@ -0,0 +1,200 @@
+"""키워드 분류기 동등성 검사 + 벤치마크.
+
+기존 호출부들(_normalize_activity_type, _is_repeatable_hub, 숙소/항공 제외 필터, 해시태그 규칙)의
+`any(k in text ...)` 구현과 _keyword_classifier 기반 구현의 결과가 같은지 무작위 텍스트로 확인하고,
+수천 개 장소에 대한 처리 시간을 비교한다. 제외 필터와 허브 판정은 목록 하나짜리라 분류기보다 `any()`가 빨라서
+그대로 두었다 (두 행은 같은 구현끼리의 비교다).
+
+    cd server && python bench/bench_keyword_classifier.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main  # noqa: E402
+
+
+LEGACY_HUB_KEYWORDS = list(main._REPEATABLE_HUB_KEYWORDS)
+
+
+def legacy_normalize_activity_type(value: str) -> str:
+    lowered = (value or "").strip().lower()
+    if lowered in {"meal", "sightseeing", "activity"}:
+        return lowered
+    if any(k in lowered for k in ["식당", "맛집", "meal", "restaurant", "cafe", "카페"]):
+        return "meal"
+    if any(k in lowered for k in ["체험", "activity", "액티비티"]):
+        return "activity"
+    return "sightseeing"
+
+
+def legacy_is_repeatable_hub(place_name: str, description: str) -> bool:
+    text = f"{place_name} {description}".lower()
+    return any(keyword in text for keyword in LEGACY_HUB_KEYWORDS)
+
+
+def legacy_is_excluded(place_name: str, description: str) -> bool:
+    text = f"{place_name} {description}".lower()
+    return any(k in text for k in ["hotel", "hostel", "accommodation", "숙소", "flight", "airport", "항공"])
+
+
+def legacy_hashtags(meta: dict) -> list[str]:
+    def _hashtags_from_place(meta: dict) -> list[str]:
+        text = " ".join([
+            ((meta.get("displayName") or {}).get("text") or ""),
+            (meta.get("formattedAddress") or ""),
+            ((meta.get("editorialSummary") or {}).get("text") or ""),
+            " ".join(meta.get("types") or []),
+            str(meta.get("primaryType") or ""),
+            str(((meta.get("primaryTypeDisplayName") or {}).get("text") or "")),
+        ]).lower()
+
+        tag_rules = [
+            ("#ScenicSpot", ["viewpoint", "observation", "waterfront", "sunset", "panorama", "scenic"]),
+            ("#LocalFavorite", ["local", "popular", "authentic", "hidden"]),
+            ("#PhotoSpot", ["photo", "instagram", "iconic", "landmark"]),
+            ("#CozyCafe", ["cafe", "coffee", "bakery", "dessert"]),
+            ("#VibeRestaurant", ["restaurant", "bistro", "dining", "brasserie", "izakaya", "bbq"]),
+            ("#StreetFood", ["street_food", "food_court", "market"]),
+            ("#CultureTrip", ["museum", "gallery", "historic", "church", "cathedral", "monument"]),
+            ("#NatureWalk", ["park", "garden", "forest", "beach", "lake"]),
+            ("#ShoppingTime", ["shopping", "mall", "market", "plaza"]),
+            ("#NightOut", ["bar", "pub", "club", "night"]),
+        ]
+
+        tags = []
+        for tag, keywords in tag_rules:
+            if any(keyword in text for keyword in keywords):
+                tags.append(tag)
+            if len(tags) >= 3:
+                break
+
+        if not tags:
+            tags = ["#MustVisit"]
+        return tags[:3]
+
+    return _hashtags_from_place(meta)
+
+
+def new_is_excluded(place_name: str, description: str) -> bool:
+    return main._is_excluded_place(place_name, description)
+
+
+ALL_KEYWORDS = sorted({
+    *main._MEAL_KEYWORDS,
+    *main._ACTIVITY_KEYWORDS,
+    *main._EXCLUDED_PLACE_KEYWORDS,
+    *main._REPEATABLE_HUB_KEYWORDS,
+    *(k for _, keywords in main._HASHTAG_RULES for k in keywords),
+})
+FILLER = (
+    "the old national gallery of contemporary art near the harbour with views over the bay "
+    "serving traditional finnish food and local seasonal dishes in a cozy setting 헬싱키 전통 시장 "
+    "reindeer sauna design district island fortress tram ride architecture chapel"
+).split()
+
+
+def random_text(rng: random.Random, words: int, keyword_rate: float = 0.12) -> str:
+    parts = []
+    for _ in range(words):
+        roll = rng.random()
+        if roll < keyword_rate:
+            parts.append(rng.choice(ALL_KEYWORDS))
+        elif roll < keyword_rate * 4 / 3:
+            # 단어 경계에 걸친 부분 문자열 매칭(e.g. "airport"의 "port")까지 검사
+            parts.append(rng.choice(ALL_KEYWORDS)[1:] + rng.choice(ALL_KEYWORDS)[:3])
+        else:
+            parts.append(rng.choice(FILLER))
+    text = " ".join(parts)
+    return text.title() if rng.random() < 0.5 else text
+
+
+def random_meta(rng: random.Random, keyword_rate: float) -> dict:
+    return {
+        "displayName": {"text": random_text(rng, 3, keyword_rate)},
+        "formattedAddress": random_text(rng, 6, keyword_rate),
+        "editorialSummary": {"text": random_text(rng, 14, keyword_rate)},
+        "types": rng.sample(["museum", "restaurant", "park", "cafe", "tourist_attraction", "point_of_interest",
+                             "establishment", "food", "bar", "church", "store", "lodging"], 3),
+        "primaryType": rng.choice(["museum", "restaurant", "cafe", "park", "bar", None]),
+        "primaryTypeDisplayName": {"text": rng.choice(["Museum", "Restaurant", "Cafe", "Park", "Bar"])},
+    }
+
+
+def make_places(count: int, seed: int, keyword_rate: float = 0.12) -> list[dict]:
+    rng = random.Random(seed)
+    return [
+        {
+            "placeName": random_text(rng, rng.randint(2, 5), keyword_rate),
+            "description": random_text(rng, rng.randint(8, 24), keyword_rate),
+            "activityType": rng.choice(["meal", "sightseeing", "activity", "", random_text(rng, 2, keyword_rate)]),
+            "meta": random_meta(rng, keyword_rate),
+        }
+        for _ in range(count)
+    ]
+
+
+def check_equivalence(places: list[dict]):
+    for place in places:
+        name, description = place["placeName"], place["description"]
+        assert main._normalize_activity_type(place["activityType"]) == legacy_normalize_activity_type(place["activityType"]), place
+        assert main._is_repeatable_hub(name, description) == legacy_is_repeatable_hub(name, description), place
+        assert new_is_excluded(name, description) == legacy_is_excluded(name, description), place
+        assert main._hashtags_from_place(place["meta"]) == legacy_hashtags(place["meta"]), place
+
+
+def run_pipeline(places, normalize_activity_type, is_excluded, is_repeatable_hub, hashtags):
+    # 실제 흐름과 같이 장소마다 정규화(활동 유형, 제외 필터) → 중복 제거(허브 판정) → 해시태그를 거친다
+    for place in places:
+        normalize_activity_type(place["activityType"])
+        if is_excluded(place["placeName"], place["description"]):
+            continue
+        is_repeatable_hub(place["placeName"].strip(), place["description"].strip())
+        hashtags(place["meta"])
+
+
+def timed(fn, repeat: int = 7) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        main._keyword_classifier.classify.cache_clear()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main_bench():
+    # 동등성은 키워드가 빽빽하고 단어 경계에 걸친 매치가 많은 텍스트로 검사한다
+    check_equivalence(make_places(20000, seed=7, keyword_rate=0.12))
+    print("equivalence: 20000 random places OK")
+
+    for keyword_rate in (0.03, 0.12):
+        places = make_places(5000, seed=11, keyword_rate=keyword_rate)
+        print(f"\n{len(places)} places, keyword rate {keyword_rate:.0%}")
+        print(f"{'call site':<22}{'legacy ms':>11}{'new ms':>9}{'speedup':>9}")
+        rows = [
+            ("activity type", lambda: [legacy_normalize_activity_type(p["activityType"]) for p in places],
+             lambda: [main._normalize_activity_type(p["activityType"]) for p in places]),
+            ("excluded filter", lambda: [legacy_is_excluded(p["placeName"], p["description"]) for p in places],
+             lambda: [new_is_excluded(p["placeName"], p["description"]) for p in places]),
+            ("repeatable hub", lambda: [legacy_is_repeatable_hub(p["placeName"], p["description"]) for p in places],
+             lambda: [main._is_repeatable_hub(p["placeName"], p["description"]) for p in places]),
+            ("hashtags", lambda: [legacy_hashtags(p["meta"]) for p in places],
+             lambda: [main._hashtags_from_place(p["meta"]) for p in places]),
+            ("normalize pipeline",
+             lambda: run_pipeline(places, legacy_normalize_activity_type, legacy_is_excluded,
+                                  legacy_is_repeatable_hub, legacy_hashtags),
+             lambda: run_pipeline(places, main._normalize_activity_type, new_is_excluded,
+                                  main._is_repeatable_hub, main._hashtags_from_place)),
+        ]
+        for name, legacy_fn, new_fn in rows:
+            legacy = timed(legacy_fn)
+            new = timed(new_fn)
+            print(f"{name:<22}{legacy * 1e3:>11.1f}{new * 1e3:>9.1f}{legacy / new:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main_bench()
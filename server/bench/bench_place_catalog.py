@@ -0,0 +1,158 @@
+"""목적지 장소 카탈로그(trigram 유사도 매칭) 효과와 오매칭 검사.
+
+fake_places 대역의 시드 목록(유명 장소/식당 40곳)을 모델이 흔히 만드는 여러 표기(대소문자, 구두점, 오타,
+앞뒤 수식어)로 섞고 처음 보는 장소도 일부 넣어, 카탈로그를 켠 경우와 끈 경우의 이름당 searchText 호출 수를
+비교한다. 카탈로그가 다른 장소로 답한 경우(오매칭)도 센다. 마지막으로 매칭 한 번의 비용을 잰다.
+
+    cd server && python bench/bench_place_catalog.py
+    cd server && python bench/bench_place_catalog.py --min-similarity 0.85
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fake_places import SEED_LANDMARKS, SEED_RESTAURANTS, FakePlacesConfig, FakePlacesServer  # noqa: E402
+
+# 시드 목록과 이름이 비슷하지만 다른 장소 (카탈로그가 이 이름들에 시드 장소로 답하면 오매칭)
+LOOKALIKES = [
+    "Design Museum Shop", "Helsinki Cathedral Crypt", "Old Market Hall Cafe", "Cafe Regatta Two",
+    "National Museum of Norway", "Restaurant Savoy Bar", "St. Paul's Church", "Market Square Sauna",
+]
+
+
+def typo(rng: random.Random, name: str) -> str:
+    idx = rng.randrange(1, len(name) - 1)
+    return name[:idx] + name[idx + 1:]
+
+
+def name_variant(rng: random.Random, name: str) -> str:
+    return rng.choice([
+        name,
+        name.lower(),
+        name.upper(),
+        name.replace("'", ""),
+        f"{name}!",
+        f"The {name}",
+        typo(rng, name),
+    ])
+
+
+def make_batches(rng: random.Random, batches: int, batch_size: int) -> list[list[tuple[str, str]]]:
+    """(요청 이름, 기대하는 장소 이름) 목록."""
+    seeds = SEED_LANDMARKS + SEED_RESTAURANTS
+    result = []
+    for batch in range(batches):
+        items = []
+        for idx in range(batch_size):
+            roll = rng.random()
+            if roll < 0.7:
+                seed = rng.choice(seeds)
+                items.append((name_variant(rng, seed), seed))
+            elif roll < 0.85:
+                lookalike = rng.choice(LOOKALIKES)
+                items.append((lookalike, lookalike))
+            else:
+                novel = f"Neighbourhood Spot {batch}-{idx}"
+                items.append((novel, novel))
+        result.append(items)
+    return result
+
+
+def reset_state(main, catalog: bool):
+    main.place_details_cache = main.TTLCache(
+        "place_details",
+        max_entries=main.PLACE_CACHE_MAX_ENTRIES,
+        max_bytes=main.PLACE_CACHE_MAX_BYTES,
+        ttl_sec=main.PLACE_CACHE_TTL_SEC,
+        negative_ttl_sec=main.PLACE_CACHE_NEGATIVE_TTL_SEC,
+    )
+    main.place_catalog = main.PlaceCatalogStore(
+        main.PLACE_CATALOG_MAX_DESTINATIONS, main.PLACE_CATALOG_MAX_ENTRIES, main.PLACE_CATALOG_TTL_SEC,
+        main.PLACE_CATALOG_MIN_SIMILARITY,
+    )
+    main.PLACE_CATALOG_ENABLED = catalog
+
+
+async def run_mode(main, http, server, batches, catalog: bool) -> dict:
+    reset_state(main, catalog)
+    calls_before = server.calls["total"]
+    requested = wrong = 0
+    for batch in batches:
+        names = [name for name, _ in batch]
+        body = (await http.post("/api/get-place-details-batch", json={"destination": "Helsinki", "placeNames": names})).json()
+        for name, expected in batch:
+            result = body["results"].get(name.strip()) or {}
+            requested += 1
+            if not result.get("found"):
+                continue
+            got = main._canonical_place_key(result.get("canonicalName") or "")
+            # 카탈로그를 거치지 않은 조회는 대역이 요청 이름 그대로 답하므로 그것도 정답으로 친다
+            if got not in {main._canonical_place_key(expected), main._canonical_place_key(name)}:
+                wrong += 1
+        # 시드 쿼리는 백그라운드로 돈다
+        await asyncio.sleep(0.05)
+    stats = (await http.get("/api/cache/stats")).json()["placeLookup"]["catalog"]
+    return {
+        "calls": server.calls["total"] - calls_before,
+        "requested": requested,
+        "wrong": wrong,
+        "hits": stats["exactHits"] + stats["fuzzyHits"],
+        "fuzzy": stats["fuzzyHits"],
+    }
+
+
+async def run(main, server, args):
+    import httpx
+
+    rng = random.Random(11)
+    batches = make_batches(rng, args.batches, args.batch_size)
+    print(f"{'catalog':<10}{'calls':>7}{'calls/name':>12}{'hits':>7}{'fuzzy':>7}{'wrong':>7}")
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as http:
+            rows = {}
+            for label, catalog in (("off", False), ("on", True)):
+                rows[label] = row = await run_mode(main, http, server, batches, catalog)
+                print(f"{label:<10}{row['calls']:>7}{row['calls'] / row['requested']:>12.3f}"
+                      f"{row['hits']:>7}{row['fuzzy']:>7}{row['wrong']:>7}")
+    print(f"\nupstream calls saved: {1 - rows['on']['calls'] / rows['off']['calls']:.0%}")
+
+    catalog = main.PlaceCatalog()
+    for idx in range(main.PLACE_CATALOG_MAX_ENTRIES):
+        catalog.add(main._canonical_place_key(f"{rng.choice(SEED_LANDMARKS)} annex {idx}"), {}, main.PLACE_CATALOG_MAX_ENTRIES)
+    key = main._canonical_place_key("Temppeliaukio Chrch")
+    number = 2000
+    us = min(timeit.repeat(lambda: catalog.match(key, args.min_similarity), number=number, repeat=5)) / number * 1e6
+    print(f"fuzzy match against {len(catalog.places)} entries: {us:.1f} µs")
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description="destination place catalog benchmark")
+    parser.add_argument("--batches", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--min-similarity", type=float, default=None)
+    args = parser.parse_args()
+
+    server = FakePlacesServer(FakePlacesConfig(latency_ms=2, jitter_ms=1, empty_rate=0.0, seed=4), port=8768).start()
+    os.environ["PLACES_API_BASE_URL"] = server.base_url
+    os.environ.setdefault("GOOGLE_MAPS_API_KEY", "bench-key")
+    os.environ["PLACE_CACHE_DB_PATH"] = ""
+    os.environ["PLACES_QPS"] = "0"
+    if args.min_similarity is not None:
+        os.environ["PLACE_CATALOG_MIN_SIMILARITY"] = str(args.min_similarity)
+    try:
+        import main
+
+        args.min_similarity = main.PLACE_CATALOG_MIN_SIMILARITY
+        asyncio.run(run(main, server, args))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,119 @@
+"""장소 조회 miss 경로 비교: 표기 정규화 키 + 목적지별 fallback 학습 vs 기존 방식.
+
+기존 방식(strip().lower() 키, 빈 결과마다 `"이름, 목적지"` fallback)을 같은 프로세스에서 흉내 내고,
+표기가 제각각인 이름이 섞인 배치를 fake_places 대역에 흘려 찾아낸 장소당 searchText 호출 수를 비교한다.
+fallback이 거의 도움이 안 되는 목적지와 자주 도움이 되는 목적지를 나눠서 본다.
+
+    cd server && python bench/bench_place_lookup.py
+"""
+import asyncio
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fake_places import FakePlacesConfig, FakePlacesServer  # noqa: E402
+
+BASE_NAMES = [
+    "St. Peter's Church", "Old Market Hall", "Fisherman's Wharf", "King's Garden", "Design Museum",
+    "Uspenski Cathedral", "Temppeliaukio Church", "Cafe Regatta", "Kiasma Museum", "Harbour Sauna",
+]
+
+
+def name_variant(rng: random.Random, name: str) -> str:
+    # 모델/클라이언트가 같은 장소를 다르게 적는 흔한 경우들
+    variant = rng.choice([
+        name,
+        name.lower(),
+        name.upper(),
+        name.replace("'", ""),
+        name.replace("'", "’"),
+        name.replace(".", ""),
+        f"  {name}!",
+    ])
+    return variant
+
+
+def make_batches(rng: random.Random, batches: int, batch_size: int) -> list[list[str]]:
+    pool = [f"{base} {idx}" if idx else base for idx in range(30) for base in BASE_NAMES]
+    return [[name_variant(rng, rng.choice(pool)) for _ in range(batch_size)] for _ in range(batches)]
+
+
+def reset_state(main):
+    main.place_details_cache = main.TTLCache(
+        "place_details",
+        max_entries=main.PLACE_CACHE_MAX_ENTRIES,
+        max_bytes=main.PLACE_CACHE_MAX_BYTES,
+        ttl_sec=main.PLACE_CACHE_TTL_SEC,
+        negative_ttl_sec=main.PLACE_CACHE_NEGATIVE_TTL_SEC,
+    )
+    main.place_fallback_policy = main.FallbackQueryPolicy(
+        main.PLACE_FALLBACK_MIN_SAMPLES,
+        main.PLACE_FALLBACK_MIN_HIT_RATE,
+        main.PLACE_FALLBACK_PROBE_RATE,
+        main.PLACE_FALLBACK_DECAY,
+        main.PLACE_FALLBACK_MAX_DESTINATIONS,
+    )
+
+
+async def run_mode(main, http, batches: list[list[str]], server: FakePlacesServer, legacy: bool) -> dict:
+    canonical = main._canonical_place_key
+    reset_state(main)
+    if legacy:
+        main._canonical_place_key = lambda name: (name or "").strip().lower()
+        main.place_fallback_policy.should_try = lambda destination_key: True
+    calls_before = server.calls["total"]
+    requested = found = 0
+    try:
+        for batch in batches:
+            response = await http.post("/api/get-place-details-batch", json={"destination": "Helsinki", "placeNames": batch})
+            results = response.json()["results"]
+            requested += len(results)
+            found += sum(1 for result in results.values() if result.get("found"))
+    finally:
+        main._canonical_place_key = canonical
+    calls = server.calls["total"] - calls_before
+    return {"calls": calls, "requested": requested, "found": found}
+
+
+async def run(main, server: FakePlacesServer, config: FakePlacesConfig):
+    import httpx
+
+    rng = random.Random(5)
+    batches = make_batches(rng, batches=40, batch_size=20)
+    print(f"{'fallback helps':<16}{'mode':<8}{'calls':>7}{'found':>7}{'calls/found':>13}{'calls/name':>12}")
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as http:
+            for label, fallback_empty_rate in (("rarely (5%)", 0.95), ("often (80%)", 0.2)):
+                config.fallback_empty_rate = fallback_empty_rate
+                rows = {}
+                for mode in ("legacy", "new"):
+                    rows[mode] = await run_mode(main, http, batches, server, legacy=mode == "legacy")
+                    row = rows[mode]
+                    print(f"{label:<16}{mode:<8}{row['calls']:>7}{row['found']:>7}"
+                          f"{row['calls'] / max(1, row['found']):>13.3f}{row['calls'] / row['requested']:>12.3f}")
+                saved = 1 - rows["new"]["calls"] / rows["legacy"]["calls"]
+                print(f"{'':<16}{'saved':<8}{rows['legacy']['calls'] - rows['new']['calls']:>7}{'':>7}{saved:>12.0%}")
+
+
+def main_bench():
+    config = FakePlacesConfig(latency_ms=2, jitter_ms=1, empty_rate=0.3, seed=3)
+    server = FakePlacesServer(config, port=8766).start()
+    os.environ["PLACES_API_BASE_URL"] = server.base_url
+    os.environ.setdefault("GOOGLE_MAPS_API_KEY", "bench-key")
+    os.environ["PLACE_CACHE_DB_PATH"] = ""
+    os.environ["PLACES_QPS"] = "0"
+    # 이 벤치는 miss 경로만 본다 (카탈로그 효과는 bench_place_catalog.py)
+    os.environ["PLACE_CATALOG_ENABLED"] = "false"
+    try:
+        import main
+
+        asyncio.run(run(main, server, config))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main_bench()
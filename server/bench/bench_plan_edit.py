@@ -0,0 +1,111 @@
+"""부분 재생성(일자 재생성/장소 교체)과 전체 생성의 프롬프트/출력 크기 비교.
+
+fake_genai의 합성 일정을 현재 계획으로 두고 세 가지 프롬프트의 길이와 모델이 돌려줘야 하는 JSON 길이를
+잰다. 토큰 수는 문자 수 / 4로 어림한다. 출력 토큰 수가 생성 지연을 좌우하므로 출력 비율이 지연 비율에 가깝다.
+마지막으로 fake_genai를 붙인 두 엔드포인트를 실제로 호출해 중복 제거 규칙이 적용되는지 확인한다.
+
+    cd server && python bench/bench_plan_edit.py
+"""
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("GOOGLE_MAPS_API_KEY", "")
+os.environ["PLACE_CACHE_DB_PATH"] = ""
+
+import main  # noqa: E402
+from fake_genai import FakeGenaiClient, build_plan  # noqa: E402
+
+TRIP = {
+    "destination": "Helsinki",
+    "companions": "friends",
+    "style": "relaxed",
+    "transportation": "public transit",
+    "month": "May",
+}
+
+
+def approx_tokens(text: str) -> int:
+    return len(text) // 4
+
+
+def sizes(days: int) -> dict:
+    plan = main._normalize_plan_schema(build_plan("Helsinki", days, 8), days, "Helsinki", "relaxed")
+    full_prompt = main._build_plan_prompt(main.PlanRequest(days=days, **TRIP))
+    full_output = json.dumps(build_plan("Helsinki", days, 8), ensure_ascii=False)
+
+    # 마지막 일자를 바꾼다 (합성 일정은 앞 일자끼리 이름이 겹쳐 중복 제거로 장소가 줄어 있다)
+    day_index = days - 1
+    day_request = main.DayRegenerateRequest(plan=plan, dayNumber=days, **TRIP)
+    other_days = plan["days"][:day_index] + plan["days"][day_index + 1:]
+    day_prompt = main._build_day_regenerate_prompt(day_request, other_days, main._dominant_area(plan["days"][day_index]))
+    day_output = json.dumps({"places": plan["days"][day_index]["places"]}, ensure_ascii=False)
+
+    places = plan["days"][day_index]["places"]
+    place_request = main.PlaceReplaceRequest(plan=plan, dayNumber=days, placeIndex=3, **TRIP)
+    place_prompt = main._build_place_replace_prompt(place_request, places[3], places[2], places[4], plan["days"], None)
+    place_output = json.dumps(places[3], ensure_ascii=False)
+    return {
+        "full": (approx_tokens(full_prompt), approx_tokens(full_output)),
+        "day": (approx_tokens(day_prompt), approx_tokens(day_output)),
+        "place": (approx_tokens(place_prompt), approx_tokens(place_output)),
+    }
+
+
+async def check_endpoints():
+    import httpx
+
+    main.client = FakeGenaiClient(latency_ms=0, fenced=True)
+    plan = main._normalize_plan_schema(build_plan("Helsinki", 3), 3, "Helsinki", "relaxed")
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        response = await http.post("/api/plans/regenerate-day", json={
+            "plan": plan, "dayNumber": 2, "resolvePlaces": False, **TRIP,
+        })
+        assert response.status_code == 200, response.text
+        body = response.json()
+        other_keys = main._non_hub_place_keys([body["plan"]["days"][0], body["plan"]["days"][2]])
+        new_keys = main._non_hub_place_keys([body["day"]])
+        assert body["plan"]["days"][0] == plan["days"][0] and body["plan"]["days"][2] == plan["days"][2]
+        assert not other_keys & new_keys, other_keys & new_keys
+        assert body["changed"] is True
+        print(f"regenerate-day: {len(body['day']['places'])} places, none repeated from other days")
+
+        response = await http.post("/api/plans/replace-place", json={
+            "plan": plan, "dayNumber": 1, "placeIndex": 2, "resolvePlaces": False, **TRIP,
+        })
+        assert response.status_code == 200, response.text
+        body = response.json()
+        day = body["plan"]["days"][0]
+        assert day["places"][2]["placeName"] == body["place"]["placeName"] != plan["days"][0]["places"][2]["placeName"]
+        assert [place["placeName"] for idx, place in enumerate(day["places"]) if idx != 2] == \
+            [place["placeName"] for idx, place in enumerate(plan["days"][0]["places"]) if idx != 2]
+        print(f"replace-place: {plan['days'][0]['places'][2]['placeName']!r} -> {body['place']['placeName']!r}")
+
+        # 다른 일자에 이미 있는 장소를 제안하면 받아들이지 않고, 다시 물어도 겹치면 원래 장소를 둔다
+        duplicate = plan["days"][2]["places"][0]
+        main.client.aio.models._response_text = lambda contents: json.dumps(duplicate)
+        response = await http.post("/api/plans/replace-place", json={
+            "plan": plan, "dayNumber": 1, "placeIndex": 2, "resolvePlaces": False, **TRIP,
+        })
+        assert response.status_code == 200, response.text
+        assert response.json()["changed"] is False and response.json()["plan"] == plan
+        print(f"replace-place with {duplicate['placeName']!r} from day 3: kept the original place")
+
+
+def main_bench():
+    print(f"{'days':<6}{'request':<10}{'prompt tok':>12}{'output tok':>12}{'output vs full':>16}")
+    for days in (3, 7, 14):
+        rows = sizes(days)
+        full_output = rows["full"][1]
+        for label, (prompt_tokens, output_tokens) in rows.items():
+            print(f"{days:<6}{label:<10}{prompt_tokens:>12}{output_tokens:>12}{output_tokens / full_output:>16.0%}")
+    print()
+    asyncio.run(check_endpoints())
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,45 @@
+"""_normalize_plan_schema와 장소 후보 순위 매기기(_rank_candidates) 마이크로 벤치마크.
+
+fake_genai의 합성 일정과 fake_places의 합성 후보를 입력으로 일정/후보 하나당 처리 시간을 잰다.
+
+    cd server && python bench/bench_plan_normalize.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main  # noqa: E402
+from fake_genai import build_plan  # noqa: E402
+from fake_places import DEFAULT_CENTER, _candidate  # noqa: E402
+
+
+def per_call_us(fn, number: int) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main_bench():
+    print(f"{'normalize plan':<22}{'places':>8}{'µs/plan':>10}")
+    for days, places_per_day in ((3, 7), (7, 8), (14, 8)):
+        plan = build_plan("Helsinki", days, places_per_day)
+        normalized = main._normalize_plan_schema(plan_data=plan, requested_days=days, destination="Helsinki", style="relaxed")
+        assert len(normalized["days"]) == days
+        us = per_call_us(
+            lambda: main._normalize_plan_schema(plan_data=plan, requested_days=days, destination="Helsinki", style="relaxed"),
+            number=200,
+        )
+        print(f"{f'{days} days':<22}{days * places_per_day:>8}{us:>10.1f}")
+
+    print()
+    print(f"{'rank candidates':<22}{'cands':>8}{'µs/call':>10}")
+    for count in (1, 3, 10, 20):
+        candidates = [_candidate("Helsinki Cathedral", idx, DEFAULT_CENTER) for idx in range(count)]
+        ranked = main._rank_candidates(candidates, "Helsinki", DEFAULT_CENTER)
+        assert ranked[0][1] is candidates[0]
+        us = per_call_us(lambda: main._rank_candidates(candidates, "Helsinki", DEFAULT_CENTER), number=5000)
+        print(f"{'with center':<22}{count:>8}{us:>10.2f}")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,157 @@
+"""요청 로그 기반 캐시 프리워밍 효과: 콜드 시작 / 프리워밍 후 시작 / 프리워밍과 동시에 라이브 트래픽.
+
+목적지와 장소 인기도가 Zipf 분포를 따르는 지난 7일치 요청 로그를 만들어 두고, 같은 분포에서 뽑은 라이브 배치
+요청을 흘려 라이브 구간의 searchText 호출 수, 배치 응답 시간 분위수, 프리워밍 항목 적중률(coverage)을 비교한다.
+동시 모드는 프리워밍이 라이브 요청과 Places 호출을 다투지 않는지(라이브 지연이 콜드 시작보다 나빠지지 않는지) 본다.
+
+    cd server && python bench/bench_prewarm.py
+    cd server && python bench/bench_prewarm.py --sessions 300 --prewarm-qps 50
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fake_places import FakePlacesConfig, FakePlacesServer  # noqa: E402
+
+DESTINATIONS = [f"City {idx}" for idx in range(40)]
+PLACES_PER_DESTINATION = 80
+NAMES_PER_REQUEST = 15
+
+
+def zipf_weights(count: int, s: float) -> list[float]:
+    return [1 / (rank + 1) ** s for rank in range(count)]
+
+
+def sample_request(rng: random.Random) -> tuple[str, list[str]]:
+    destination = rng.choices(DESTINATIONS, weights=zipf_weights(len(DESTINATIONS), 1.1))[0]
+    place_weights = zipf_weights(PLACES_PER_DESTINATION, 0.9)
+    names = set()
+    while len(names) < NAMES_PER_REQUEST:
+        idx = rng.choices(range(PLACES_PER_DESTINATION), weights=place_weights)[0]
+        names.add(f"{destination} sight {idx}")
+    return destination, sorted(names)
+
+
+def write_log(path: str, rng: random.Random, requests: int):
+    now = time.time()
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(requests):
+            ts = now - rng.uniform(0, 7 * 86400)
+            destination, names = sample_request(rng)
+            f.write(json.dumps({"ts": ts, "kind": "plan", "destination": destination}) + "\n")
+            f.write(json.dumps({"ts": ts + 5, "kind": "places", "destination": destination, "placeNames": names}) + "\n")
+
+
+def percentile(sorted_samples: list[float], pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, round(pct / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def reset_state(main, log_path: str, prewarm_qps: float):
+    for name in ("place_details", "destination_center"):
+        setattr(main, f"{name}_cache", main.TTLCache(
+            name,
+            max_entries=main.PLACE_CACHE_MAX_ENTRIES,
+            max_bytes=main.PLACE_CACHE_MAX_BYTES,
+            ttl_sec=main.PLACE_CACHE_TTL_SEC,
+            negative_ttl_sec=main.PLACE_CACHE_NEGATIVE_TTL_SEC,
+        ))
+    main.cache_prewarmer = main.CachePrewarmer(log_path, prewarm_qps)
+
+
+async def live_traffic(http, sessions: list[tuple[str, list[str]]], concurrency: int) -> list[float]:
+    latencies = []
+    queue = asyncio.Queue()
+    for session in sessions:
+        queue.put_nowait(session)
+
+    async def worker():
+        while not queue.empty():
+            destination, names = queue.get_nowait()
+            start = time.perf_counter()
+            response = await http.post("/api/get-place-details-batch", json={"destination": destination, "placeNames": names})
+            assert response.status_code == 200, response.text
+            latencies.append((time.perf_counter() - start) * 1e3)
+
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return sorted(latencies)
+
+
+async def run_mode(main, server, sessions, args, log_path: str, mode: str) -> dict:
+    import httpx
+
+    reset_state(main, log_path if mode != "cold" else "", args.prewarm_qps)
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as http:
+            if mode == "prewarmed":
+                while main.cache_prewarmer.status in {"loading", "running"}:
+                    await asyncio.sleep(0.05)
+            calls_before = server.calls["total"]
+            latencies = await live_traffic(http, sessions, args.concurrency)
+            live_calls = server.calls["total"] - calls_before
+            stats = (await http.get("/api/cache/stats")).json()["prewarm"]
+    return {
+        "calls": live_calls,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "coverage": stats["coverage"]["place"]["rate"],
+        "filled": stats["filled"]["place"],
+        "deferred": stats["deferred"],
+        "status": stats["status"],
+    }
+
+
+async def run(main, server, args, log_path: str):
+    rng = random.Random(23)
+    sessions = [sample_request(rng) for _ in range(args.sessions)]
+    print(f"{'mode':<12}{'live calls':>12}{'p50 ms':>9}{'p95 ms':>9}{'coverage':>10}{'prewarmed':>11}{'deferred':>10}  prewarm")
+    for mode in ("cold", "prewarmed", "concurrent"):
+        row = await run_mode(main, server, sessions, args, log_path, mode)
+        print(f"{mode:<12}{row['calls']:>12}{row['p50']:>9.0f}{row['p95']:>9.0f}{row['coverage']:>10.1%}"
+              f"{row['filled']:>11}{row['deferred']:>10}  {row['status']}")
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description="cache prewarming from request logs")
+    parser.add_argument("--log-requests", type=int, default=3000)
+    parser.add_argument("--sessions", type=int, default=150)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=40.0)
+    parser.add_argument("--prewarm-qps", type=float, default=100.0)
+    parser.add_argument("--max-places", type=int, default=500)
+    args = parser.parse_args()
+
+    log_dir = tempfile.mkdtemp(prefix="triplo-prewarm-bench-")
+    log_path = os.path.join(log_dir, "requests.jsonl")
+    write_log(log_path, random.Random(5), args.log_requests)
+
+    config = FakePlacesConfig(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 2, empty_rate=0.0, seed=9)
+    server = FakePlacesServer(config, port=8769).start()
+    os.environ["PLACES_API_BASE_URL"] = server.base_url
+    os.environ.setdefault("GOOGLE_MAPS_API_KEY", "bench-key")
+    os.environ["PLACE_CACHE_DB_PATH"] = ""
+    os.environ["REQUEST_LOG_PATH"] = ""
+    os.environ["PREWARM_MAX_PLACES"] = str(args.max_places)
+    os.environ.setdefault("PLACES_QPS", "200")
+    # 카탈로그 시드/퍼지 적중이 섞이면 프리워밍 효과만 따로 볼 수 없다
+    os.environ["PLACE_CATALOG_ENABLED"] = "false"
+    try:
+        import main
+
+        asyncio.run(run(main, server, args, log_path))
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,79 @@
+"""하루 일정 경로 최적화(_optimize_day_route) 벤치마크.
+
+도시 반경 안의 무작위 좌표로 4~12곳짜리 하루 일정을 만들어 일정 하나당 처리 시간과
+원래 순서 대비 이동 거리 감소를 측정한다. 거리 행렬은 스칼라 _haversine_km와 비교해 검증한다.
+
+    cd server && python bench/bench_route_optimizer.py
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import main  # noqa: E402
+
+CENTER = (60.1699, 24.9384)
+
+
+def make_day(rng: random.Random, size: int) -> tuple[dict, dict]:
+    places = []
+    details = {}
+    for idx in range(size):
+        name = f"Place {idx}"
+        activity_type = "meal" if idx in (size // 2, size - 1) else "sightseeing"
+        places.append({"order": idx, "placeName": name, "activityType": activity_type, "durationMin": 60})
+        if rng.random() < 0.9:
+            details[name] = {
+                "found": True,
+                "location": {
+                    "latitude": CENTER[0] + rng.uniform(-0.05, 0.05),
+                    "longitude": CENTER[1] + rng.uniform(-0.1, 0.1),
+                },
+            }
+        else:
+            details[name] = {"found": False}
+    return {"dayNumber": 1, "places": places}, details
+
+
+def check_matrix(rng: random.Random):
+    lats = [CENTER[0] + rng.uniform(-1, 1) for _ in range(20)]
+    lngs = [CENTER[1] + rng.uniform(-1, 1) for _ in range(20)]
+    matrix = main._haversine_matrix_km(lats, lngs)
+    for i in range(20):
+        for j in range(20):
+            assert abs(matrix[i][j] - main._haversine_km(lats[i], lngs[i], lats[j], lngs[j])) < 1e-6
+
+
+def main_bench():
+    rng = random.Random(3)
+    check_matrix(rng)
+    print("distance matrix matches scalar haversine")
+    print(f"{'places':>7}{'mean ms':>10}{'p99 ms':>9}{'km saved':>10}")
+    for size in (4, 6, 8, 10, 12):
+        samples = []
+        saved = []
+        for _ in range(500):
+            day, details = make_day(rng, size)
+            start = time.perf_counter()
+            result = main._optimize_day_route(day, details)
+            samples.append((time.perf_counter() - start) * 1e3)
+            route = result["route"]
+            assert route["totalKm"] <= route["originalTotalKm"] + 1e-6
+            assert [p["order"] for p in result["places"]] == list(range(size))
+            assert sorted(p["placeName"] for p in result["places"]) == sorted(p["placeName"] for p in day["places"])
+            # 식사 장소는 제자리를 지킨다
+            for idx, place in enumerate(day["places"]):
+                if place["activityType"] == "meal":
+                    assert result["places"][idx]["placeName"] == place["placeName"]
+            if route["originalTotalKm"]:
+                saved.append(1 - route["totalKm"] / route["originalTotalKm"])
+        samples.sort()
+        mean_ms = sum(samples) / len(samples)
+        p99_ms = samples[int(len(samples) * 0.99) - 1]
+        print(f"{size:>7}{mean_ms:>10.3f}{p99_ms:>9.3f}{sum(saved) / len(saved):>9.0%}")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,110 @@
+"""콜드 스타트 예산 검사.
+
+새 프로세스에서 uvicorn으로 main:app을 띄워 첫 요청(GET /api/startup-timings)이 응답할 때까지의 시간을
+여러 번 재고, 중앙값이 예산을 넘으면 종료 코드 1로 끝난다. 서버가 보고한 단계별 시간과
+`python -X importtime` 기준으로 import 비용이 큰 모듈도 함께 출력한다.
+
+    cd server && python bench/cold_start.py --budget-ms 2500
+"""
+import argparse
+import os
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+_IMPORTTIME_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_env() -> dict:
+    env = dict(os.environ)
+    # 측정이 로컬 설정이나 영속 캐시 상태에 좌우되지 않게 한다
+    env.setdefault("GOOGLE_MAPS_API_KEY", "bench-key")
+    env["PLACE_CACHE_DB_PATH"] = ""
+    return env
+
+
+def time_to_first_response(timeout_sec: float = 30.0) -> tuple[float, dict]:
+    port = free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVER_DIR,
+        env=server_env(),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout_sec:
+            try:
+                response = httpx.get(f"http://127.0.0.1:{port}/api/startup-timings", timeout=1.0)
+                # 응답 코드와 무관하게 요청을 받기 시작한 시점을 잰다 (엔드포인트가 없는 이전 버전과도 비교 가능)
+                elapsed_ms = (time.perf_counter() - started) * 1e3
+                return elapsed_ms, response.json() if response.status_code == 200 else {}
+            except httpx.TransportError:
+                pass
+            time.sleep(0.005)
+        raise RuntimeError(f"server did not answer within {timeout_sec}s")
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def heaviest_imports(limit: int) -> list[tuple[str, float]]:
+    # main이 직접 import하는 모듈(들여쓰기 한 단계)의 누적 import 시간
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=SERVER_DIR,
+        env=server_env(),
+        capture_output=True,
+        text=True,
+    )
+    direct = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match and len(match.group(3)) == 3:
+            direct.append((match.group(4), int(match.group(2)) / 1e3))
+    return sorted(direct, key=lambda item: item[1], reverse=True)[:limit]
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description="cold start budget check")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("COLD_START_BUDGET_MS", "2500")))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = []
+    timings = {}
+    for _ in range(args.runs):
+        elapsed_ms, timings = time_to_first_response()
+        samples.append(elapsed_ms)
+
+    print("heaviest direct imports of main (cumulative ms):")
+    for module, ms in heaviest_imports(8):
+        print(f"  {module:<32}{ms:>8.1f}")
+    print("\nserver-reported startup timings (last run, ms):")
+    for key, value in timings.items():
+        print(f"  {key:<32}{value!s:>8}")
+
+    median_ms = statistics.median(samples)
+    print(f"\nprocess start -> first response: median {median_ms:.0f} ms, "
+          f"min {min(samples):.0f} ms, max {max(samples):.0f} ms ({args.runs} runs)")
+    if median_ms > args.budget_ms:
+        print(f"FAIL: over budget of {args.budget_ms:.0f} ms")
+        sys.exit(1)
+    print(f"OK: within budget of {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,107 @@
+"""google-genai 클라이언트 대역.
+
+main.client 자리에 꽂으면 `client.aio.models.generate_content(_stream)` 호출에
+프롬프트의 목적지/일수에 맞춘 합성 일정을 돌려준다. 일자 재생성/장소 교체 프롬프트에는 일자 하나나
+장소 하나만 돌려준다. 응답 지연과 스트리밍 청크 간격을 설정할 수 있다.
+
+    import fake_genai, main
+    main.client = fake_genai.FakeGenaiClient(latency_ms=1500)
+"""
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+_DESTINATION_RE = re.compile(r"- Destination: (.+)")
+_DAYS_RE = re.compile(r"- Duration: (\d+) days")
+_EDIT_DAY_RE = re.compile(r"^Create day (\d+) of an existing trip", re.M)
+_EDIT_PLACE_RE = re.compile(r"^Suggest one replacement for .* on day (\d+) of an existing trip", re.M)
+
+# 일자마다 섞어 쓰는 장소 이름 조각. 일부는 교통 허브/숙소라 정규화 경로(허브 허용, 숙소 제외)도 탄다.
+_PLACE_STEMS = [
+    ("Old Market Hall", "meal"), ("National Museum", "sightseeing"), ("Harbour Sauna", "activity"),
+    ("Design District Cafe", "meal"), ("Fortress Island", "sightseeing"), ("City Art Gallery", "sightseeing"),
+    ("Central Railway Station", "sightseeing"), ("Riverside Bistro", "meal"), ("Botanical Garden", "sightseeing"),
+    ("Kayak Tour", "activity"), ("Cathedral Square", "sightseeing"), ("Night Food Market", "meal"),
+    ("Grand Hotel", "sightseeing"),
+]
+
+
+class _FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+def build_plan(destination: str, days: int, places_per_day: int = 7, variant: int = 0) -> dict:
+    plan_days = []
+    for day in range(1, days + 1):
+        places = []
+        for idx in range(places_per_day):
+            stem, activity_type = _PLACE_STEMS[(day * 3 + idx + variant) % len(_PLACE_STEMS)]
+            places.append({
+                "placeName": f"{destination} {stem}" + ("" if day <= 2 else f" {day}"),
+                "activityType": activity_type,
+                "description": f"Day {day} pick matching the trip style near {stem.lower()}",
+                "durationMin": 60 + 15 * (idx % 4),
+            })
+        plan_days.append({"dayNumber": day, "places": places})
+    return {"title": f"{days}-day trip to {destination}", "days": plan_days}
+
+
+class _FakeModels:
+    def __init__(self, owner: "FakeGenaiClient"):
+        self._owner = owner
+
+    def _response_text(self, contents) -> str:
+        prompt = contents if isinstance(contents, str) else str(contents)
+        destination_match = _DESTINATION_RE.search(prompt)
+        days_match = _DAYS_RE.search(prompt)
+        destination = destination_match.group(1).strip() if destination_match else "Faketown"
+        days = int(days_match.group(1)) if days_match else 3
+        self._owner.calls += 1
+        variant = self._owner.calls if self._owner.vary else 0
+        day_match = _EDIT_DAY_RE.search(prompt)
+        place_match = _EDIT_PLACE_RE.search(prompt)
+        if place_match:
+            # 기존 일정과 겹치지 않게 호출마다 다른 이름을 쓴다
+            day = int(place_match.group(1))
+            place = build_plan(destination, day, places_per_day=1, variant=variant)["days"][-1]["places"][0]
+            body = json.dumps({**place, "placeName": f"{place['placeName']} Annex {self._owner.calls}"}, ensure_ascii=False)
+        elif day_match:
+            day = int(day_match.group(1))
+            places = build_plan(destination, day, variant=variant + 5)["days"][-1]["places"]
+            body = json.dumps({"places": places}, ensure_ascii=False, indent=2)
+        else:
+            plan = build_plan(destination, days, variant=variant)
+            body = json.dumps(plan, ensure_ascii=False, indent=2)
+        return f"Here is your itinerary:\n```json\n{body}\n```" if self._owner.fenced else body
+
+    async def generate_content(self, *, model, contents, config=None):
+        text = self._response_text(contents)
+        await asyncio.sleep(self._owner.latency_ms / 1000)
+        return _FakeResponse(text)
+
+    async def generate_content_stream(self, *, model, contents, config=None):
+        text = self._response_text(contents)
+        owner = self._owner
+        chunks = [text[i:i + owner.chunk_chars] for i in range(0, len(text), owner.chunk_chars)]
+        chunk_delay = owner.latency_ms / 1000 / max(1, len(chunks))
+
+        async def iterate():
+            for chunk in chunks:
+                await asyncio.sleep(chunk_delay)
+                yield _FakeResponse(chunk)
+
+        return iterate()
+
+
+class FakeGenaiClient:
+    """`client.aio.models` 형태만 흉내 낸다. latency_ms는 응답 전체(스트리밍이면 마지막 청크까지)에 걸리는 시간."""
+
+    def __init__(self, latency_ms: float = 1000.0, chunk_chars: int = 120, fenced: bool = True, vary: bool = False):
+        self.latency_ms = latency_ms
+        self.chunk_chars = chunk_chars
+        self.fenced = fenced
+        self.vary = vary
+        self.calls = 0
+        self.aio = SimpleNamespace(models=_FakeModels(self))
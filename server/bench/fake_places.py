@@ -0,0 +1,191 @@
+"""로컬 Places `searchText` 대역 서버.
+
+지연, 오류율, 빈 응답 비율, 후보 수를 설정할 수 있고 받은 호출 수를 센다. 사진 media 엔드포인트도 흉내 낸다.
+load_test.py가 스레드로 띄워 쓰며, 단독으로 띄운 뒤 PLACES_API_BASE_URL로 가리켜도 된다.
+
+    cd server && python bench/fake_places.py --port 8765 --latency-ms 120 --error-rate 0.02
+    PLACES_API_BASE_URL=http://127.0.0.1:8765/v1 uvicorn main:app
+"""
+import argparse
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+DEFAULT_CENTER = {"latitude": 60.1699, "longitude": 24.9384}
+
+# "top ... in X" / "best ... in X" 같은 넓은 검색에 돌려주는 목록 (카탈로그 시드용)
+SEED_LANDMARKS = [
+    "Helsinki Cathedral", "Uspenski Cathedral", "Temppeliaukio Church", "Suomenlinna", "Market Square",
+    "Old Market Hall", "Kiasma Museum of Contemporary Art", "Ateneum Art Museum", "National Museum of Finland",
+    "Design Museum", "Sibelius Monument", "Seurasaari Open-Air Museum", "Esplanadi Park", "Oodi Central Library",
+    "Allas Sea Pool", "Linnanmäki Amusement Park", "Helsinki Zoo", "Amos Rex", "St. John's Church", "Kamppi Chapel",
+]
+SEED_RESTAURANTS = [
+    "Restaurant Savoy", "Cafe Regatta", "Story Restaurant", "Restaurant Olo", "Cafe Ekberg", "Kappeli",
+    "Ravintola Nokka", "Restaurant Palace", "Zucchini", "Lonna Restaurant", "Cafe Engel", "Juuri",
+    "Restaurant Ask", "Fazer Café Kluuvikatu", "Ravintola Kuu", "Cafe Aalto", "Vltava", "Skiffer Liuskaluoto",
+    "Restaurant Grön", "Levain Bakery",
+]
+
+
+@dataclass
+class FakePlacesConfig:
+    latency_ms: float = 80.0
+    jitter_ms: float = 40.0
+    error_rate: float = 0.0
+    # 빈 결과 비율. 빈 결과는 `"이름, 목적지"` fallback 쿼리를 유발한다.
+    empty_rate: float = 0.05
+    # `"이름, 목적지"` fallback 쿼리의 빈 결과 비율. None이면 empty_rate와 같다.
+    fallback_empty_rate: float | None = None
+    candidates: int = 3
+    # 꼬리 지연 흉내: 이 비율의 searchText 호출은 slow_ms만큼 걸린다
+    slow_rate: float = 0.0
+    slow_ms: float = 2000.0
+    seed: int = 0
+
+
+def _candidate(query: str, idx: int, center: dict) -> dict:
+    # 같은 쿼리에는 항상 같은 후보를 돌려준다 (캐시 적중 여부와 무관하게 결과가 같아야 비교가 된다)
+    digest = int(hashlib.blake2b(f"{query}:{idx}".encode(), digest_size=8).hexdigest(), 16)
+    spread = 0.03 if idx == 0 else 0.6 * idx
+    lat = center["latitude"] + ((digest % 1000) / 1000 - 0.5) * spread
+    lng = center["longitude"] + (((digest >> 10) % 1000) / 1000 - 0.5) * spread
+    name = query.split(",")[0]
+    return {
+        "id": f"fake-{digest:x}",
+        # 시드 목록 이름은 그대로, 그 밖의 쿼리는 Title Case로 돌려준다
+        "displayName": {"text": name if name in SEED_LANDMARKS or name in SEED_RESTAURANTS else name.title()},
+        "formattedAddress": f"{(digest >> 20) % 200 + 1} {query.split(',')[0].title()} Street, Faketown",
+        "rating": round(3.5 + (digest % 15) / 10, 1),
+        "userRatingCount": digest % 5000,
+        "photos": [{"name": f"places/fake-{digest:x}/photos/p{idx}"}],
+        "location": {"latitude": lat, "longitude": lng},
+        "businessStatus": "OPERATIONAL" if idx == 0 or digest % 4 else "CLOSED_PERMANENTLY",
+        "types": ["tourist_attraction", "point_of_interest"] if digest % 2 else ["restaurant", "food"],
+        "primaryType": "museum" if digest % 3 else "restaurant",
+        "editorialSummary": {"text": "A popular local landmark with scenic views."},
+    }
+
+
+def create_app(config: FakePlacesConfig) -> FastAPI:
+    app = FastAPI()
+    rng = random.Random(config.seed)
+    calls = Counter()
+
+    @app.post("/v1/places:searchText")
+    async def search_text(request: Request):
+        body = await request.json()
+        query = (body.get("textQuery") or "").strip()
+        calls["total"] += 1
+        if rng.random() < config.slow_rate:
+            calls["slow"] += 1
+            await asyncio.sleep(config.slow_ms / 1000)
+        else:
+            await asyncio.sleep(max(0.0, config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms)) / 1000)
+
+        if rng.random() < config.error_rate:
+            calls["errors"] += 1
+            return JSONResponse(status_code=503, content={"error": {"status": "UNAVAILABLE"}})
+        empty_rate = config.empty_rate
+        if config.fallback_empty_rate is not None and ", " in query:
+            empty_rate = config.fallback_empty_rate
+        if rng.random() < empty_rate:
+            calls["empty"] += 1
+            return {}
+
+        center = ((body.get("locationBias") or {}).get("circle") or {}).get("center") or DEFAULT_CENTER
+        lowered = query.lower()
+        if lowered.startswith(("top ", "best ")) and " in " in lowered:
+            calls["seed"] += 1
+            names = SEED_LANDMARKS if lowered.startswith("top ") else SEED_RESTAURANTS
+            return {"places": [_candidate(name, 0, center) for name in names]}
+        return {"places": [_candidate(query, idx, center) for idx in range(config.candidates)]}
+
+    @app.get("/v1/{photo_ref:path}/media")
+    async def photo_media(photo_ref: str):
+        calls["photos"] += 1
+        await asyncio.sleep(max(0.0, config.latency_ms + rng.uniform(-config.jitter_ms, config.jitter_ms)) / 1000)
+        if rng.random() < config.error_rate:
+            calls["errors"] += 1
+            return JSONResponse(status_code=503, content={"error": {"status": "UNAVAILABLE"}})
+        # 사진 이름마다 내용이 다른 JPEG 흉내 (크기만 의미가 있다)
+        seed = hashlib.blake2b(photo_ref.encode(), digest_size=8).digest()
+        return Response(content=b"\xff\xd8\xff\xe0" + seed * (2048 + seed[0] * 16), media_type="image/jpeg")
+
+    @app.get("/stats")
+    def stats():
+        return dict(calls)
+
+    @app.post("/stats/reset")
+    def reset_stats():
+        calls.clear()
+        return {}
+
+    app.state.calls = calls
+    return app
+
+
+class FakePlacesServer:
+    """백그라운드 스레드에서 uvicorn으로 도는 대역 서버."""
+
+    def __init__(self, config: FakePlacesConfig, host: str = "127.0.0.1", port: int = 8765):
+        self.app = create_app(config)
+        self.base_url = f"http://{host}:{port}/v1"
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host=host, port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def calls(self) -> Counter:
+        return self.app.state.calls
+
+    def start(self):
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("fake Places server did not start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self):
+        self._server.should_exit = True
+        self._thread.join(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--jitter-ms", type=float, default=40.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--empty-rate", type=float, default=0.05)
+    parser.add_argument("--fallback-empty-rate", type=float, default=None)
+    parser.add_argument("--candidates", type=int, default=3)
+    parser.add_argument("--slow-rate", type=float, default=0.0)
+    parser.add_argument("--slow-ms", type=float, default=2000.0)
+    args = parser.parse_args()
+
+    config = FakePlacesConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        empty_rate=args.empty_rate,
+        fallback_empty_rate=args.fallback_empty_rate,
+        candidates=args.candidates,
+        slow_rate=args.slow_rate,
+        slow_ms=args.slow_ms,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""오프라인 부하 테스트.
+
+fake_places.py 대역 서버와 fake_genai.py 클라이언트를 붙인 main.app을 프로세스 안에서(httpx ASGITransport)
+정해진 동시성으로 두드리고, 시나리오별 처리량, p50/p95/p99 지연, 업스트림 호출 수, 캐시 적중률을 출력한다.
+같은 작업을 cold/warm 두 번 돌려 캐시 효과도 함께 본다. Places 쿼터나 Vertex 토큰은 쓰지 않는다.
+
+    cd server && python bench/load_test.py --concurrency 32 --requests 400
+    cd server && python bench/load_test.py --scenario batch --places-latency-ms 150 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from fake_genai import FakeGenaiClient, build_plan  # noqa: E402
+from fake_places import FakePlacesConfig, FakePlacesServer  # noqa: E402
+
+DESTINATIONS = ["Helsinki", "Tallinn", "Stockholm", "Oslo", "Copenhagen", "Riga", "Vilnius", "Bergen"]
+
+
+def percentile(sorted_samples: list[float], pct: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, round(pct / 100 * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+def plan_payload(rng: random.Random) -> dict:
+    return {
+        "destination": rng.choice(DESTINATIONS),
+        "days": rng.choice([2, 3, 4]),
+        "companions": rng.choice(["friends", "family"]),
+        "style": rng.choice(["relaxed", "packed"]),
+        "transportation": "public transit",
+        "month": rng.choice(["May", "June"]),
+    }
+
+
+def batch_payload(rng: random.Random) -> dict:
+    destination = rng.choice(DESTINATIONS)
+    plan = build_plan(destination, rng.choice([2, 3, 4]), variant=rng.randrange(4))
+    return {
+        "destination": destination,
+        "placeNames": [place["placeName"] for day in plan["days"] for place in day["places"]],
+    }
+
+
+SCENARIOS = {
+    "generate": ("/api/plans/generate", plan_payload),
+    "batch": ("/api/get-place-details-batch", batch_payload),
+}
+
+
+async def run_phase(http, path: str, payloads: list[dict], concurrency: int) -> dict:
+    latencies = []
+    failures = 0
+    queue = list(reversed(payloads))
+
+    async def worker():
+        nonlocal failures
+        while queue:
+            payload = queue.pop()
+            start = time.perf_counter()
+            response = await http.post(path, json=payload)
+            latencies.append((time.perf_counter() - start) * 1e3)
+            if response.status_code != 200:
+                failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "failures": failures,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+    }
+
+
+def hit_rate(before: dict, after: dict) -> str:
+    hits = after["hits"] - before["hits"]
+    lookups = hits + after["misses"] - before["misses"]
+    return f"{hits / lookups:.0%}" if lookups else "-"
+
+
+async def run(args, places_server: FakePlacesServer, fake_client: FakeGenaiClient):
+    import httpx
+    import main
+
+    main.client = fake_client
+    rng = random.Random(args.seed)
+    scenarios = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+
+    print(f"{'scenario':<10}{'phase':<6}{'req':>6}{'fail':>6}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'places':>8}{'model':>7}{'place hit':>11}{'center hit':>12}")
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as http:
+            for scenario in scenarios:
+                path, make_payload = SCENARIOS[scenario]
+                payloads = [make_payload(rng) for _ in range(args.requests)]
+                for phase in ("cold", "warm"):
+                    stats_before = (await http.get("/api/cache/stats")).json()
+                    places_before = places_server.calls["total"]
+                    model_before = fake_client.calls
+                    result = await run_phase(http, path, payloads, args.concurrency)
+                    stats_after = (await http.get("/api/cache/stats")).json()
+                    print(
+                        f"{scenario:<10}{phase:<6}{result['requests']:>6}{result['failures']:>6}{result['rps']:>9.1f}"
+                        f"{result['p50']:>9.1f}{result['p95']:>9.1f}{result['p99']:>9.1f}"
+                        f"{places_server.calls['total'] - places_before:>8}{fake_client.calls - model_before:>7}"
+                        f"{hit_rate(stats_before['placeDetails'], stats_after['placeDetails']):>11}"
+                        f"{hit_rate(stats_before['destinationCenter'], stats_after['destinationCenter']):>12}"
+                    )
+            stats = (await http.get("/api/cache/stats")).json()
+    flights = stats["singleFlight"]
+    print(
+        f"\nsingle-flight coalescing: placeDetails {flights['placeDetails']['coalescingRate']:.0%}, "
+        f"destinationCenter {flights['destinationCenter']['coalescingRate']:.0%}; "
+        f"upstream errors {places_server.calls['errors']}, empty {places_server.calls['empty']}"
+    )
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description="offline load test against fake Places/genai upstreams")
+    parser.add_argument("--scenario", choices=["all", *SCENARIOS], default="all")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--places-latency-ms", type=float, default=80.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--empty-rate", type=float, default=0.05)
+    parser.add_argument("--candidates", type=int, default=3)
+    parser.add_argument("--places-qps", type=float, default=0.0, help="서버의 PLACES_QPS (0이면 제한 없음)")
+    parser.add_argument("--gen-latency-ms", type=float, default=1000.0)
+    parser.add_argument("--plan-cache", action="store_true", help="PLAN_CACHE_ENABLED=true로 실행")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    places_server = FakePlacesServer(
+        FakePlacesConfig(
+            latency_ms=args.places_latency_ms,
+            error_rate=args.error_rate,
+            empty_rate=args.empty_rate,
+            candidates=args.candidates,
+            seed=args.seed,
+        ),
+        port=args.port,
+    ).start()
+
+    # main은 import 시점에 환경 변수를 읽으므로 그 전에 대역 주소와 캐시 설정을 넣는다
+    os.environ["PLACES_API_BASE_URL"] = places_server.base_url
+    os.environ.setdefault("GOOGLE_MAPS_API_KEY", "bench-key")
+    os.environ["PLACE_CACHE_DB_PATH"] = ""
+    os.environ["PLACES_QPS"] = str(args.places_qps)
+    os.environ["PLAN_CACHE_ENABLED"] = "true" if args.plan_cache else "false"
+    try:
+        asyncio.run(run(args, places_server, FakeGenaiClient(latency_ms=args.gen_latency_ms)))
+    finally:
+        places_server.stop()
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -1,17 +1,60 @@
 import os
 import json
+import gzip
+import hashlib
+import mimetypes
 import re
-import requests
 import time
-from fastapi import FastAPI, HTTPException
+import heapq
+import random
+import bisect
+import inspect
+import functools
+import queue
+import shutil
+import sqlite3
+import tempfile
+import asyncio
+import threading
+import unicodedata
+import uuid
+from math import radians, sin, cos, sqrt, atan2, ceil
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # numpy는 _haversine_matrix_km에서 처음 쓸 때 불러온다. 여기서는 타입 표기용으로만 쓴다.
+    import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # fcntl이 없는 플랫폼(Windows)에서는 워커 간 파일 잠금 없이 동작한다
+    fcntl = None
+
+# 시작 비용 측정 기준점 (GET /api/startup-timings). 표준 라이브러리 import는 무시할 만하므로 여기부터 잰다.
+_module_started = time.perf_counter()
+
+import httpx
+import ahocorasick
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse, Response, StreamingResponse
 from pydantic import BaseModel
+from starlette.background import BackgroundTask
 from dotenv import load_dotenv
 
-from google import genai
-from google.genai import types
+try:
+    import brotli
+except ImportError:  # brotli가 없으면 gzip 변형만 만든다
+    brotli = None
+
+try:
+    import orjson
+except ImportError:  # orjson이 없으면 표준 json으로 직렬화한다
+    orjson = None
+
+startup_timings: dict[str, float] = {"thirdPartyImportMs": round((time.perf_counter() - _module_started) * 1e3, 1)}
 
 load_dotenv()
 
@@ -19,43 +62,234 @@ PROJECT_ID = os.getenv("GCP_PROJECT_ID")
 LOCATION = os.getenv("GCP_LOCATION", "asia-northeast3")
 MAPS_API_KEY = os.getenv("GOOGLE_MAPS_API_KEY")
 
+# Gen AI 클라이언트는 처음 필요할 때(또는 서버가 뜬 직후 백그라운드 warm-up에서) 만든다.
+# google.genai import와 Vertex 인증 조회가 수백 ms~수 초 걸려, import 시점에 하면 콜드 스타트가 그만큼 늘어난다.
+GENAI_WARMUP = os.getenv("GENAI_WARMUP", "true").lower() in {"1", "true", "yes"}
+
 client = None
-try:
-    client = genai.Client(
+_genai_client_lock = threading.Lock()
+# 초기화에 실패하면(일시적인 인증/메타데이터 서버 오류 등) 이 간격만큼 쉬었다가 다음 호출에서 다시 만든다.
+# 실패할 때마다 두 배로 늘린다.
+GENAI_INIT_RETRY_BASE_SEC = 1.0
+GENAI_INIT_RETRY_MAX_SEC = 60.0
+_genai_client_failures = 0
+_genai_client_next_attempt_at = 0.0
+
+
+def _create_genai_client():
+    started = time.perf_counter()
+    from google import genai
+    startup_timings.setdefault("genaiImportMs", round((time.perf_counter() - started) * 1e3, 1))
+    return genai.Client(
         vertexai=True,
         project=PROJECT_ID,
         location=LOCATION
     )
-    print("Google Gen AI Client initialized (Vertex AI mode)")
-except Exception as e:
-    print(f"Client init failed: {e}")
 
-app = FastAPI()
-cors_origins_env = os.getenv("CORS_ALLOW_ORIGINS", "http://localhost:5173")
-allow_origins = [origin.strip() for origin in cors_origins_env.split(",") if origin.strip()]
-allow_credentials = "*" not in allow_origins
 
-# 1. React 빌드 결과물 경로 설정 (Dockerfile 구조 기준)
-# 나중에 Dockerfile에서 client/dist 폴더를 server/static으로 복사할 예정입니다.
-build_dir = os.path.join(os.path.dirname(__file__), "static")
+def _get_genai_client():
+    """클라이언트를 만들어 돌려준다. 실패하면 None이고, 백오프가 지난 뒤의 호출이 다시 시도한다.
 
-# 빌드 폴더가 존재할 때만 실행 (로컬 개발 시 에러 방지)
-if os.path.isdir(build_dir):
-    # assets 폴더 (CSS, JS, 이미지 등) 서빙
-    app.mount("/assets", StaticFiles(directory=os.path.join(build_dir, "assets")), name="assets")
+    블로킹이므로 이벤트 루프에서는 _ensure_genai_client를 쓴다.
+    """
+    global client, _genai_client_failures, _genai_client_next_attempt_at
+    if client is not None or time.monotonic() < _genai_client_next_attempt_at:
+        return client
+    with _genai_client_lock:
+        if client is None and time.monotonic() >= _genai_client_next_attempt_at:
+            started = time.perf_counter()
+            try:
+                client = _create_genai_client()
+                _genai_client_failures = 0
+                print("Google Gen AI Client initialized (Vertex AI mode)")
+            except Exception as e:
+                _genai_client_failures += 1
+                delay = min(GENAI_INIT_RETRY_MAX_SEC, GENAI_INIT_RETRY_BASE_SEC * 2 ** (_genai_client_failures - 1))
+                _genai_client_next_attempt_at = time.monotonic() + delay
+                print(f"Client init failed (attempt {_genai_client_failures}, retrying after {delay:.0f}s): {e}")
+            startup_timings.setdefault("genaiClientReadyMs", round((time.perf_counter() - started) * 1e3, 1))
+    return client
+
+
+async def _ensure_genai_client():
+    if client is not None or time.monotonic() < _genai_client_next_attempt_at:
+        return client
+    return await asyncio.to_thread(_get_genai_client)
+
+# 부하 테스트 시 bench/fake_places.py 같은 로컬 대역으로 바꿔 끼울 수 있다
+PLACES_API_BASE_URL = os.getenv("PLACES_API_BASE_URL", "https://places.googleapis.com/v1").rstrip("/")
+PLACES_SEARCH_URL = f"{PLACES_API_BASE_URL}/places:searchText"
+PLACES_HTTP_TIMEOUT_SEC = 15
+# 프로세스 전체에서 동시에 진행되는 Places 호출 수 상한 (fallback 쿼리 포함)
+PLACES_MAX_CONCURRENCY = max(1, int(os.getenv("PLACES_MAX_CONCURRENCY", "8")))
+
+# 프로세스 전체 Places 초당 호출 수(토큰 버킷). 0 이하이면 제한하지 않는다.
+PLACES_QPS = float(os.getenv("PLACES_QPS", "10"))
+PLACES_BURST = max(1.0, float(os.getenv("PLACES_BURST", str(max(PLACES_QPS, 1.0)))))
+# 429/503 응답 재시도 (지터를 섞은 지수 백오프)
+PLACES_MAX_RETRIES = max(0, int(os.getenv("PLACES_MAX_RETRIES", "3")))
+PLACES_BACKOFF_BASE_SEC = 0.25
+PLACES_BACKOFF_MAX_SEC = 8.0
+PLACES_RETRY_STATUS_CODES = {429, 503}
+# hedged request: searchText 응답이 최근 지연 분위수(기본 p95)를 넘기면 같은 요청을 한 번 더 보내고 먼저 온 응답을 쓴다.
+# 남는 토큰이 있을 때만, 전체 호출 대비 PLACES_HEDGE_MAX_RATIO 이하로만 보내 쿼터와 과부하를 키우지 않는다.
+PLACES_HEDGE_ENABLED = os.getenv("PLACES_HEDGE_ENABLED", "true").lower() in {"1", "true", "yes"}
+PLACES_HEDGE_QUANTILE = float(os.getenv("PLACES_HEDGE_QUANTILE", "0.95"))
+PLACES_HEDGE_MIN_DELAY_MS = float(os.getenv("PLACES_HEDGE_MIN_DELAY_MS", "50"))
+PLACES_HEDGE_MAX_RATIO = float(os.getenv("PLACES_HEDGE_MAX_RATIO", "0.1"))
+PLACES_HEDGE_MIN_SAMPLES = 50
+
+# 토큰을 기다리는 호출은 숫자가 작은 우선순위부터 깨운다
+PLACES_PRIORITY_CENTER = 0
+PLACES_PRIORITY_INTERACTIVE = 1
+PLACES_PRIORITY_BULK = 2
+# 캐시 프리워밍. 라이브 요청이 모두 토큰을 받은 뒤에만 깨운다.
+PLACES_PRIORITY_PREWARM = 3
+
+_places_http_client: httpx.AsyncClient | None = None
+_places_semaphore = asyncio.Semaphore(PLACES_MAX_CONCURRENCY)
 
-    # 2. SPA 라우팅 처리 (새로고침 시 404 방지 -> index.html 반환)
-    @app.get("/{full_path:path}")
-    async def serve_react_app(full_path: str):
-        # API 요청이 아닌 경우 index.html 반환
-        if full_path.startswith("api"):
-            return {"error": "Not Found"}
-            
-        file_path = os.path.join(build_dir, full_path)
-        if os.path.exists(file_path) and os.path.isfile(file_path):
-            return FileResponse(file_path)
-            
-        return FileResponse(os.path.join(build_dir, "index.html"))
+
+class PlacesGovernor:
+    """우선순위 대기열이 있는 토큰 버킷.
+
+    토큰이 남아 있고 기다리는 호출이 없으면 바로 통과시키고, 그렇지 않으면 (우선순위, 도착 순)으로
+    줄을 세운 뒤 토큰이 다시 차는 시점에 앞에서부터 깨운다. 목적지 중심 좌표나 첫째 날 장소 조회가
+    큰 배치 뒤에 밀려 기다리지 않게 하는 것이 목적이다.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = 0
+        self._wakeup: asyncio.TimerHandle | None = None
+        self.granted = 0
+        self.queued = 0
+
+    async def acquire(self, priority: int) -> float:
+        """토큰 하나를 얻을 때까지 기다리고, 기다린 시간(초)을 돌려준다."""
+        self.granted += 1
+        if self.rate <= 0:
+            return 0.0
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+
+        self.queued += 1
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, self._seq, future))
+        self._seq += 1
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # 토큰을 받은 직후 취소되었다면 돌려준다
+            if future.done() and not future.cancelled():
+                self._tokens = min(self.burst, self._tokens + 1)
+                self._schedule()
+            raise
+        return time.monotonic() - start
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """기다리는 호출이 없고 토큰이 남아 있을 때만 하나 가져간다 (hedge처럼 없어도 되는 호출용)."""
+        if self.rate > 0:
+            self._refill()
+            if self._waiters or self._tokens < 1:
+                return False
+            self._tokens -= 1
+        self.granted += 1
+        return True
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def _schedule(self):
+        if self._wakeup is None and self._waiters:
+            delay = max(0.0, (1 - self._tokens) / self.rate)
+            self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def _dispatch(self):
+        self._wakeup = None
+        self._refill()
+        while self._waiters and (self._tokens >= 1 or self._waiters[0][2].done()):
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+        self._schedule()
+
+    def stats(self) -> dict:
+        return {
+            "qps": self.rate,
+            "burst": self.burst,
+            "granted": self.granted,
+            "queued": self.queued,
+            "waiting": self.waiting,
+        }
+
+
+places_governor = PlacesGovernor(PLACES_QPS, PLACES_BURST)
+
+
+def _get_places_http_client() -> httpx.AsyncClient:
+    global _places_http_client
+    if _places_http_client is None:
+        _places_http_client = httpx.AsyncClient(
+            timeout=PLACES_HTTP_TIMEOUT_SEC,
+            limits=httpx.Limits(
+                max_connections=PLACES_MAX_CONCURRENCY,
+                max_keepalive_connections=PLACES_MAX_CONCURRENCY,
+            ),
+        )
+    return _places_http_client
+
+
+async def _close_places_http_client():
+    global _places_http_client
+    if _places_http_client is not None:
+        await _places_http_client.aclose()
+        _places_http_client = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    sweeper = asyncio.create_task(_sweep_caches_periodically())
+    # warm-up은 스레드에서 돌아 요청 수신을 막지 않는다
+    warmups = [asyncio.create_task(asyncio.to_thread(_precompress_static_manifest))]
+    if GENAI_WARMUP:
+        warmups.append(asyncio.create_task(asyncio.to_thread(_get_genai_client)))
+    plan_jobs.start()
+    cache_prewarmer.start()
+    startup_timings["readyMs"] = round((time.perf_counter() - _module_started) * 1e3, 1)
+    yield
+    for warmup in warmups:
+        warmup.cancel()
+    sweeper.cancel()
+    await plan_jobs.stop()
+    await cache_prewarmer.stop()
+    await _close_places_http_client()
+    if place_cache_store is not None:
+        place_cache_store.close()
+    if request_log is not None:
+        request_log.close()
+
+
+app = FastAPI(lifespan=lifespan)
+cors_origins_env = os.getenv("CORS_ALLOW_ORIGINS", "http://localhost:5173")
+allow_origins = [origin.strip() for origin in cors_origins_env.split(",") if origin.strip()]
+allow_credentials = "*" not in allow_origins
 
 app.add_middleware(
     CORSMiddleware,
@@ -65,9 +299,540 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-PLACE_CACHE_TTL_SEC = 60 * 60 * 6
-destination_center_cache: dict[str, tuple[float, dict]] = {}
-place_details_cache: dict[str, tuple[float, dict]] = {}
+# 요청 경로 지표. 외부 수집기 없이 프로세스 메모리에 쌓고 /metrics에서 Prometheus 텍스트 형식으로 내보낸다.
+METRICS_LATENCY_BUCKETS_SEC = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        f'{key}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), " ")}"'
+        for key, value in labels
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, bucket_count: int):
+        # 마지막 칸은 +Inf 버킷
+        self.counts = [0] * (bucket_count + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class MetricsRegistry:
+    """카운터/히스토그램 레지스트리. 이벤트 루프 스레드에서만 갱신한다고 가정해 잠금을 두지 않는다.
+
+    캐시 적중률처럼 다른 객체가 이미 세고 있는 값은 collector 함수로 등록해 render() 시점에 읽는다.
+    """
+
+    def __init__(self, buckets: tuple = METRICS_LATENCY_BUCKETS_SEC):
+        self.buckets = buckets
+        self._meta: dict[str, tuple[str, str]] = {}
+        self._counters: dict[str, dict[tuple, float]] = {}
+        self._histograms: dict[str, dict[tuple, _Histogram]] = {}
+        self._collectors = []
+
+    def describe(self, name: str, metric_type: str, help_text: str):
+        self._meta[name] = (metric_type, help_text)
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        series = self._counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        series = self._histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = _Histogram(len(self.buckets))
+        histogram.counts[bisect.bisect_left(self.buckets, value)] += 1
+        histogram.sum += value
+        histogram.count += 1
+
+    @contextmanager
+    def span(self, stage: str):
+        """구간 소요 시간을 stage_duration_seconds{stage}에, 예외를 stage_errors_total{stage}에 기록한다."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc("stage_errors_total", stage=stage)
+            raise
+        finally:
+            self.observe("stage_duration_seconds", time.perf_counter() - start, stage=stage)
+
+    def timed(self, stage: str):
+        """span()을 함수 전체에 씌우는 데코레이터. 코루틴 함수도 지원한다."""
+        def decorator(fn):
+            if inspect.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(stage):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def register_collector(self, fn):
+        """fn()은 (name, type, help, [(labels dict, value), ...]) 튜플들을 돌려준다."""
+        self._collectors.append(fn)
+        return fn
+
+    def render(self) -> str:
+        lines = []
+
+        def header(name: str, default_type: str):
+            metric_type, help_text = self._meta.get(name, (default_type, ""))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+        for name, series in self._counters.items():
+            header(name, "counter")
+            for labels, value in series.items():
+                lines.append(f"{name}{_format_labels(labels)} {value:g}")
+
+        for name, series in self._histograms.items():
+            header(name, "histogram")
+            for labels, histogram in series.items():
+                cumulative = 0
+                for bound, count in zip((*self.buckets, "+Inf"), histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels((*labels, ('le', bound)))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+        for collector in self._collectors:
+            for name, metric_type, help_text, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(tuple(sorted(labels.items())))} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+metrics.describe("stage_duration_seconds", "histogram", "Time spent per request stage.")
+metrics.describe("stage_errors_total", "counter", "Exceptions raised per request stage.")
+metrics.describe("upstream_requests_total", "counter", "Upstream calls by upstream and outcome.")
+metrics.describe("places_governor_wait_seconds", "histogram", "Time Places calls waited for a rate-limit token.")
+metrics.describe("places_retries_total", "counter", "Places calls retried after a 429/503 response.")
+metrics.describe("place_fallback_total", "counter", "Fallback '{name}, {destination}' queries by outcome.")
+metrics.describe("places_hedges_total", "counter", "Hedged duplicate searchText requests by which response won.")
+metrics.describe("place_catalog_hits_total", "counter", "Place lookups answered from the destination catalog.")
+metrics.describe("generation_admission_total", "counter", "Gen AI generation requests by mode and admission outcome.")
+metrics.describe("cache_prewarm_hits_total", "counter", "Live cache hits on entries filled by startup prewarming.")
+
+
+# API 응답 직렬화. FastAPI 기본 경로(jsonable_encoder로 dict 전체를 다시 훑은 뒤 json.dumps)를 거치지 않고
+# 이미 JSON 호환인 dict를 바로 bytes로 만들고, 큰 응답은 Accept-Encoding에 맞춰 압축한다.
+JSON_COMPRESS_MIN_BYTES = int(os.getenv("JSON_COMPRESS_MIN_BYTES", "1024"))
+# 요청마다 압축하므로 압축률보다 속도를 우선한 수준
+JSON_BROTLI_QUALITY = 4
+JSON_GZIP_LEVEL = 5
+
+
+def _accepted_encodings(accept_encoding: str) -> set[str]:
+    encodings = set()
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q="):
+            try:
+                if float(quality[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        encodings.add(name.strip().lower())
+    return encodings
+
+
+def _if_none_match_hit(if_none_match: str, etags: set[str]) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") in etags:
+            return True
+    return False
+
+
+def _dump_json(data) -> bytes:
+    if orjson is not None:
+        # 경로 최적화 등에서 numpy 스칼라가 섞여도 직렬화되게 한다
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _json_response(data, http_request: Request, status_code: int = 200) -> Response:
+    body = _dump_json(data)
+    headers = {}
+    if len(body) >= JSON_COMPRESS_MIN_BYTES:
+        headers["Vary"] = "Accept-Encoding"
+        accepted = _accepted_encodings(http_request.headers.get("accept-encoding", ""))
+        if brotli is not None and "br" in accepted:
+            body = brotli.compress(body, quality=JSON_BROTLI_QUALITY)
+            headers["Content-Encoding"] = "br"
+        elif "gzip" in accepted:
+            body = gzip.compress(body, compresslevel=JSON_GZIP_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+PLACE_CACHE_TTL_SEC = int(os.getenv("PLACE_CACHE_TTL_SEC", str(60 * 60 * 6)))
+PLACE_CACHE_NEGATIVE_TTL_SEC = int(os.getenv("PLACE_CACHE_NEGATIVE_TTL_SEC", str(60 * 30)))
+PLACE_CACHE_MAX_ENTRIES = int(os.getenv("PLACE_CACHE_MAX_ENTRIES", "20000"))
+PLACE_CACHE_MAX_BYTES = int(os.getenv("PLACE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+CACHE_SWEEP_INTERVAL_SEC = 60
+
+
+class TTLCache:
+    """항목 수/대략적인 바이트 예산으로 제한되는 LRU + TTL 캐시.
+
+    `{"found": False}` 값은 negative_ttl_sec로 더 짧게 보관한다. 만료 항목은 읽기와 무관하게
+    쓰기 시점과 주기적인 sweep()에서 만료 시각 힙을 통해 정리된다.
+    """
+
+    def __init__(self, name: str, max_entries: int, max_bytes: int, ttl_sec: float, negative_ttl_sec: float | None = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_sec = ttl_sec
+        self.negative_ttl_sec = ttl_sec if negative_ttl_sec is None else negative_ttl_sec
+        # key -> (만료 시각, 대략적인 크기, 값). 순서가 곧 LRU 순서다.
+        self._entries: OrderedDict[str, tuple[float, int, dict]] = OrderedDict()
+        self._expiry_heap: list[tuple[float, str]] = []
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: str):
+        now = time.monotonic()
+        with self._lock:
+            self._purge_expired(now)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def peek(self, key: str):
+        """통계나 LRU 순서에 영향을 주지 않고 값을 확인한다."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.monotonic():
+                return None
+            return entry[2]
+
+    def ttl_for(self, value: dict) -> float:
+        return self.negative_ttl_sec if value.get("found") is False else self.ttl_sec
+
+    def set(self, key: str, value: dict, ttl_sec: float | None = None):
+        ttl = self.ttl_for(value) if ttl_sec is None else ttl_sec
+        size = _approx_size(key, value)
+        now = time.monotonic()
+        with self._lock:
+            self._purge_expired(now)
+            self._remove(key)
+            expires_at = now + ttl
+            self._entries[key] = (expires_at, size, value)
+            self._bytes += size
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+            # 덮어쓰기/축출로 남은 힙 찌꺼기가 쌓이면 다시 만든다
+            if len(self._expiry_heap) > 2 * len(self._entries) + 64:
+                self._expiry_heap = [(entry[0], k) for k, entry in self._entries.items()]
+                heapq.heapify(self._expiry_heap)
+
+    def sweep(self):
+        with self._lock:
+            self._purge_expired(time.monotonic())
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "maxEntries": self.max_entries,
+            "maxBytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _purge_expired(self, now: float):
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == expires_at:
+                self._remove(key)
+                self.expirations += 1
+
+
+def _approx_size(key: str, value: dict) -> int:
+    return len(key) + len(json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+
+
+destination_center_cache = TTLCache(
+    "destination_center",
+    max_entries=PLACE_CACHE_MAX_ENTRIES,
+    max_bytes=PLACE_CACHE_MAX_BYTES,
+    ttl_sec=PLACE_CACHE_TTL_SEC,
+    negative_ttl_sec=PLACE_CACHE_NEGATIVE_TTL_SEC,
+)
+place_details_cache = TTLCache(
+    "place_details",
+    max_entries=PLACE_CACHE_MAX_ENTRIES,
+    max_bytes=PLACE_CACHE_MAX_BYTES,
+    ttl_sec=PLACE_CACHE_TTL_SEC,
+    negative_ttl_sec=PLACE_CACHE_NEGATIVE_TTL_SEC,
+)
+
+
+PLACE_CACHE_DB_PATH = os.getenv("PLACE_CACHE_DB_PATH", "").strip()
+PERSISTENT_CACHE_FLUSH_INTERVAL_SEC = 0.5
+PERSISTENT_CACHE_FLUSH_BATCH = 256
+PERSISTENT_CACHE_PRUNE_INTERVAL_SEC = 60 * 10
+
+
+class PersistentCacheStore:
+    """여러 워커 프로세스가 함께 쓰고 재시작 후에도 남는 SQLite(WAL) 기반 2차 캐시.
+
+    읽기는 PK 단건 조회지만 다른 프로세스가 DB를 잠그면 busy_timeout만큼 기다릴 수 있으므로
+    _cache_lookup이 스레드에서 수행한다. 쓰기는 큐에 넣어 전용 스레드가 모아서 한 트랜잭션으로
+    반영한다. 어느 쪽도 이벤트 루프를 막지 않는다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._queue: queue.Queue = queue.Queue()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.write_errors = 0
+
+        conn = self._connect()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        conn.close()
+
+        self._writer = threading.Thread(target=self._write_loop, name="place-cache-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+        return conn
+
+    def get(self, namespace: str, key: str) -> tuple[dict, float] | None:
+        """(값, 남은 TTL 초)를 돌려준다. 없거나 만료됐으면 None."""
+        try:
+            row = self._reader().execute(
+                "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Persistent cache read failed: {e}")
+            row = None
+
+        remaining = row[1] - time.time() if row else 0
+        if remaining <= 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0]), remaining
+
+    def put(self, namespace: str, key: str, value: dict, ttl_sec: float):
+        self._queue.put((namespace, key, json.dumps(value, ensure_ascii=False), time.time() + ttl_sec))
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join(timeout=5)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "writeErrors": self.write_errors,
+            "pendingWrites": self._queue.qsize(),
+        }
+
+    def _write_loop(self):
+        conn = self._connect()
+        last_pruned = time.monotonic()
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + PERSISTENT_CACHE_FLUSH_INTERVAL_SEC
+            while len(batch) < PERSISTENT_CACHE_FLUSH_BATCH:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                        batch,
+                    )
+                    if time.monotonic() - last_pruned > PERSISTENT_CACHE_PRUNE_INTERVAL_SEC:
+                        conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+                        last_pruned = time.monotonic()
+                self.writes += len(batch)
+            except sqlite3.Error as e:
+                self.write_errors += len(batch)
+                print(f"Persistent cache write failed: {e}")
+        conn.close()
+
+
+place_cache_store: PersistentCacheStore | None = None
+if PLACE_CACHE_DB_PATH:
+    try:
+        place_cache_store = PersistentCacheStore(PLACE_CACHE_DB_PATH)
+        print(f"Persistent place cache enabled ({PLACE_CACHE_DB_PATH})")
+    except Exception as e:
+        print(f"Persistent place cache init failed: {e}")
+
+
+async def _cache_lookup(cache: TTLCache, key: str):
+    """메모리 캐시를 먼저 보고, 없으면 영구 캐시를 확인해 메모리로 올린다."""
+    value = cache.get(key)
+    if value is not None or place_cache_store is None:
+        return value
+
+    hit = await asyncio.to_thread(place_cache_store.get, cache.name, key)
+    if hit is None:
+        return None
+    value, remaining_ttl = hit
+    cache.set(key, value, ttl_sec=remaining_ttl)
+    return value
+
+
+def _cache_store(cache: TTLCache, key: str, value: dict):
+    cache.set(key, value)
+    if place_cache_store is not None:
+        place_cache_store.put(cache.name, key, value, cache.ttl_for(value))
+
+
+class SingleFlight:
+    """같은 키로 동시에 진행 중인 조회를 하나의 upstream 호출로 합친다.
+
+    첫 호출자가 만든 태스크를 뒤따르는 호출자들이 함께 기다린다. 결과는 태스크 안에서
+    캐시에 저장되므로 태스크가 끝난 뒤의 호출은 캐시에서 바로 응답된다.
+
+    조회는 첫 호출자의 우선순위로 진행되므로, background 호출(프리워밍)이 시작한 태스크에는
+    라이브 호출자를 합치지 않는다. 라이브 호출자는 자기 우선순위로 새 태스크를 시작하고 뒤따르는
+    호출자들은 그 태스크를 기다린다. background 호출자는 어느 태스크에든 합류한다.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        # key -> (태스크, background 호출이 시작했는지)
+        self._inflight: dict[str, tuple[asyncio.Task, bool]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, fn, background: bool = False):
+        self.calls += 1
+        entry = self._inflight.get(key)
+        if entry is not None and (background or not entry[1]):
+            task = entry[0]
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = (task, background)
+            task.add_done_callback(lambda t: self._on_done(key, t))
+        # 한 호출자가 취소되어도 다른 대기자를 위해 조회는 계속 진행한다
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: str, task: asyncio.Task):
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "coalescingRate": round(self.coalesced / self.calls, 4) if self.calls else 0.0,
+            "inflight": len(self._inflight),
+        }
+
+
+destination_center_flight = SingleFlight("destination_center")
+place_details_flight = SingleFlight("place_details")
+
+
+async def _sweep_caches_periodically():
+    while True:
+        await asyncio.sleep(CACHE_SWEEP_INTERVAL_SEC)
+        destination_center_cache.sweep()
+        place_details_cache.sweep()
+        plan_cache.sweep()
 
 class PlanRequest(BaseModel):
     destination: str
@@ -81,45 +846,206 @@ class PlanRequest(BaseModel):
 class PlaceDetailsBatchRequest(BaseModel):
     placeNames: list[str]
     destination: str | None = None
+    # 앞에서부터 이만큼의 장소(보통 첫째 날)를 나머지보다 먼저 조회한다. 없으면 PLACES_INTERACTIVE_HEAD.
+    priorityCount: int | None = None
+    # 이 시간(ms) 안에 끝난 조회만 담아 응답한다. 나머지는 `pending`으로 표시되고 백그라운드에서 계속 조회된다.
+    deadlineMs: int | None = None
 
-@app.get("/")
-def read_root():
-    return {"message": "triplo API is running"}
+class PlanJobRequest(BaseModel):
+    requests: list[PlanRequest]
+    # 생성한 계획의 장소를 Places로 조회해 합쳐서 저장한다 (bulk 우선순위)
+    resolvePlaces: bool = False
 
-def _extract_json_object(text: str):
+class PlanEditRequest(BaseModel):
+    # /api/plans/generate 응답 형태의 현재 계획. 바꾸지 않는 일자/장소는 조회 결과 필드까지 그대로 돌려준다.
+    plan: dict
+    dayNumber: int
+    destination: str
+    companions: str = ""
+    style: str = ""
+    transportation: str = ""
+    month: str = ""
+    # 사용자의 추가 요청 (예: "more museums", "cheaper lunch")
+    instruction: str = ""
+    useWebSearch: bool = False
+    # 새로 만든 장소를 Places로 바로 조회해 합쳐서 돌려준다
+    resolvePlaces: bool = True
+
+class DayRegenerateRequest(PlanEditRequest):
+    pass
+
+class PlaceReplaceRequest(PlanEditRequest):
+    # 바꿀 장소의 일자 내 순서 (places[].order)
+    placeIndex: int
+
+class RouteOptimizeRequest(BaseModel):
+    plan: dict
+    # /api/get-place-details-batch 응답의 results (placeName -> 상세 정보)
+    placeDetails: dict[str, dict] = {}
+
+@metrics.timed("extract_json")
+def _extract_json_object(text: str, expected_key: str = "days"):
     text = (text or "").strip()
     if not text:
         raise ValueError("Empty response from model")
+    return _decode_first_json_object(text, expected_key)
 
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
 
-    match = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
-    if match:
-        block = match.group(1).strip()
-        try:
-            return json.loads(block)
-        except json.JSONDecodeError:
-            pass
+_json_decoder = json.JSONDecoder()
+
 
-    obj_match = re.search(r"\{.*\}", text, re.DOTALL)
-    if obj_match:
-        return json.loads(obj_match.group(0))
+def _decode_first_json_object(text: str, expected_key: str = "days") -> dict:
+    """본문 앞뒤의 설명문/코드펜스를 건너뛰고 expected_key가 있는 첫 번째 JSON 객체를 꺼낸다.
 
+    설명문 속 예시(`Note {"a": 1} ... {plan}`)를 결과로 삼지 않도록, 그런 객체가 없을 때만 처음 완결된 객체를 쓴다.
+    raw_decode는 객체가 끝난 뒤의 텍스트를 무시하므로 trailing commentary가 있어도 한 번에 파싱된다.
+    파싱된 객체 뒤나 오류 위치 이후의 `{`부터 다시 시도하므로 전체적으로 선형 시간이다.
+    """
+    first = None
+    pos = text.find("{")
+    while pos != -1:
+        try:
+            obj, end = _json_decoder.raw_decode(text, pos)
+        except json.JSONDecodeError as e:
+            pos = text.find("{", max(e.pos, pos + 1))
+            continue
+        if isinstance(obj, dict):
+            if expected_key in obj:
+                return obj
+            if first is None:
+                first = obj
+        pos = text.find("{", end)
+    if first is not None:
+        return first
     raise ValueError("No parseable JSON object found in model response")
 
 
-def _normalize_activity_type(value: str) -> str:
-    lowered = (value or "").strip().lower()
-    if lowered in {"meal", "sightseeing", "activity"}:
-        return lowered
-    if any(k in lowered for k in ["식당", "맛집", "meal", "restaurant", "cafe", "카페"]):
-        return "meal"
-    if any(k in lowered for k in ["체험", "activity", "액티비티"]):
-        return "activity"
-    return "sightseeing"
+_JSON_STRUCTURAL_RE = re.compile(r'[{}\[\]":]')
+_JSON_STRING_END_RE = re.compile(r'["\\]')
+
+
+class _JsonStreamExtractor:
+    """스트리밍 청크에서 가장 바깥 JSON 객체를 찾고, days[] 원소가 닫히는 즉시 꺼낸다.
+
+    on_place를 주면 days[].places[] 원소도 닫히는 즉시 알려 준다 (일자가 끝나기 전에 장소 조회를 시작하는 용도).
+
+    구조 문자와 문자열 경계만 정규식으로 건너뛰며 훑기 때문에 이미 본 텍스트를 다시 읽지 않는다.
+    객체 바깥의 설명문, 코드펜스, 객체가 닫힌 뒤의 텍스트는 무시한다.
+    """
+
+    def __init__(self, on_place=None):
+        self.text = ""
+        self._pos = 0
+        self._in_string = False
+        self._string_start = -1
+        self._last_string: str | None = None
+        # (컨테이너 종류, 현재 key, 역할, 시작 위치). 역할은 "days" | "day" | "places" | None
+        self._stack: list[list] = []
+        self._result: dict | None = None
+        # on_place(day_index, raw_place): days[].places[] 원소가 닫힐 때마다 호출된다
+        self._on_place = on_place
+        self._day_count = 0
+
+    @property
+    def done(self) -> bool:
+        return self._result is not None
+
+    def feed(self, chunk: str) -> list[dict]:
+        """청크를 추가하고, 이번에 완성된 days[] 원소들을 돌려준다."""
+        if self._result is not None:
+            return []
+        self.text += chunk
+        text = self.text
+        end = len(text)
+        pos = self._pos
+        stack = self._stack
+        completed = []
+
+        while pos < end:
+            if self._in_string:
+                match = _JSON_STRING_END_RE.search(text, pos)
+                if not match:
+                    pos = end
+                    break
+                if match.group() == "\\":
+                    if match.end() >= end:
+                        # 이스케이프 대상 문자가 아직 도착하지 않았다. 다음 청크에서 다시 본다.
+                        pos = match.start()
+                        break
+                    pos = match.end() + 1
+                    continue
+                self._in_string = False
+                self._last_string = text[self._string_start + 1:match.start()]
+                pos = match.end()
+                continue
+
+            match = _JSON_STRUCTURAL_RE.search(text, pos)
+            if not match:
+                pos = end
+                break
+            ch = match.group()
+            idx = match.start()
+            pos = match.end()
+
+            if not stack:
+                # 객체 바깥(설명문, 코드펜스)은 `{`가 나올 때까지 무시한다
+                if ch == "{":
+                    stack.append(["{", None, False, idx])
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = idx
+            elif ch == ":":
+                if stack[-1][0] == "{":
+                    stack[-1][1] = self._last_string
+            elif ch == "{" or ch == "[":
+                parent = stack[-1]
+                role = None
+                if ch == "[" and len(stack) == 1 and parent[1] == "days":
+                    role = "days"
+                elif ch == "{" and parent[2] == "days":
+                    role = "day"
+                    self._day_count += 1
+                elif ch == "[" and parent[2] == "day" and parent[1] == "places":
+                    role = "places"
+                stack.append([ch, None, role, idx])
+            else:
+                kind, _, _, start = stack.pop()
+                if not stack:
+                    try:
+                        candidate = json.loads(text[start:idx + 1])
+                    except json.JSONDecodeError:
+                        # 설명문 속 중괄호였다. 이어서 다음 후보를 찾는다.
+                        continue
+                    # days가 없는 객체는 설명문 속 예시일 수 있다. 다음 후보를 찾고, 끝내 없으면 result()가 고른다.
+                    if isinstance(candidate, dict) and "days" in candidate:
+                        self._result = candidate
+                        break
+                    continue
+                if kind != "{":
+                    continue
+                parent_role = stack[-1][2]
+                if parent_role == "days":
+                    try:
+                        completed.append(json.loads(text[start:idx + 1]))
+                    except json.JSONDecodeError:
+                        pass
+                elif parent_role == "places" and self._on_place is not None:
+                    try:
+                        raw_place = json.loads(text[start:idx + 1])
+                    except json.JSONDecodeError:
+                        continue
+                    self._on_place(self._day_count, raw_place)
+
+        self._pos = pos
+        return completed
+
+    def result(self) -> dict:
+        if self._result is not None:
+            return self._result
+        # 구조 추적이 어긋난 경우(설명문 속 짝 없는 괄호 등)에도 최종 결과는 얻을 수 있게 한다
+        return _extract_json_object(self.text)
 
 
 _REPEATABLE_HUB_KEYWORDS = [
@@ -146,6 +1072,67 @@ _REPEATABLE_HUB_KEYWORDS = [
     "plaza",
 ]
 
+_MEAL_KEYWORDS = ["식당", "맛집", "meal", "restaurant", "cafe", "카페"]
+_ACTIVITY_KEYWORDS = ["체험", "activity", "액티비티"]
+_EXCLUDED_PLACE_KEYWORDS = ["hotel", "hostel", "accommodation", "숙소", "flight", "airport", "항공"]
+
+_HASHTAG_RULES = [
+    ("#ScenicSpot", ["viewpoint", "observation", "waterfront", "sunset", "panorama", "scenic"]),
+    ("#LocalFavorite", ["local", "popular", "authentic", "hidden"]),
+    ("#PhotoSpot", ["photo", "instagram", "iconic", "landmark"]),
+    ("#CozyCafe", ["cafe", "coffee", "bakery", "dessert"]),
+    ("#VibeRestaurant", ["restaurant", "bistro", "dining", "brasserie", "izakaya", "bbq"]),
+    ("#StreetFood", ["street_food", "food_court", "market"]),
+    ("#CultureTrip", ["museum", "gallery", "historic", "church", "cathedral", "monument"]),
+    ("#NatureWalk", ["park", "garden", "forest", "beach", "lake"]),
+    ("#ShoppingTime", ["shopping", "mall", "market", "plaza"]),
+    ("#NightOut", ["bar", "pub", "club", "night"]),
+]
+
+
+class _KeywordClassifier:
+    """여러 카테고리의 키워드를 Aho-Corasick 오토마톤 하나로 묶어, 텍스트를 한 번 훑어 모든 카테고리를 판정한다.
+
+    겹치는 매치까지 모두 보고하므로 기존 `any(k in text for k in ...)`와 같은 부분 문자열 의미를 유지한다.
+    카테고리가 많은 해시태그 규칙과 활동 유형에만 쓴다. 숙소/항공 제외와 허브 판정처럼 목록 하나만 보는 검사는
+    `any()`가 더 빠르다 (bench/bench_keyword_classifier.py).
+    """
+
+    def __init__(self, categories: dict[str, list[str]]):
+        keyword_categories: dict[str, set[str]] = {}
+        for category, keywords in categories.items():
+            for keyword in keywords:
+                keyword_categories.setdefault(keyword, set()).add(category)
+
+        self._automaton = ahocorasick.Automaton()
+        for keyword, cats in keyword_categories.items():
+            self._automaton.add_word(keyword, frozenset(cats))
+        self._automaton.make_automaton()
+        # 같은 장소 텍스트가 정규화/중복 제거/스트리밍 재정규화에서 반복해서 판정된다
+        self.classify = functools.lru_cache(maxsize=8192)(self._classify)
+
+    def _classify(self, text: str) -> frozenset[str]:
+        return frozenset().union(*[cats for _, cats in self._automaton.iter(text)])
+
+
+_keyword_classifier = _KeywordClassifier({
+    "meal": _MEAL_KEYWORDS,
+    "activity": _ACTIVITY_KEYWORDS,
+    **dict(_HASHTAG_RULES),
+})
+
+
+def _normalize_activity_type(value: str) -> str:
+    lowered = (value or "").strip().lower()
+    if lowered in {"meal", "sightseeing", "activity"}:
+        return lowered
+    categories = _keyword_classifier.classify(lowered)
+    if "meal" in categories:
+        return "meal"
+    if "activity" in categories:
+        return "activity"
+    return "sightseeing"
+
 
 def _normalize_place_key(name: str) -> str:
     normalized = re.sub(r"[^a-z0-9\s]", " ", (name or "").lower())
@@ -153,11 +1140,32 @@ def _normalize_place_key(name: str) -> str:
     return normalized
 
 
+_APOSTROPHE_RE = re.compile(r"['\u2018\u2019\u02bc`\u00b4]")
+_NON_WORD_RE = re.compile(r"[^\w\s]|_")
+
+
+def _canonical_place_key(name: str) -> str:
+    """장소/목적지 조회 캐시와 배치 중복 제거에 쓰는 키. ("St. Peter's Church" == "st peters church")
+
+    _normalize_place_key와 같이 대소문자/구두점/공백 차이를 지우되, 아포스트로피는 공백 없이 붙이고
+    한글 등 ASCII 밖의 글자는 보존한다.
+    """
+    text = unicodedata.normalize("NFKC", name or "").casefold()
+    text = _NON_WORD_RE.sub(" ", _APOSTROPHE_RE.sub("", text))
+    return " ".join(text.split())
+
+
 def _is_repeatable_hub(place_name: str, description: str) -> bool:
     text = f"{place_name} {description}".lower()
     return any(keyword in text for keyword in _REPEATABLE_HUB_KEYWORDS)
 
 
+def _is_excluded_place(place_name: str, description: str) -> bool:
+    # 숙소/항공 항목은 일정에 넣지 않는다
+    text = f"{place_name} {description}".lower()
+    return any(keyword in text for keyword in _EXCLUDED_PLACE_KEYWORDS)
+
+
 def _extract_area_hint(place_name: str, description: str) -> str | None:
     text = f"{place_name} {description}".lower()
     patterns = [
@@ -175,8 +1183,10 @@ def _extract_area_hint(place_name: str, description: str) -> str | None:
     return None
 
 
-def _de_duplicate_non_hub_places(days: list[dict]) -> list[dict]:
-    seen_non_hub: set[str] = set()
+def _de_duplicate_non_hub_places(days: list[dict], seen_non_hub: set[str] | None = None) -> list[dict]:
+    # seen_non_hub를 넘기면 이전에 처리한 일자의 장소까지 이어서 중복 판정한다 (스트리밍용)
+    if seen_non_hub is None:
+        seen_non_hub = set()
     for day in days:
         places = day.get("places", [])
         if not places:
@@ -207,22 +1217,35 @@ def _de_duplicate_non_hub_places(days: list[dict]) -> list[dict]:
     return days
 
 
+def _non_hub_place_keys(days: list[dict]) -> set[str]:
+    """_de_duplicate_non_hub_places의 seen_non_hub로 넘길, 이미 쓰인 허브가 아닌 장소 키."""
+    keys = set()
+    for day in days:
+        for place in day.get("places", []):
+            place_name = place.get("placeName", "")
+            key = _normalize_place_key(place_name)
+            if key and not _is_repeatable_hub(place_name, place.get("description", "")):
+                keys.add(key)
+    return keys
+
+
+def _dominant_area(day: dict) -> str | None:
+    scores: dict[str, int] = {}
+    for place in day.get("places", []):
+        hint = _extract_area_hint(place.get("placeName", ""), place.get("description", ""))
+        if not hint:
+            continue
+        scores[hint] = scores.get(hint, 0) + 1
+    if not scores:
+        return None
+    return max(scores.items(), key=lambda x: x[1])[0]
+
+
 def _reorder_days_for_area_variety(days: list[dict]) -> list[dict]:
     if len(days) < 4:
         return days
 
-    def dominant_area(day: dict) -> str | None:
-        scores: dict[str, int] = {}
-        for place in day.get("places", []):
-            hint = _extract_area_hint(place.get("placeName", ""), place.get("description", ""))
-            if not hint:
-                continue
-            scores[hint] = scores.get(hint, 0) + 1
-        if not scores:
-            return None
-        return max(scores.items(), key=lambda x: x[1])[0]
-
-    remaining = [{"day": day, "area": dominant_area(day)} for day in days]
+    remaining = [{"day": day, "area": _dominant_area(day)} for day in days]
     unique_areas = {entry["area"] for entry in remaining if entry["area"]}
     if len(unique_areas) < 2:
         return days
@@ -243,39 +1266,43 @@ def _reorder_days_for_area_variety(days: list[dict]) -> list[dict]:
     return result
 
 
-def _normalize_plan_schema(plan_data: dict, requested_days: int, destination: str, style: str):
-    raw_days = plan_data.get("days", [])
-    normalized_days = []
+def _normalize_day(raw_day: dict, day_index: int) -> dict:
+    places = raw_day.get("places", [])
+    normalized_places = []
 
-    for day_index, raw_day in enumerate(raw_days, start=1):
-        places = raw_day.get("places", [])
-        normalized_places = []
+    for place_index, raw_place in enumerate(places):
+        try:
+            duration_min = int(raw_place.get("durationMin", 90))
+        except (TypeError, ValueError):
+            duration_min = 90
 
-        for place_index, raw_place in enumerate(places):
-            try:
-                duration_min = int(raw_place.get("durationMin", 90))
-            except (TypeError, ValueError):
-                duration_min = 90
+        activity_type = _normalize_activity_type(
+            raw_place.get("activityType") or raw_place.get("theme") or ""
+        )
+        if _is_excluded_place(raw_place.get("placeName", ""), raw_place.get("description", "")):
+            continue
 
-            activity_type = _normalize_activity_type(
-                raw_place.get("activityType") or raw_place.get("theme") or ""
-            )
-            text = f"{raw_place.get('placeName', '')} {raw_place.get('description', '')}".lower()
-            if any(k in text for k in ["hotel", "hostel", "accommodation", "숙소", "flight", "airport", "항공"]):
-                continue
+        normalized_places.append({
+            "order": place_index,
+            "placeName": raw_place.get("placeName", "").strip(),
+            "description": raw_place.get("description", "").strip(),
+            "activityType": activity_type,
+            "durationMin": duration_min if duration_min > 0 else 90
+        })
 
-            normalized_places.append({
-                "order": place_index,
-                "placeName": raw_place.get("placeName", "").strip(),
-                "description": raw_place.get("description", "").strip(),
-                "activityType": activity_type,
-                "durationMin": duration_min if duration_min > 0 else 90
-            })
+    return {
+        "dayNumber": int(raw_day.get("dayNumber", raw_day.get("day", day_index))),
+        "places": normalized_places
+    }
 
-        normalized_days.append({
-            "dayNumber": int(raw_day.get("dayNumber", raw_day.get("day", day_index))),
-            "places": normalized_places
-        })
+
+@metrics.timed("normalize_plan")
+def _normalize_plan_schema(plan_data: dict, requested_days: int, destination: str, style: str):
+    raw_days = plan_data.get("days", [])
+    normalized_days = [
+        _normalize_day(raw_day, day_index)
+        for day_index, raw_day in enumerate(raw_days, start=1)
+    ]
 
     if requested_days > 0:
         normalized_days = normalized_days[:requested_days]
@@ -294,19 +1321,239 @@ def _normalize_plan_schema(plan_data: dict, requested_days: int, destination: st
     title = plan_data.get("title") or f"{destination} {style} 여행"
     return {"title": title, "days": normalized_days}
 
-def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
-    from math import radians, sin, cos, sqrt, atan2
+EARTH_RADIUS_KM = 6371.0
 
-    r = 6371.0
+
+def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
     d_lat = radians(lat2 - lat1)
     d_lon = radians(lon2 - lon1)
     a = sin(d_lat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(d_lon / 2) ** 2
     c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    return r * c
+    return EARTH_RADIUS_KM * c
+
+
+def _haversine_matrix_km(latitudes, longitudes) -> "np.ndarray":
+    """모든 좌표 쌍의 haversine 거리(km)를 한 번에 계산한 n x n 행렬."""
+    # numpy는 import 비용이 커서 경로 최적화를 처음 쓸 때 불러온다
+    import numpy as np
+
+    lat = np.radians(np.asarray(latitudes, dtype=float))
+    lon = np.radians(np.asarray(longitudes, dtype=float))
+    d_lat = lat[:, None] - lat[None, :]
+    d_lon = lon[:, None] - lon[None, :]
+    a = np.sin(d_lat / 2) ** 2 + np.cos(lat)[:, None] * np.cos(lat)[None, :] * np.sin(d_lon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _route_length(route: list[int], dist: list[list[float]]) -> float:
+    return sum(dist[a][b] for a, b in zip(route, route[1:]))
+
+
+def _two_opt_movable(route: list[int], movable_slots: list[int], dist: list[list[float]]) -> list[int]:
+    """movable_slots 위치의 장소들만 구간 뒤집기(2-opt)로 재배치한다. 나머지 위치는 고정."""
+    best = list(route)
+    best_length = _route_length(best, dist)
+    improved = True
+    while improved:
+        improved = False
+        for i in range(len(movable_slots) - 1):
+            for k in range(i + 1, len(movable_slots)):
+                slots = movable_slots[i:k + 1]
+                candidate = list(best)
+                for slot, value in zip(slots, reversed([best[s] for s in slots])):
+                    candidate[slot] = value
+                length = _route_length(candidate, dist)
+                if length + 1e-9 < best_length:
+                    best, best_length = candidate, length
+                    improved = True
+    return best
+
+
+def _optimize_route(dist: list[list[float]], fixed: list[bool]) -> list[int]:
+    """첫 장소와 fixed 위치는 그대로 두고, 나머지를 nearest-neighbour + 2-opt로 정렬한 인덱스 순서를 돌려준다."""
+    n = len(dist)
+    movable_slots = [i for i in range(1, n) if not fixed[i]]
+    if len(movable_slots) < 2:
+        return list(range(n))
+
+    # nearest-neighbour: 빈 자리를 앞에서부터 채우되, 직전 장소에서 가장 가까운 후보를 고른다
+    route = list(range(n))
+    remaining = list(movable_slots)
+    for slot in movable_slots:
+        prev = route[slot - 1]
+        nearest = min(remaining, key=lambda j: dist[prev][j])
+        remaining.remove(nearest)
+        route[slot] = nearest
+
+    # 모델이 준 원래 순서도 2-opt로 다듬어 더 짧은 쪽을 쓴다
+    candidates = [
+        _two_opt_movable(route, movable_slots, dist),
+        _two_opt_movable(list(range(n)), movable_slots, dist),
+    ]
+    return min(candidates, key=lambda r: _route_length(r, dist))
+
+
+def _place_coordinates(place: dict, place_details: dict[str, dict]) -> tuple[float, float] | None:
+    details = place_details.get(place.get("placeName", "")) or {}
+    location = details.get("location") if details.get("found") else None
+    location = location or place.get("location") or {}
+    lat = location.get("latitude", location.get("lat"))
+    lng = location.get("longitude", location.get("lng"))
+    if lat is None or lng is None:
+        return None
+    return float(lat), float(lng)
+
+
+def _optimize_day_route(day: dict, place_details: dict[str, dict]) -> dict:
+    """하루 일정의 이동 거리를 줄이도록 places를 재정렬하고 order, 구간별/총 거리를 채운다.
+
+    식사 장소는 시간대 흐름(점심/저녁)을 지키기 위해, 좌표를 못 찾은 장소는 판단 근거가 없어서 제자리에 둔다.
+    """
+    places = day.get("places", [])
+    resolved = [(idx, coords) for idx, place in enumerate(places)
+                if (coords := _place_coordinates(place, place_details)) is not None]
+
+    route_info = {"legsKm": [], "totalKm": 0.0, "originalTotalKm": 0.0}
+    if len(resolved) >= 2:
+        dist_matrix = _haversine_matrix_km([c[0] for _, c in resolved], [c[1] for _, c in resolved])
+        dist = dist_matrix.tolist()
+        fixed = [places[idx].get("activityType") == "meal" for idx, _ in resolved]
+        order = _optimize_route(dist, fixed)
+
+        reordered = list(places)
+        for position, picked in enumerate(order):
+            reordered[resolved[position][0]] = places[resolved[picked][0]]
+        places = reordered
+
+        legs = [dist[a][b] for a, b in zip(order, order[1:])]
+        route_info = {
+            "legsKm": [round(leg, 3) for leg in legs],
+            "totalKm": round(sum(legs), 3),
+            "originalTotalKm": round(_route_length(list(range(len(order))), dist), 3),
+        }
 
-def _search_text(payload: dict, headers: dict):
-    url = "https://places.googleapis.com/v1/places:searchText"
-    response = requests.post(url, json=payload, headers=headers, timeout=15)
+    optimized_places = [{**place, "order": idx} for idx, place in enumerate(places)]
+    return {**day, "places": optimized_places, "route": route_info}
+
+
+def _places_backoff_delay(attempt: int, response: httpx.Response) -> float:
+    # full jitter. Retry-After가 있으면 그보다 일찍 다시 보내지 않는다.
+    delay = random.uniform(0, min(PLACES_BACKOFF_MAX_SEC, PLACES_BACKOFF_BASE_SEC * (2 ** attempt)))
+    retry_after = response.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        delay = max(delay, min(PLACES_BACKOFF_MAX_SEC, float(retry_after)))
+    return delay
+
+
+class LatencyWindow:
+    """최근 size개 지연 표본의 분위수. 정렬은 refresh_every개가 새로 쌓였을 때만 다시 한다."""
+
+    def __init__(self, size: int = 1000, refresh_every: int = 32):
+        self._samples: deque[float] = deque(maxlen=size)
+        self._refresh_every = refresh_every
+        self._since_refresh = 0
+        self._sorted: list[float] = []
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+        self._since_refresh += 1
+
+    def quantile(self, q: float) -> float | None:
+        if not self._samples:
+            return None
+        if self._since_refresh >= self._refresh_every or len(self._sorted) != len(self._samples):
+            self._sorted = sorted(self._samples)
+            self._since_refresh = 0
+        return self._sorted[min(len(self._sorted) - 1, int(q * len(self._sorted)))]
+
+
+places_search_latency = LatencyWindow()
+places_hedge_counters = {"requests": 0, "hedged": 0, "hedgeWins": 0}
+
+
+def _places_hedge_delay() -> float | None:
+    if not PLACES_HEDGE_ENABLED or len(places_search_latency) < PLACES_HEDGE_MIN_SAMPLES:
+        return None
+    if places_hedge_counters["hedged"] >= PLACES_HEDGE_MAX_RATIO * places_hedge_counters["requests"]:
+        return None
+    return max(PLACES_HEDGE_MIN_DELAY_MS / 1000, places_search_latency.quantile(PLACES_HEDGE_QUANTILE))
+
+
+async def _post_search_text(http_client: httpx.AsyncClient, payload: dict, headers: dict) -> httpx.Response:
+    """searchText 한 번. 응답이 hedge 기준 시간을 넘기면 같은 요청을 하나 더 보내 먼저 성공한 쪽을 쓴다.
+
+    호출자가 _places_semaphore 슬롯 하나를 쥔 채로 부른다. hedge는 슬롯이 남아 있을 때만 하나를 더 잡아 보내므로
+    동시 호출 상한(= 연결 풀 크기)을 넘지 않는다.
+    """
+    places_hedge_counters["requests"] += 1
+    started = time.monotonic()
+    hedge_delay = _places_hedge_delay()
+    primary = asyncio.ensure_future(http_client.post(PLACES_SEARCH_URL, json=payload, headers=headers))
+    hedge = None
+    pending = {primary}
+
+    def accept(task: asyncio.Task, response: httpx.Response) -> httpx.Response:
+        if hedge is not None:
+            places_hedge_counters["hedgeWins"] += int(task is hedge)
+            metrics.inc("places_hedges_total", outcome="hedge" if task is hedge else "primary")
+        if response.status_code not in PLACES_RETRY_STATUS_CODES:
+            places_search_latency.observe(time.monotonic() - started)
+        return response
+
+    try:
+        if hedge_delay is not None:
+            done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+            # 슬롯이 다 찼으면 토큰을 쓰지 않고 건너뛴다. locked()가 아니면 acquire()는 기다리지 않는다.
+            if not done and not _places_semaphore.locked() and places_governor.try_acquire():
+                await _places_semaphore.acquire()
+                places_hedge_counters["hedged"] += 1
+                hedge = asyncio.ensure_future(http_client.post(PLACES_SEARCH_URL, json=payload, headers=headers))
+                hedge.add_done_callback(lambda _: _places_semaphore.release())
+                pending.add(hedge)
+
+        # 한쪽이 전송 오류나 429/503으로 끝나면 다른 쪽을 마저 기다린다. 둘 다 그렇게 끝나면 429/503 응답을
+        # 돌려줘 호출자가 백오프하게 한다.
+        error = None
+        retryable = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    error = error or task.exception()
+                    continue
+                response = task.result()
+                if response.status_code in PLACES_RETRY_STATUS_CODES:
+                    retryable = retryable or (task, response)
+                    continue
+                return accept(task, response)
+        if retryable is not None:
+            return accept(*retryable)
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+@metrics.timed("places_search_text")
+async def _search_text(payload: dict, headers: dict, priority: int = PLACES_PRIORITY_BULK):
+    http_client = _get_places_http_client()
+    for attempt in range(PLACES_MAX_RETRIES + 1):
+        waited = await places_governor.acquire(priority)
+        metrics.observe("places_governor_wait_seconds", waited, priority=str(priority))
+        async with _places_semaphore:
+            try:
+                response = await _post_search_text(http_client, payload, headers)
+            except httpx.HTTPError:
+                metrics.inc("upstream_requests_total", upstream="places", status="transport_error")
+                raise
+        metrics.inc("upstream_requests_total", upstream="places", status=str(response.status_code))
+        if response.status_code not in PLACES_RETRY_STATUS_CODES or attempt == PLACES_MAX_RETRIES:
+            break
+        metrics.inc("places_retries_total", status=str(response.status_code))
+        await asyncio.sleep(_places_backoff_delay(attempt, response))
     response.raise_for_status()
     data = response.json()
     return data.get("places", [])
@@ -318,29 +1565,26 @@ def _build_places_headers():
         "X-Goog-FieldMask": "places.id,places.displayName,places.formattedAddress,places.rating,places.userRatingCount,places.photos,places.location,places.businessStatus,places.types,places.primaryType,places.primaryTypeDisplayName,places.editorialSummary"
     }
 
-def _get_cache(cache: dict, key: str):
-    hit = cache.get(key)
-    if not hit:
-        return None
-    cached_at, value = hit
-    if time.time() - cached_at > PLACE_CACHE_TTL_SEC:
-        del cache[key]
-        return None
-    return value
-
-def _set_cache(cache: dict, key: str, value: dict):
-    cache[key] = (time.time(), value)
-
-def _resolve_destination_center(destination: str, headers: dict):
-    normalized_destination = destination.strip().lower()
+async def _resolve_destination_center(destination: str, headers: dict, priority: int = PLACES_PRIORITY_CENTER):
+    normalized_destination = _canonical_place_key(destination)
     if not normalized_destination:
         return None
 
-    cached = _get_cache(destination_center_cache, normalized_destination)
+    cached = await _cache_lookup(destination_center_cache, normalized_destination)
+    if priority != PLACES_PRIORITY_PREWARM:
+        cache_prewarmer.observe("center", normalized_destination, bool(cached))
     if cached:
         return cached
 
-    destination_candidates = _search_text({"textQuery": destination}, headers)
+    return await destination_center_flight.do(
+        normalized_destination,
+        lambda: _fetch_destination_center(destination, normalized_destination, headers, priority),
+        background=priority == PLACES_PRIORITY_PREWARM,
+    )
+
+
+async def _fetch_destination_center(destination: str, normalized_destination: str, headers: dict, priority: int):
+    destination_candidates = await _search_text({"textQuery": destination}, headers, priority)
     if not destination_candidates:
         return None
 
@@ -352,48 +1596,31 @@ def _resolve_destination_center(destination: str, headers: dict):
         "latitude": loc.get("latitude"),
         "longitude": loc.get("longitude"),
     }
-    _set_cache(destination_center_cache, normalized_destination, center)
+    _cache_store(destination_center_cache, normalized_destination, center)
     return center
 
+def _hashtags_from_place(meta: dict) -> list[str]:
+    text = " ".join([
+        ((meta.get("displayName") or {}).get("text") or ""),
+        (meta.get("formattedAddress") or ""),
+        ((meta.get("editorialSummary") or {}).get("text") or ""),
+        " ".join(meta.get("types") or []),
+        str(meta.get("primaryType") or ""),
+        str(((meta.get("primaryTypeDisplayName") or {}).get("text") or "")),
+    ]).lower()
+
+    categories = _keyword_classifier.classify(text)
+    tags = [tag for tag, _ in _HASHTAG_RULES if tag in categories][:3]
+
+    if not tags:
+        tags = ["#MustVisit"]
+    return tags
+
+
 def _to_place_response(place: dict):
     photo_url = None
     if "photos" in place and len(place["photos"]) > 0:
-        photo_ref = place["photos"][0]["name"]
-        photo_url = f"https://places.googleapis.com/v1/{photo_ref}/media?maxHeightPx=400&maxWidthPx=400&key={MAPS_API_KEY}"
-
-    def _hashtags_from_place(meta: dict) -> list[str]:
-        text = " ".join([
-            ((meta.get("displayName") or {}).get("text") or ""),
-            (meta.get("formattedAddress") or ""),
-            ((meta.get("editorialSummary") or {}).get("text") or ""),
-            " ".join(meta.get("types") or []),
-            str(meta.get("primaryType") or ""),
-            str(((meta.get("primaryTypeDisplayName") or {}).get("text") or "")),
-        ]).lower()
-
-        tag_rules = [
-            ("#ScenicSpot", ["viewpoint", "observation", "waterfront", "sunset", "panorama", "scenic"]),
-            ("#LocalFavorite", ["local", "popular", "authentic", "hidden"]),
-            ("#PhotoSpot", ["photo", "instagram", "iconic", "landmark"]),
-            ("#CozyCafe", ["cafe", "coffee", "bakery", "dessert"]),
-            ("#VibeRestaurant", ["restaurant", "bistro", "dining", "brasserie", "izakaya", "bbq"]),
-            ("#StreetFood", ["street_food", "food_court", "market"]),
-            ("#CultureTrip", ["museum", "gallery", "historic", "church", "cathedral", "monument"]),
-            ("#NatureWalk", ["park", "garden", "forest", "beach", "lake"]),
-            ("#ShoppingTime", ["shopping", "mall", "market", "plaza"]),
-            ("#NightOut", ["bar", "pub", "club", "night"]),
-        ]
-
-        tags = []
-        for tag, keywords in tag_rules:
-            if any(keyword in text for keyword in keywords):
-                tags.append(tag)
-            if len(tags) >= 3:
-                break
-
-        if not tags:
-            tags = ["#MustVisit"]
-        return tags[:3]
+        photo_url = _photo_url(place["photos"][0]["name"])
 
     return {
         "found": True,
@@ -407,33 +1634,8 @@ def _to_place_response(place: dict):
         "hashtags": _hashtags_from_place(place),
     }
 
-def _resolve_place_details(place_name: str, destination: str, headers: dict, destination_center: dict | None):
-    cache_key = f"{place_name.strip().lower()}::{destination.strip().lower()}"
-    cached = _get_cache(place_details_cache, cache_key)
-    if cached:
-        return cached
-
-    payload = {"textQuery": place_name}
-    if destination_center:
-        payload["locationBias"] = {
-            "circle": {
-                "center": destination_center,
-                "radius": 50000.0
-            }
-        }
-
-    candidates = _search_text(payload, headers)
-    if not candidates and destination:
-        candidates = _search_text(
-            {"textQuery": f"{place_name}, {destination}"},
-            headers
-        )
-
-    if not candidates:
-        result = {"found": False}
-        _set_cache(place_details_cache, cache_key, result)
-        return result
-
+def _rank_candidates(candidates: list[dict], destination: str, destination_center: dict | None) -> list[tuple[int, dict]]:
+    """검색 후보를 목적지 주소 일치, 중심 좌표와의 거리, 영업 상태로 점수화해 높은 순으로 돌려준다."""
     normalized_destination = destination.lower()
     ranked = []
     for place in candidates:
@@ -462,141 +1664,2911 @@ def _resolve_place_details(place_name: str, destination: str, headers: dict, des
         ranked.append((score, place))
 
     ranked.sort(key=lambda x: x[0], reverse=True)
-    best_score, best_place = ranked[0]
-    if best_score < 0:
-        result = {"found": False}
-        _set_cache(place_details_cache, cache_key, result)
-        return result
+    return ranked
 
-    result = _to_place_response(best_place)
-    _set_cache(place_details_cache, cache_key, result)
-    return result
 
+# 목적지별 fallback(`"{이름}, {목적지}"`) 쿼리 학습 설정
+PLACE_FALLBACK_MIN_SAMPLES = int(os.getenv("PLACE_FALLBACK_MIN_SAMPLES", "12"))
+PLACE_FALLBACK_MIN_HIT_RATE = float(os.getenv("PLACE_FALLBACK_MIN_HIT_RATE", "0.15"))
+PLACE_FALLBACK_PROBE_RATE = 0.1
+PLACE_FALLBACK_DECAY = 0.97
+PLACE_FALLBACK_MAX_DESTINATIONS = 5000
 
-@app.post("/api/plans/generate")
-@app.post("/api/generate-plan")
-async def generate_plan(request: PlanRequest):
-    print(f"[Request] {request.destination}, {request.month}, {request.transportation}")
 
-    if not client:
-        raise HTTPException(status_code=500, detail="Gen AI Client not initialized")
+class FallbackQueryPolicy:
+    """목적지별로 fallback 쿼리가 실제로 장소를 찾아준 비율을 학습해, 거의 도움이 안 되는 목적지에서는 건너뛴다.
 
-    try:
-        use_web_search = request.useWebSearch
-        tool_instruction = (
-            "Use Google Search tool to verify real-world availability and recency before suggesting places."
-            if use_web_search
-            else "Do not browse the web. Generate a practical and coherent plan quickly."
+    시도/적중 횟수는 감쇠 합계로 유지해 최근 결과에 더 무게를 둔다. 건너뛰는 목적지에서도
+    probe_rate 비율로는 계속 시도해 추정치가 회복될 수 있게 한다.
+    """
+
+    def __init__(self, min_samples: int, min_hit_rate: float, probe_rate: float, decay: float, max_destinations: int):
+        self.min_samples = min_samples
+        self.min_hit_rate = min_hit_rate
+        self.probe_rate = probe_rate
+        self.decay = decay
+        self.max_destinations = max_destinations
+        self._stats: OrderedDict[str, list[float]] = OrderedDict()
+        self.attempts = 0
+        self.hits = 0
+        self.skipped = 0
+
+    def should_try(self, destination_key: str) -> bool:
+        stats = self._stats.get(destination_key)
+        if stats is None or stats[0] < self.min_samples or stats[1] / stats[0] >= self.min_hit_rate:
+            return True
+        if random.random() < self.probe_rate:
+            return True
+        self.skipped += 1
+        metrics.inc("place_fallback_total", outcome="skipped")
+        return False
+
+    def record(self, destination_key: str, found: bool):
+        stats = self._stats.get(destination_key)
+        if stats is None:
+            stats = self._stats[destination_key] = [0.0, 0.0]
+            if len(self._stats) > self.max_destinations:
+                self._stats.popitem(last=False)
+        self._stats.move_to_end(destination_key)
+        stats[0] = stats[0] * self.decay + 1
+        stats[1] = stats[1] * self.decay + (1 if found else 0)
+        self.attempts += 1
+        self.hits += int(found)
+        metrics.inc("place_fallback_total", outcome="hit" if found else "miss")
+
+    def stats(self) -> dict:
+        return {
+            "attempts": self.attempts,
+            "hits": self.hits,
+            "hitRate": round(self.hits / self.attempts, 4) if self.attempts else 0.0,
+            "skipped": self.skipped,
+            "destinations": len(self._stats),
+            "skippingDestinations": sum(
+                1 for attempts, hits in self._stats.values()
+                if attempts >= self.min_samples and hits / attempts < self.min_hit_rate
+            ),
+        }
+
+
+place_fallback_policy = FallbackQueryPolicy(
+    PLACE_FALLBACK_MIN_SAMPLES,
+    PLACE_FALLBACK_MIN_HIT_RATE,
+    PLACE_FALLBACK_PROBE_RATE,
+    PLACE_FALLBACK_DECAY,
+    PLACE_FALLBACK_MAX_DESTINATIONS,
+)
+# 캐시/single-flight를 통과해 실제로 조회한 장소 수와 그에 든 searchText 호출 수
+place_lookup_counters = {"fetches": 0, "searchCalls": 0}
+
+
+# 목적지별 장소 카탈로그. 앞서 찾은 장소와 넓은 검색("top tourist attractions in X")의 결과를 모아 두고,
+# 이름이 충분히 비슷하면(trigram Dice 유사도) searchText 없이 답한다. 나머지는 기존 조회 경로로 간다.
+PLACE_CATALOG_ENABLED = os.getenv("PLACE_CATALOG_ENABLED", "true").lower() in {"1", "true", "yes"}
+# 이보다 유사도가 낮으면 카탈로그 결과를 쓰지 않는다. 1.0이면 표기 정규화 키가 같은 경우만 쓴다.
+PLACE_CATALOG_MIN_SIMILARITY = float(os.getenv("PLACE_CATALOG_MIN_SIMILARITY", "0.85"))
+PLACE_CATALOG_TTL_SEC = int(os.getenv("PLACE_CATALOG_TTL_SEC", str(PLACE_CACHE_TTL_SEC)))
+PLACE_CATALOG_MAX_DESTINATIONS = int(os.getenv("PLACE_CATALOG_MAX_DESTINATIONS", "500"))
+PLACE_CATALOG_MAX_ENTRIES = int(os.getenv("PLACE_CATALOG_MAX_ENTRIES", "2000"))
+# 유사도 매칭(정확히 같은 키가 아닌 경우) 결과는 메모리 캐시에만, 이 시간만큼만 둔다.
+# 잘못 매칭된 결과가 영구 캐시로 다른 워커와 재시작 뒤까지 퍼지지 않게 한다.
+PLACE_CATALOG_FUZZY_TTL_SEC = int(os.getenv("PLACE_CATALOG_FUZZY_TTL_SEC", str(PLACE_CACHE_NEGATIVE_TTL_SEC)))
+# 목적지를 처음 볼 때 한 번씩 보내는 넓은 검색. 비우면 앞서 찾은 장소만으로 카탈로그를 만든다.
+PLACE_CATALOG_SEED_QUERIES = [
+    query.strip()
+    for query in os.getenv(
+        "PLACE_CATALOG_SEED_QUERIES", "top tourist attractions in {destination}|best restaurants in {destination}"
+    ).split("|")
+    if query.strip()
+]
+# 유사도 계산에서 의미 없는 아주 짧은 키는 정확히 같을 때만 쓴다
+PLACE_CATALOG_MIN_FUZZY_KEY_LEN = 6
+# 카탈로그 키에서 빼는 관사 ("The Helsinki Cathedral" == "Helsinki Cathedral")
+_CATALOG_FILLER_WORDS = {"the", "a", "an"}
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def _catalog_key(name_key: str) -> str:
+    return " ".join(word for word in name_key.split() if word not in _CATALOG_FILLER_WORDS)
+
+
+def _catalog_shape(key: str) -> tuple[int, tuple[str, ...]]:
+    # 단어 수와 번호가 다르면 비슷해도 다른 장소로 본다
+    # ("Restaurant Savoy Bar" / "Restaurant Savoy", "Pier 39" / "Pier 33")
+    return len(key.split()), tuple(_DIGITS_RE.findall(key))
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PlaceCatalog:
+    """목적지 하나의 장소 모음. 키는 _canonical_place_key에서 관사를 뺀 형태이다.
+
+    trigram -> 키 역색인에서 드문 trigram부터 몇 개만 훑어 후보를 모은다 (prefix filtering).
+    Dice 유사도가 t 이상이려면 공유 trigram이 t|A|/(2-t)개 이상이어야 하므로, 가장 드문
+    |A| - 그 수 + 1개의 trigram 중 하나는 반드시 공유한다.
+    """
+
+    def __init__(self):
+        self.created_at = time.time()
+        self.seeded = False
+        self.places: dict[str, dict] = {}
+        self._grams: dict[str, set[str]] = {}
+        self._shapes: dict[str, tuple] = {}
+        self._postings: dict[str, set[str]] = {}
+
+    def add(self, name_key: str, place: dict, max_entries: int):
+        key = _catalog_key(name_key)
+        if not key:
+            return
+        if key in self.places:
+            self.places[key] = place
+            return
+        if len(self.places) >= max_entries:
+            return
+        grams = _trigrams(key)
+        self.places[key] = place
+        self._grams[key] = grams
+        self._shapes[key] = _catalog_shape(key)
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(key)
+
+    def match(self, name_key: str, min_similarity: float) -> tuple[dict, float] | None:
+        """(장소, 유사도). 유사도가 min_similarity 미만이면 None."""
+        key = _catalog_key(name_key)
+        place = self.places.get(key)
+        if place is not None:
+            return place, 1.0
+        if min_similarity >= 1.0 or len(key) < PLACE_CATALOG_MIN_FUZZY_KEY_LEN:
+            return None
+
+        grams = _trigrams(key)
+        required = ceil(min_similarity * len(grams) / (2 - min_similarity))
+        rare_first = sorted(grams, key=lambda gram: len(self._postings.get(gram, ())))
+        candidates = set()
+        for gram in rare_first[:len(grams) - required + 1]:
+            candidates.update(self._postings.get(gram, ()))
+
+        shape = _catalog_shape(key)
+        best_key, best_score = None, 0.0
+        for candidate in candidates:
+            if self._shapes[candidate] != shape:
+                continue
+            other = self._grams[candidate]
+            score = 2 * len(grams & other) / (len(grams) + len(other))
+            if score > best_score:
+                best_key, best_score = candidate, score
+        if best_key is None or best_score < min_similarity:
+            return None
+        return self.places[best_key], best_score
+
+
+class PlaceCatalogStore:
+    """목적지 키 -> PlaceCatalog. 목적지 수는 LRU로, 카탈로그 수명은 TTL로 제한한다."""
+
+    def __init__(self, max_destinations: int, max_entries: int, ttl_sec: int, min_similarity: float):
+        self.max_destinations = max_destinations
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.min_similarity = min_similarity
+        self._catalogs: OrderedDict[str, PlaceCatalog] = OrderedDict()
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+        self.seed_calls = 0
+
+    def catalog(self, destination_key: str) -> PlaceCatalog:
+        catalog = self._catalogs.get(destination_key)
+        if catalog is not None and time.time() - catalog.created_at > self.ttl_sec:
+            catalog = None
+        if catalog is None:
+            catalog = self._catalogs[destination_key] = PlaceCatalog()
+            if len(self._catalogs) > self.max_destinations:
+                self._catalogs.popitem(last=False)
+        self._catalogs.move_to_end(destination_key)
+        return catalog
+
+    def lookup(self, destination_key: str, name_key: str) -> tuple[dict, float] | None:
+        """(장소, 유사도). 충분히 비슷한 장소가 없으면 None."""
+        match = self.catalog(destination_key).match(name_key, self.min_similarity)
+        if match is None:
+            self.misses += 1
+            return None
+        similarity = match[1]
+        if similarity >= 1.0:
+            self.exact_hits += 1
+        else:
+            self.fuzzy_hits += 1
+        metrics.inc("place_catalog_hits_total", match="exact" if similarity >= 1.0 else "fuzzy")
+        return match
+
+    def remember(self, destination_key: str, name_keys: list[str], place: dict):
+        catalog = self.catalog(destination_key)
+        for key in name_keys:
+            if key:
+                catalog.add(key, place, self.max_entries)
+
+    def stats(self) -> dict:
+        lookups = self.exact_hits + self.fuzzy_hits + self.misses
+        return {
+            "enabled": PLACE_CATALOG_ENABLED,
+            "destinations": len(self._catalogs),
+            "entries": sum(len(catalog.places) for catalog in self._catalogs.values()),
+            "exactHits": self.exact_hits,
+            "fuzzyHits": self.fuzzy_hits,
+            "misses": self.misses,
+            "hitRate": round((self.exact_hits + self.fuzzy_hits) / lookups, 4) if lookups else 0.0,
+            "seedCalls": self.seed_calls,
+        }
+
+
+place_catalog = PlaceCatalogStore(
+    PLACE_CATALOG_MAX_DESTINATIONS, PLACE_CATALOG_MAX_ENTRIES, PLACE_CATALOG_TTL_SEC, PLACE_CATALOG_MIN_SIMILARITY
+)
+
+
+async def _seed_place_catalog(
+    destination: str,
+    destination_key: str,
+    headers: dict,
+    destination_center: dict | None,
+    priority: int,
+):
+    for template in PLACE_CATALOG_SEED_QUERIES:
+        payload = {"textQuery": template.format(destination=destination)}
+        if destination_center:
+            payload["locationBias"] = {"circle": {"center": destination_center, "radius": 50000.0}}
+        try:
+            candidates = await _search_text(payload, headers, priority)
+        except Exception as e:
+            print(f"Place catalog seed query failed for {destination}: {e}")
+            continue
+        place_catalog.seed_calls += 1
+        for score, place in _rank_candidates(candidates, destination, destination_center):
+            if score < 0:
+                continue
+            name = (place.get("displayName") or {}).get("text") or ""
+            place_catalog.remember(destination_key, [_canonical_place_key(name)], _to_place_response(place))
+
+
+def _place_details_cache_key(name_key: str, destination_key: str) -> str:
+    return f"{name_key}::{destination_key}"
+
+
+@metrics.timed("resolve_place_details")
+async def _resolve_place_details(
+    place_name: str,
+    destination: str,
+    headers: dict,
+    destination_center: dict | None,
+    priority: int = PLACES_PRIORITY_BULK,
+    cache_checked: bool = False,
+):
+    name_key = _canonical_place_key(place_name)
+    destination_key = _canonical_place_key(destination)
+    cache_key = _place_details_cache_key(name_key, destination_key)
+    if cache_checked:
+        # 호출자가 이미 캐시를 보고 통계에 반영했다. 그 사이에 채워졌는지만 확인한다.
+        cached = place_details_cache.peek(cache_key)
+    else:
+        cached = await _cache_lookup(place_details_cache, cache_key)
+        if priority != PLACES_PRIORITY_PREWARM:
+            cache_prewarmer.observe("place", cache_key, bool(cached))
+    if cached:
+        return cached
+
+    if PLACE_CATALOG_ENABLED and destination_key and name_key:
+        match = place_catalog.lookup(destination_key, name_key)
+        if match is not None:
+            matched, similarity = match
+            if similarity >= 1.0:
+                _cache_store(place_details_cache, cache_key, matched)
+            else:
+                place_details_cache.set(cache_key, matched, ttl_sec=PLACE_CATALOG_FUZZY_TTL_SEC)
+            return matched
+        catalog = place_catalog.catalog(destination_key)
+        if PLACE_CATALOG_SEED_QUERIES and not catalog.seeded:
+            # 이번 요청은 기다리지 않는다. 다음 조회부터 카탈로그가 채워져 있다.
+            catalog.seeded = True
+            _spawn_background(_seed_place_catalog(
+                destination, destination_key, headers, destination_center, max(priority, PLACES_PRIORITY_BULK)
+            ))
+
+    return await place_details_flight.do(
+        cache_key,
+        lambda: _fetch_place_details(place_name, destination, headers, destination_center, cache_key, priority),
+        background=priority == PLACES_PRIORITY_PREWARM,
+    )
+
+
+async def _fetch_place_details(
+    place_name: str,
+    destination: str,
+    headers: dict,
+    destination_center: dict | None,
+    cache_key: str,
+    priority: int,
+):
+    payload = {"textQuery": place_name}
+    if destination_center:
+        payload["locationBias"] = {
+            "circle": {
+                "center": destination_center,
+                "radius": 50000.0
+            }
+        }
+
+    place_lookup_counters["fetches"] += 1
+    place_lookup_counters["searchCalls"] += 1
+    candidates = await _search_text(payload, headers, priority)
+    fallback_key = _canonical_place_key(destination)
+    used_fallback = False
+    if not candidates and destination and place_fallback_policy.should_try(fallback_key):
+        used_fallback = True
+        place_lookup_counters["searchCalls"] += 1
+        candidates = await _search_text(
+            {"textQuery": f"{place_name}, {destination}"},
+            headers,
+            priority
+        )
+
+    result = _pick_place_result(candidates, destination, destination_center)
+    if used_fallback:
+        place_fallback_policy.record(fallback_key, result["found"])
+    _cache_store(place_details_cache, cache_key, result)
+    if PLACE_CATALOG_ENABLED and fallback_key and result["found"]:
+        place_catalog.remember(
+            fallback_key,
+            [_canonical_place_key(place_name), _canonical_place_key(result.get("canonicalName") or "")],
+            result,
         )
+    return result
+
+
+def _pick_place_result(candidates: list[dict], destination: str, destination_center: dict | None) -> dict:
+    if not candidates:
+        return {"found": False}
+
+    best_score, best_place = _rank_candidates(candidates, destination, destination_center)[0]
+    if best_score < 0:
+        return {"found": False}
+    return _to_place_response(best_place)
+
+
+# 장소 사진 프록시. 사진마다 한 번만 받아 디스크 캐시에 두고 이후에는 upstream 호출 없이 응답한다.
+# 브라우저에는 API 키가 들어간 Google URL 대신 /api/photos/{사진 이름} 경로를 준다.
+PHOTO_CACHE_DIR = os.getenv("PHOTO_CACHE_DIR", os.path.join(tempfile.gettempdir(), "triplo-photo-cache"))
+# Cloud Run의 /tmp는 메모리에 잡히므로 예산을 보수적으로 둔다
+PHOTO_CACHE_MAX_BYTES = int(os.getenv("PHOTO_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+# 썸네일 크기. Places media 엔드포인트가 이 크기 이하로 줄여서 준다.
+PHOTO_MAX_PX = 400
+# CDN 등 다른 오리진에서 사진을 서빙할 때의 URL 접두사 (기본은 같은 오리진)
+PHOTO_PUBLIC_BASE_URL = os.getenv("PHOTO_PUBLIC_BASE_URL", "").rstrip("/")
+PHOTO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+_PHOTO_REF_RE = re.compile(r"places/[A-Za-z0-9_-]+/photos/[A-Za-z0-9_-]+")
+_PHOTO_EXTENSIONS = {"image/jpeg": ".jpg", "image/png": ".png", "image/webp": ".webp", "image/gif": ".gif"}
+_PHOTO_CONTENT_TYPES = {ext: content_type for content_type, ext in _PHOTO_EXTENSIONS.items()}
+
+
+def _photo_url(photo_ref: str) -> str:
+    return f"{PHOTO_PUBLIC_BASE_URL}/api/photos/{photo_ref}"
+
+
+class PhotoDiskCache:
+    """사진 이름 -> 디스크 파일. 디렉터리 전체 크기가 예산을 넘으면 가장 오래 쓰지 않은 파일부터 지운다.
+
+    여러 워커 프로세스가 같은 디렉터리를 함께 쓴다. 파일명이 사진 이름의 해시 + 확장자(Content-Type)라 색인 없이
+    디스크에서 바로 찾으므로 메모리에는 해시 -> 파일명 힌트만 둔다. 다른 워커가 지운 파일은 읽을 때
+    FileNotFoundError로 드러나 캐시 미스가 된다. 예산은 실제 디렉터리 크기로 지키고, 사용 순서는 읽을 때
+    갱신하는 mtime으로 판단해 모든 워커가 같은 순서로 지운다.
+    Places 사진 이름은 항상 같은 이미지를 가리키므로 ETag도 해시와 크기로 정한다.
+    파일 읽기/쓰기/삭제는 스레드에서 한다.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._file_names: dict[str, str] = {}
+        self._lock_path = os.path.join(directory, ".lock")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        # 마지막으로 잰 디렉터리 상태 (통계용)
+        files = self._scan()
+        self._files = len(files)
+        self._bytes = sum(size for _, _, size in files)
+
+    @staticmethod
+    def _digest(photo_ref: str) -> str:
+        return hashlib.sha256(photo_ref.encode("utf-8")).hexdigest()[:32]
+
+    @staticmethod
+    def _describe(digest: str, file_name: str, body: bytes) -> tuple[bytes, str, str]:
+        content_type = _PHOTO_CONTENT_TYPES.get(os.path.splitext(file_name)[1], "application/octet-stream")
+        return body, content_type, f'"{digest}-{len(body):x}"'
+
+    async def read(self, photo_ref: str) -> tuple[bytes, str, str] | None:
+        """(본문, Content-Type, ETag). 없으면 None."""
+        digest = self._digest(photo_ref)
+        found = await asyncio.to_thread(self._read_file, digest, self._file_names.get(digest))
+        if found is None:
+            self._file_names.pop(digest, None)
+            self.misses += 1
+            return None
+        file_name, body = found
+        self._file_names[digest] = file_name
+        self.hits += 1
+        return self._describe(digest, file_name, body)
+
+    async def put(self, photo_ref: str, body: bytes, content_type: str) -> tuple[bytes, str, str]:
+        digest = self._digest(photo_ref)
+        file_name = digest + _PHOTO_EXTENSIONS.get(content_type, ".bin")
+        self.evictions += await asyncio.to_thread(self._write_and_evict, file_name, body)
+        self._file_names[digest] = file_name
+        return self._describe(digest, file_name, body)
+
+    def _read_file(self, digest: str, hint: str | None) -> tuple[str, bytes] | None:
+        candidates = [hint] if hint else []
+        candidates += [digest + ext for ext in (*_PHOTO_EXTENSIONS.values(), ".bin") if digest + ext != hint]
+        for file_name in candidates:
+            path = os.path.join(self.directory, file_name)
+            try:
+                with open(path, "rb") as f:
+                    body = f.read()
+            except FileNotFoundError:
+                continue
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return file_name, body
+        return None
 
-        prompt = f"""
-        Current date is February 18, 2026.
-        {tool_instruction}
-
-        Trip context:
-        - Destination: {request.destination}
-        - Month: {request.month} (year 2026)
-        - Duration: {request.days} days
-        - Companions: {request.companions}
-        - Transportation: {request.transportation}
-        - Style: {request.style}
-
-        Rules:
-        1) Exclude permanently closed places.
-        2) Optimize each day's route for nearby spots and realistic movement.
-        3) Return ONLY a valid JSON object. No markdown, no commentary.
-        4) Use exact official place names (disambiguated), e.g., "Helsinki Central Railway Station" not "Central Station".
-        5) Keep each day dense and practical:
-           - 6 to 8 places per day
-           - total activity duration per day: 480 to 660 minutes
-           - avoid long idle gaps
-        6) Ensure temporal flow is natural:
-           - morning: sightseeing/activity/cafe
-           - midday: lunch
-           - afternoon: sightseeing/activity
-           - evening: dinner/night activity
-           - avoid consecutive transport-hub stops (e.g., multiple terminals/pier/stations in a row) unless essential
-           - do not place meal spots back-to-back
-           - for ordinary restaurants/cafes, prioritize options close to the main movement corridor of the day
-           - allow detours only for clearly high-value dining spots (iconic/signature/famous)
-        7) Exclude accommodation and flights completely from the itinerary.
-        8) Avoid duplicate non-hub places across days:
-           - if a restaurant/attraction was already used in a previous day, do not repeat it
-           - exception: transport hubs and repeatable anchor spots are allowed (railway/bus terminals, ferry ports, city center, major shopping district)
-        9) For longer trips (4+ days), diversify by area:
-           - split the destination into multiple neighborhoods/districts
-           - each day should center on a different area as much as possible
-           - avoid itineraries where all days repeatedly stay in the same area
-        10) Follow this schema exactly:
+    def _scan(self) -> list[tuple[float, str, int]]:
+        """(mtime, 파일명, 크기)를 오래된 순으로. 쓰는 중인 임시 파일과 잠금 파일은 뺀다."""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(".") or entry.name.endswith(".tmp"):
+                continue
+            try:
+                if entry.is_file():
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.name, stat.st_size))
+            except FileNotFoundError:
+                continue
+        files.sort()
+        return files
+
+    def _write_and_evict(self, file_name: str, body: bytes) -> int:
+        # 쓰는 도중의 파일을 다른 요청이 읽지 않도록 임시 파일에 쓴 뒤 바꿔 끼운다
+        path = os.path.join(self.directory, file_name)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+
+        # 워커들이 동시에 지우면 같은 파일을 두 번 빼고 세어 예산보다 많이 지우게 되므로 한 번에 하나만 정리한다
+        with _file_lock(self._lock_path):
+            files = self._scan()
+            total = sum(size for _, _, size in files)
+            remaining = len(files)
+            for _, old_name, old_size in files:
+                if total <= self.max_bytes or remaining <= 1:
+                    break
+                if old_name == file_name:
+                    continue
+                try:
+                    os.remove(os.path.join(self.directory, old_name))
+                except FileNotFoundError:
+                    pass
+                total -= old_size
+                remaining -= 1
+            self._files = remaining
+            self._bytes = total
+        return len(files) - remaining
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._files,
+            "bytes": self._bytes,
+            "maxBytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+
+photo_cache = PhotoDiskCache(PHOTO_CACHE_DIR, PHOTO_CACHE_MAX_BYTES)
+photo_flight = SingleFlight("photo")
+
+
+async def _fetch_photo(photo_ref: str) -> tuple[bytes, str, str]:
+    # searchText와 같은 토큰 버킷/재시도를 거친다. bulk 우선순위라 중심 좌표와 대화형 조회가 먼저 토큰을 받는다.
+    http_client = _get_places_http_client()
+    for attempt in range(PLACES_MAX_RETRIES + 1):
+        waited = await places_governor.acquire(PLACES_PRIORITY_BULK)
+        metrics.observe("places_governor_wait_seconds", waited, priority=str(PLACES_PRIORITY_BULK))
+        async with _places_semaphore:
+            response = await http_client.get(
+                f"{PLACES_API_BASE_URL}/{photo_ref}/media",
+                params={"maxHeightPx": PHOTO_MAX_PX, "maxWidthPx": PHOTO_MAX_PX, "key": MAPS_API_KEY},
+                follow_redirects=True,
+            )
+        metrics.inc("upstream_requests_total", upstream="places_photo", status=str(response.status_code))
+        if response.status_code not in PLACES_RETRY_STATUS_CODES or attempt == PLACES_MAX_RETRIES:
+            break
+        metrics.inc("places_retries_total", status=str(response.status_code))
+        await asyncio.sleep(_places_backoff_delay(attempt, response))
+    response.raise_for_status()
+    content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+    if not content_type.startswith("image/"):
+        raise ValueError(f"Unexpected photo content type: {content_type or 'none'}")
+    return await photo_cache.put(photo_ref, response.content, content_type)
+
+
+PLAN_MODEL = "gemini-2.5-flash"
+
+
+def _build_plan_prompt(request: PlanRequest) -> str:
+    tool_instruction = (
+        "Use Google Search tool to verify real-world availability and recency before suggesting places."
+        if request.useWebSearch
+        else "Do not browse the web. Generate a practical and coherent plan quickly."
+    )
+
+    return f"""
+    Current date is February 18, 2026.
+    {tool_instruction}
+
+    Trip context:
+    - Destination: {request.destination}
+    - Month: {request.month} (year 2026)
+    - Duration: {request.days} days
+    - Companions: {request.companions}
+    - Transportation: {request.transportation}
+    - Style: {request.style}
+
+    Rules:
+    1) Exclude permanently closed places.
+    2) Optimize each day's route for nearby spots and realistic movement.
+    3) Return ONLY a valid JSON object. No markdown, no commentary.
+    4) Use exact official place names (disambiguated), e.g., "Helsinki Central Railway Station" not "Central Station".
+    5) Keep each day dense and practical:
+       - 6 to 8 places per day
+       - total activity duration per day: 480 to 660 minutes
+       - avoid long idle gaps
+    6) Ensure temporal flow is natural:
+       - morning: sightseeing/activity/cafe
+       - midday: lunch
+       - afternoon: sightseeing/activity
+       - evening: dinner/night activity
+       - avoid consecutive transport-hub stops (e.g., multiple terminals/pier/stations in a row) unless essential
+       - do not place meal spots back-to-back
+       - for ordinary restaurants/cafes, prioritize options close to the main movement corridor of the day
+       - allow detours only for clearly high-value dining spots (iconic/signature/famous)
+    7) Exclude accommodation and flights completely from the itinerary.
+    8) Avoid duplicate non-hub places across days:
+       - if a restaurant/attraction was already used in a previous day, do not repeat it
+       - exception: transport hubs and repeatable anchor spots are allowed (railway/bus terminals, ferry ports, city center, major shopping district)
+    9) For longer trips (4+ days), diversify by area:
+       - split the destination into multiple neighborhoods/districts
+       - each day should center on a different area as much as possible
+       - avoid itineraries where all days repeatedly stay in the same area
+    10) Follow this schema exactly:
+    {{
+      "title": "string",
+      "days": [
         {{
-          "title": "string",
-          "days": [
+          "dayNumber": 1,
+          "places": [
             {{
-              "dayNumber": 1,
-              "places": [
-                {{
-                  "placeName": "Official place name searchable on Google Maps",
-                  "activityType": "meal|sightseeing|activity",
-                  "description": "Why this matches the trip style",
-                  "durationMin": 90
-                }}
-              ]
+              "placeName": "Official place name searchable on Google Maps",
+              "activityType": "meal|sightseeing|activity",
+              "description": "Why this matches the trip style",
+              "durationMin": 90
             }}
           ]
         }}
+      ]
+    }}
 
-        Ensure the itinerary has exactly {request.days} day entries.
-        """
+    Ensure the itinerary has exactly {request.days} day entries.
+    """
 
-        config = types.GenerateContentConfig(temperature=0.4)
-        if use_web_search:
-            config = types.GenerateContentConfig(
-                tools=[types.Tool(google_search=types.GoogleSearch())],
-                temperature=0.4
-            )
 
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config=config
-        )
+# 부분 재생성 프롬프트에 넣을 "이미 쓴 장소" 이름 수 상한 (긴 일정에서도 프롬프트가 커지지 않게)
+PLAN_EDIT_MAX_AVOID_NAMES = int(os.getenv("PLAN_EDIT_MAX_AVOID_NAMES", "60"))
+# 모델이 이미 일정에 있는 장소를 내놓으면 그 이름을 금지 목록 맨 앞에 넣고 다시 묻는 횟수를 포함한 총 시도 수
+PLAN_EDIT_MAX_ATTEMPTS = max(1, int(os.getenv("PLAN_EDIT_MAX_ATTEMPTS", "2")))
 
-        plan_data = _extract_json_object(response.text or "")
-        normalized_plan = _normalize_plan_schema(
-            plan_data=plan_data,
-            requested_days=request.days,
-            destination=request.destination,
-            style=request.style
+
+def _edit_trip_context(request: PlanEditRequest) -> str:
+    parts = [
+        f"- Destination: {request.destination}",
+        f"- Month: {request.month} (year 2026)" if request.month else "",
+        f"- Companions: {request.companions}" if request.companions else "",
+        f"- Transportation: {request.transportation}" if request.transportation else "",
+        f"- Style: {request.style}" if request.style else "",
+    ]
+    return "\n".join(part for part in parts if part)
+
+
+def _edit_avoid_names(days: list[dict], rejected: list[str] = ()) -> list[str]:
+    # 허브는 다시 써도 되므로 빼고, 표기만 다른 같은 장소는 한 번만 넣는다.
+    # 앞선 시도에서 거절한 이름(rejected)은 상한에 잘리지 않게 맨 앞에 둔다.
+    names = []
+    seen = set()
+    for name in rejected:
+        key = _normalize_place_key(name)
+        if key and key not in seen:
+            seen.add(key)
+            names.append(name)
+    for day in days:
+        for place in day.get("places", []):
+            place_name = (place.get("placeName") or "").strip()
+            key = _normalize_place_key(place_name)
+            if not key or key in seen or _is_repeatable_hub(place_name, place.get("description", "")):
+                continue
+            seen.add(key)
+            names.append(place_name)
+    return names[:PLAN_EDIT_MAX_AVOID_NAMES]
+
+
+def _edit_tool_instruction(use_web_search: bool) -> str:
+    if use_web_search:
+        return "Use Google Search tool to verify the place is open and real."
+    return "Do not browse the web."
+
+
+def _build_day_regenerate_prompt(
+    request: PlanEditRequest, other_days: list[dict], area: str | None, rejected: list[str] = ()
+) -> str:
+    """일자 하나만 다시 만드는 프롬프트. 전체 생성 규칙 대신 이 일자에 필요한 제약만 싣는다."""
+    avoid = _edit_avoid_names(other_days, rejected)
+    lines = [
+        f"Create day {request.dayNumber} of an existing trip itinerary.",
+        _edit_tool_instruction(request.useWebSearch),
+        _edit_trip_context(request),
+        f"Center the day on this area: {area}." if area else "",
+        f"Do not use these places (already in other days): {'; '.join(avoid)}." if avoid else "",
+        f"User request: {request.instruction.strip()}" if request.instruction.strip() else "",
+        "Rules: 6 to 8 real, open places; 480 to 660 minutes in total; morning sightseeing, lunch, "
+        "afternoon sightseeing/activity, dinner; no back-to-back meals; nearby stops in a realistic order; "
+        "no accommodation or flights; exact official Google Maps names.",
+        'Return ONLY JSON: {"places": [{"placeName": "", "activityType": "meal|sightseeing|activity", '
+        '"description": "", "durationMin": 90}]}',
+    ]
+    return "\n".join(line for line in lines if line)
+
+
+def _build_place_replace_prompt(
+    request: PlanEditRequest,
+    target: dict,
+    previous_place: dict | None,
+    next_place: dict | None,
+    avoid_days: list[dict],
+    area: str | None,
+    rejected: list[str] = (),
+) -> str:
+    """장소 하나만 바꾸는 프롬프트. 앞뒤 장소와 일자의 지역만 동선 제약으로 준다."""
+    avoid = _edit_avoid_names(avoid_days, rejected)
+    lines = [
+        f'Suggest one replacement for "{target.get("placeName", "")}" '
+        f'({target.get("activityType", "sightseeing")}, about {target.get("durationMin", 90)} min) '
+        f"on day {request.dayNumber} of an existing trip itinerary.",
+        _edit_tool_instruction(request.useWebSearch),
+        _edit_trip_context(request),
+        f'Previous stop: {previous_place.get("placeName", "")}.' if previous_place else "",
+        f'Next stop: {next_place.get("placeName", "")}.' if next_place else "",
+        f"Day area: {area}." if area else "",
+        f"Do not suggest: {'; '.join(avoid)}." if avoid else "",
+        f"User request: {request.instruction.strip()}" if request.instruction.strip() else "",
+        "Keep the same activity type unless the user request says otherwise. "
+        "It must be real, open, close to the neighbouring stops, not accommodation, with its exact official Google Maps name.",
+        'Return ONLY JSON: {"placeName": "", "activityType": "meal|sightseeing|activity", "description": "", "durationMin": 90}',
+    ]
+    return "\n".join(line for line in lines if line)
+
+
+def _build_generate_config(use_web_search: bool):
+    from google.genai import types
+
+    if use_web_search:
+        return types.GenerateContentConfig(
+            tools=[types.Tool(google_search=types.GoogleSearch())],
+            temperature=0.4
         )
-        return normalized_plan
+    return types.GenerateContentConfig(temperature=0.4)
 
-    except Exception as e:
-        print(f"Error during generation: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/api/get-place-details-batch")
-async def get_place_details_batch(request: PlaceDetailsBatchRequest):
-    if not MAPS_API_KEY:
-        raise HTTPException(status_code=500, detail="API Key missing")
+def _sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {_dump_json(data).decode('utf-8')}\n\n"
+
+
+# 생성 결과 캐시 (opt-in). 정규화 전의 모델 출력(plan_data)을 저장하므로
+# 캐시에서 꺼낸 계획도 매번 _normalize_plan_schema를 그대로 거친다.
+PLAN_CACHE_ENABLED = os.getenv("PLAN_CACHE_ENABLED", "false").lower() in {"1", "true", "yes"}
+PLAN_CACHE_TTL_SEC = int(os.getenv("PLAN_CACHE_TTL_SEC", str(60 * 60 * 6)))
+# 0이면 stale-while-revalidate 비활성. TTL이 지난 뒤 이 시간 동안은 이전 계획을 주면서 백그라운드로 갱신한다.
+PLAN_CACHE_STALE_SEC = int(os.getenv("PLAN_CACHE_STALE_SEC", "0"))
+# 키당 보관할 계획 변형 수. 2 이상이면 요청마다 변형을 돌아가며 준다.
+PLAN_CACHE_VARIANTS = max(1, int(os.getenv("PLAN_CACHE_VARIANTS", "1")))
+PLAN_CACHE_MAX_ENTRIES = int(os.getenv("PLAN_CACHE_MAX_ENTRIES", "2000"))
+PLAN_CACHE_MAX_BYTES = int(os.getenv("PLAN_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+plan_cache = TTLCache(
+    "generated_plan",
+    max_entries=PLAN_CACHE_MAX_ENTRIES,
+    max_bytes=PLAN_CACHE_MAX_BYTES,
+    ttl_sec=PLAN_CACHE_TTL_SEC + PLAN_CACHE_STALE_SEC,
+)
+plan_cache_counters = {"servedStale": 0, "revalidations": 0, "revalidationErrors": 0}
+_revalidating_plan_keys: set[str] = set()
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _spawn_background(coro) -> asyncio.Task:
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def _plan_cache_key(request: PlanRequest) -> str:
+    def canonical(value: str) -> str:
+        return re.sub(r"\s+", " ", (value or "").strip().lower())
+
+    return "|".join([
+        canonical(request.destination),
+        str(request.days),
+        canonical(request.companions),
+        canonical(request.style),
+        canonical(request.transportation),
+        canonical(request.month),
+        "web" if request.useWebSearch else "fast",
+    ])
+
+
+def _lookup_cached_plan(request: PlanRequest) -> dict | None:
+    """캐시된 plan_data를 돌려준다. 새 변형을 만들어야 하거나 캐시가 없으면 None."""
+    if not PLAN_CACHE_ENABLED:
+        return None
+
+    key = _plan_cache_key(request)
+    entry = plan_cache.get(key)
+    if entry is None:
+        return None
+
+    now = time.time()
+    variants = [v for v in entry["variants"] if now - v["createdAt"] <= PLAN_CACHE_TTL_SEC + PLAN_CACHE_STALE_SEC]
+    if len(variants) < PLAN_CACHE_VARIANTS:
+        return None
+
+    variant = variants[entry["next"] % len(variants)]
+    entry["next"] += 1
+    if now - variant["createdAt"] > PLAN_CACHE_TTL_SEC:
+        plan_cache_counters["servedStale"] += 1
+        if key not in _revalidating_plan_keys:
+            _revalidating_plan_keys.add(key)
+            _spawn_background(_revalidate_plan(request, key))
+    return variant["plan"]
+
+
+def _remember_plan(request: PlanRequest, plan_data: dict):
+    if not PLAN_CACHE_ENABLED:
+        return
+
+    key = _plan_cache_key(request)
+    entry = plan_cache.peek(key) or {"variants": [], "next": 0}
+    variants = entry["variants"] + [{"createdAt": time.time(), "plan": plan_data}]
+    # 가장 최근 것부터 PLAN_CACHE_VARIANTS개만 남긴다 (갱신된 계획이 stale 변형을 밀어낸다)
+    variants = sorted(variants, key=lambda v: v["createdAt"])[-PLAN_CACHE_VARIANTS:]
+    plan_cache.set(key, {"variants": variants, "next": entry["next"]})
+
+
+async def _revalidate_plan(request: PlanRequest, key: str):
+    try:
+        # 과부하면 갱신을 건너뛴다 (stale 계획은 계속 나간다)
+        async with _generation_controller(request.useWebSearch).slot():
+            plan_data = await _generate_plan_data(request)
+        _remember_plan(request, plan_data)
+        plan_cache_counters["revalidations"] += 1
+    except Exception as e:
+        plan_cache_counters["revalidationErrors"] += 1
+        print(f"Plan cache revalidation failed: {e}")
+    finally:
+        _revalidating_plan_keys.discard(key)
+
+
+# 생성(Gemini) 호출 입장 제어. 모드(web/fast)마다 동시 실행 상한과 길이 제한이 있는 FIFO 대기열을 둔다.
+# 웹 검색 모드는 호출 하나가 훨씬 길어서 따로 세어, 몰려도 빠른 모드의 자리를 차지하지 않게 한다.
+GENERATION_MAX_CONCURRENCY_FAST = max(1, int(os.getenv("GENERATION_MAX_CONCURRENCY_FAST", "8")))
+GENERATION_MAX_CONCURRENCY_WEB = max(1, int(os.getenv("GENERATION_MAX_CONCURRENCY_WEB", "3")))
+# 모드별 대기열 길이. 가득 차면 바로 503 + Retry-After로 거절한다.
+GENERATION_MAX_QUEUE_FAST = max(0, int(os.getenv("GENERATION_MAX_QUEUE_FAST", "32")))
+GENERATION_MAX_QUEUE_WEB = max(0, int(os.getenv("GENERATION_MAX_QUEUE_WEB", "8")))
+# 생성 지연 EWMA의 초기값(초)과 가중치. Retry-After와 예상 대기 시간 계산에 쓴다.
+GENERATION_INITIAL_LATENCY_SEC_FAST = 15.0
+GENERATION_INITIAL_LATENCY_SEC_WEB = 45.0
+GENERATION_LATENCY_EWMA_ALPHA = 0.2
+# 스트리밍 응답에서 대기 중일 때 `queued` 이벤트를 보내는 간격
+GENERATION_QUEUE_REPORT_SEC = 1.0
+# 백그라운드(계획 일괄 작업) 생성이 한 모드에서 동시에 차지할 수 있는 실행 자리 비율. 나머지는 대화형 요청 몫이다.
+GENERATION_BACKGROUND_SHARE = float(os.getenv("GENERATION_BACKGROUND_SHARE", "0.5"))
+
+
+class GenerationOverloaded(Exception):
+    def __init__(self, mode: str, retry_after_sec: int):
+        super().__init__(f"Generation queue for {mode} mode is full")
+        self.mode = mode
+        self.retry_after_sec = retry_after_sec
+
+
+class AdmissionTicket:
+    """대기열 자리 하나. wait()로 입장을 기다리고, 끝나면 반드시 release()한다 (여러 번 불러도 된다)."""
+
+    def __init__(self, controller: "AdmissionController", future: asyncio.Future | None, background: bool = False):
+        self._controller = controller
+        self._future = future
+        self.background = background
+        self._entered = time.monotonic()
+        self._admitted_at = self._entered if future is None else None
+        self._released = False
+        self.queued_position = self.position
+
+    @property
+    def admitted(self) -> bool:
+        return self._future is None or (self._future.done() and not self._future.cancelled())
+
+    @property
+    def position(self) -> int:
+        return 0 if self.admitted else self._controller._position(self._future, self.background)
+
+    async def wait(self, timeout: float | None = None) -> bool:
+        """입장하면 True, timeout 안에 입장하지 못하면 False."""
+        if not self.admitted:
+            try:
+                await asyncio.wait_for(asyncio.shield(self._future), timeout)
+            except asyncio.TimeoutError:
+                return False
+        if self._admitted_at is None:
+            self._admitted_at = time.monotonic()
+        return True
+
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        if self.admitted:
+            if self._admitted_at is not None:
+                self._controller._observe(time.monotonic() - self._admitted_at)
+            self._controller._release(self.background)
+        else:
+            self._controller._queue(self.background).remove(self._future)
+            self._future.cancel()
+
+    def describe(self) -> dict:
+        return {
+            "mode": self._controller.mode,
+            "position": self.position,
+            "queueLength": len(self._controller._waiters),
+            "etaSec": ceil(self._controller.latency_ewma * ceil(self.position / self._controller.limit)),
+        }
+
+    def headers(self) -> dict:
+        waited = (self._admitted_at or time.monotonic()) - self._entered
+        return {"X-Queue-Position": str(self.queued_position), "X-Queue-Wait-Ms": str(round(waited * 1e3))}
+
+
+class AdmissionController:
+    """동시 실행 상한 limit과 길이 max_queue인 FIFO 대기열.
+
+    자리가 나면 다음 대기자에게 바로 넘겨(active는 그대로) 새로 온 요청이 대기열을 앞지르지 못한다.
+    백그라운드 요청은 따로 줄을 서서 거절당하지 않는 대신, 대화형 대기자가 없을 때만 자리를 받고
+    동시에 background_limit개까지만 실행한다. 그래서 일괄 작업이 몰려도 대화형 대기열과 실행 자리를 다 차지하지 못한다.
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        limit: int,
+        max_queue: int,
+        initial_latency_sec: float,
+        background_limit: int | None = None,
+    ):
+        self.mode = mode
+        self.limit = limit
+        self.max_queue = max_queue
+        self.background_limit = (
+            max(1, int(limit * GENERATION_BACKGROUND_SHARE)) if background_limit is None else background_limit
+        )
+        self.latency_ewma = initial_latency_sec
+        self.active = 0
+        self.background_active = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._background_waiters: deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+
+    def retry_after_sec(self) -> int:
+        # 지금 대기열이 다 빠지는 데 걸릴 예상 시간
+        return max(1, ceil(self.latency_ewma * (len(self._waiters) + 1) / self.limit))
+
+    def enter(self, background: bool = False) -> AdmissionTicket:
+        """background=True면 거절하지 않고 백그라운드 대기열에 줄을 세운다 (계획 일괄 작업용)."""
+        if self.active < self.limit and not self._waiters and (
+            not background or (self.background_active < self.background_limit and not self._background_waiters)
+        ):
+            self.active += 1
+            if background:
+                self.background_active += 1
+            self.admitted += 1
+            metrics.inc("generation_admission_total", mode=self.mode, outcome="admitted")
+            return AdmissionTicket(self, None, background)
+        if not background and len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            metrics.inc("generation_admission_total", mode=self.mode, outcome="rejected")
+            raise GenerationOverloaded(self.mode, self.retry_after_sec())
+        future = asyncio.get_running_loop().create_future()
+        self._queue(background).append(future)
+        self.queued += 1
+        self.admitted += 1
+        metrics.inc("generation_admission_total", mode=self.mode, outcome="queued")
+        return AdmissionTicket(self, future, background)
+
+    @asynccontextmanager
+    async def slot(self, background: bool = False):
+        ticket = self.enter(background)
+        try:
+            await ticket.wait()
+            yield ticket
+        finally:
+            ticket.release()
+
+    def _queue(self, background: bool) -> deque[asyncio.Future]:
+        return self._background_waiters if background else self._waiters
+
+    def _position(self, future: asyncio.Future, background: bool = False) -> int:
+        # 백그라운드 대기자는 대화형 대기자가 모두 들어간 뒤에야 차례가 온다
+        if background:
+            return len(self._waiters) + self._background_waiters.index(future) + 1
+        return self._waiters.index(future) + 1
+
+    def _observe(self, seconds: float):
+        self.latency_ewma += GENERATION_LATENCY_EWMA_ALPHA * (seconds - self.latency_ewma)
+
+    def _release(self, background: bool = False):
+        if background:
+            self.background_active -= 1
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        while self._background_waiters and self.background_active < self.background_limit:
+            future = self._background_waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                self.background_active += 1
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "limit": self.limit,
+            "maxQueue": self.max_queue,
+            "active": self.active,
+            "waiting": len(self._waiters),
+            "backgroundLimit": self.background_limit,
+            "backgroundActive": self.background_active,
+            "backgroundWaiting": len(self._background_waiters),
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "latencyEwmaSec": round(self.latency_ewma, 2),
+            "retryAfterSec": self.retry_after_sec(),
+        }
+
+
+generation_admission = {
+    "fast": AdmissionController(
+        "fast", GENERATION_MAX_CONCURRENCY_FAST, GENERATION_MAX_QUEUE_FAST, GENERATION_INITIAL_LATENCY_SEC_FAST
+    ),
+    "web": AdmissionController(
+        "web", GENERATION_MAX_CONCURRENCY_WEB, GENERATION_MAX_QUEUE_WEB, GENERATION_INITIAL_LATENCY_SEC_WEB
+    ),
+}
+
+
+def _generation_controller(use_web_search: bool) -> AdmissionController:
+    return generation_admission["web" if use_web_search else "fast"]
+
+
+def _overloaded_error(error: GenerationOverloaded) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=f"Too many {error.mode} plan generations in progress. Retry in {error.retry_after_sec}s.",
+        headers={"Retry-After": str(error.retry_after_sec)},
+    )
+
+
+async def _wait_for_generation_slot(ticket: AdmissionTicket):
+    """SSE: 입장할 때까지 대기열 위치를 `queued` 이벤트로 흘려준다."""
+    if not ticket.admitted:
+        yield _sse_event("queued", ticket.describe())
+    while not await ticket.wait(GENERATION_QUEUE_REPORT_SEC):
+        yield _sse_event("queued", ticket.describe())
+
+
+@contextmanager
+def _genai_call(stage: str):
+    with metrics.span(stage):
+        try:
+            yield
+        except Exception:
+            metrics.inc("upstream_requests_total", upstream="genai", status="error")
+            raise
+    metrics.inc("upstream_requests_total", upstream="genai", status="ok")
+
+
+async def _stream_plan_text(request: PlanRequest):
+    """모델 스트림의 텍스트 청크를 흘려준다. 소비자가 청크를 처리하는 시간까지 포함한 스트림 전체가 한 구간이다."""
+    with _genai_call("generate_content_stream"):
+        stream = await client.aio.models.generate_content_stream(
+            model=PLAN_MODEL,
+            contents=_build_plan_prompt(request),
+            config=_build_generate_config(request.useWebSearch)
+        )
+        async for chunk in stream:
+            yield chunk.text or ""
+
+
+async def _generate_json(
+    prompt: str,
+    use_web_search: bool,
+    stage: str = "generate_content",
+    expected_key: str = "days",
+) -> dict:
+    with _genai_call(stage):
+        response = await client.aio.models.generate_content(
+            model=PLAN_MODEL,
+            contents=prompt,
+            config=_build_generate_config(use_web_search)
+        )
+    return _extract_json_object(response.text or "", expected_key)
+
+
+async def _generate_plan_data(request: PlanRequest) -> dict:
+    return await _generate_json(_build_plan_prompt(request), request.useWebSearch)
+
+
+async def _generate_normalized_plan(request: PlanRequest) -> dict:
+    """일괄 작업용. 백그라운드 대기열에 줄을 서서, 대화형 요청보다 늦게 들어가고 거절당하지 않는다."""
+    plan_data = _lookup_cached_plan(request)
+    if plan_data is None:
+        async with _generation_controller(request.useWebSearch).slot(background=True):
+            plan_data = await _generate_plan_data(request)
+        _remember_plan(request, plan_data)
+
+    return _normalize_plan_schema(
+        plan_data=plan_data,
+        requested_days=request.days,
+        destination=request.destination,
+        style=request.style
+    )
+
+
+@app.post("/api/plans/generate")
+@app.post("/api/generate-plan")
+async def generate_plan(request: PlanRequest, http_request: Request):
+    print(f"[Request] {request.destination}, {request.month}, {request.transportation}")
+    _log_request("plan", request.destination)
+
+    if not await _ensure_genai_client():
+        raise HTTPException(status_code=500, detail="Gen AI Client not initialized")
+
+    try:
+        queue_headers = {}
+        plan_data = _lookup_cached_plan(request)
+        if plan_data is None:
+            async with _generation_controller(request.useWebSearch).slot() as ticket:
+                plan_data = await _generate_plan_data(request)
+            queue_headers = ticket.headers()
+            _remember_plan(request, plan_data)
+
+        normalized_plan = _normalize_plan_schema(
+            plan_data=plan_data,
+            requested_days=request.days,
+            destination=request.destination,
+            style=request.style
+        )
+        response = _json_response(normalized_plan, http_request)
+        response.headers.update(queue_headers)
+        return response
+
+    except GenerationOverloaded as e:
+        raise _overloaded_error(e)
+    except Exception as e:
+        print(f"Error during generation: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/plans/generate/stream")
+async def generate_plan_stream(request: PlanRequest):
+    """SSE: 일자가 완성될 때마다 `day` 이벤트, 마지막에 전체 `plan` 이벤트를 보낸다.
+
+    `day` 이벤트는 생성 순서 그대로이고, 지역 다양성 재정렬까지 끝난 최종 결과는 `plan` 이벤트 기준이다.
+    """
+    print(f"[Stream Request] {request.destination}, {request.month}, {request.transportation}")
+    _log_request("plan", request.destination)
+
+    if not await _ensure_genai_client():
+        raise HTTPException(status_code=500, detail="Gen AI Client not initialized")
+
+    # 캐시 적중은 대기열을 거치지 않는다. 거절은 스트림을 열기 전에 503으로 한다.
+    cached_plan_data = _lookup_cached_plan(request)
+    ticket = None
+    if cached_plan_data is None:
+        try:
+            ticket = _generation_controller(request.useWebSearch).enter()
+        except GenerationOverloaded as e:
+            raise _overloaded_error(e)
+
+    async def event_stream():
+        extractor = _JsonStreamExtractor()
+        seen_non_hub: set[str] = set()
+        emitted_days = 0
+        try:
+            if cached_plan_data is not None:
+                normalized_plan = _normalize_plan_schema(
+                    plan_data=cached_plan_data,
+                    requested_days=request.days,
+                    destination=request.destination,
+                    style=request.style
+                )
+                for day in normalized_plan["days"]:
+                    yield _sse_event("day", day)
+                yield _sse_event("plan", normalized_plan)
+                return
+
+            async for event in _wait_for_generation_slot(ticket):
+                yield event
+            async for text in _stream_plan_text(request):
+                for raw_day in extractor.feed(text):
+                    if request.days > 0 and emitted_days >= request.days:
+                        continue
+                    emitted_days += 1
+                    day = _normalize_day(raw_day, emitted_days)
+                    day["dayNumber"] = emitted_days
+                    _de_duplicate_non_hub_places([day], seen_non_hub)
+                    yield _sse_event("day", day)
+            ticket.release()
+
+            plan_data = extractor.result()
+            _remember_plan(request, plan_data)
+            normalized_plan = _normalize_plan_schema(
+                plan_data=plan_data,
+                requested_days=request.days,
+                destination=request.destination,
+                style=request.style
+            )
+            yield _sse_event("plan", normalized_plan)
+        except Exception as e:
+            print(f"Error during streaming generation: {e}")
+            yield _sse_event("error", {"detail": str(e)})
+        finally:
+            if ticket is not None:
+                ticket.release()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # 스트림이 시작되기 전에 연결이 끊겨도 자리를 돌려준다
+        background=BackgroundTask(ticket.release) if ticket is not None else None,
+    )
+
+# 배치 요청은 일정 순서대로 이름을 보내므로 앞쪽(대략 첫째 날 분량)을 먼저 조회한다
+PLACES_INTERACTIVE_HEAD = int(os.getenv("PLACES_INTERACTIVE_HEAD", "8"))
+
+
+def _place_lookup_error(error: Exception) -> dict:
+    """조회 실패를 배치 전체 실패 대신 항목별 결과로 바꾼다. 이 결과는 캐시하지 않는다."""
+    if isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+        detail = "rate_limited" if status == 429 else f"upstream_status_{status}"
+    elif isinstance(error, httpx.TimeoutException):
+        detail = "timeout"
+    else:
+        detail = "upstream_error"
+    return {"found": False, "error": detail}
+
+
+@app.post("/api/get-place-details-batch")
+async def get_place_details_batch(request: PlaceDetailsBatchRequest, http_request: Request):
+    if not MAPS_API_KEY:
+        raise HTTPException(status_code=500, detail="API Key missing")
+
+    loop = asyncio.get_running_loop()
+    deadline = None if request.deadlineMs is None else loop.time() + max(0, request.deadlineMs) / 1000
+    headers = _build_places_headers()
+    destination = (request.destination or "").strip()
+    names = list(dict.fromkeys([name.strip() for name in request.placeNames if name.strip()]))
+    _log_request("places", destination, names)
+    # 표기만 다른 이름("St. Peter's Church" / "st peters church")은 한 번만 조회하고 결과를 나눠 준다
+    name_keys = {name: _canonical_place_key(name) for name in names}
+    representatives: dict[str, str] = {}
+    for name, key in name_keys.items():
+        if key:
+            representatives.setdefault(key, name)
+    priority_count = PLACES_INTERACTIVE_HEAD if request.priorityCount is None else request.priorityCount
+    # 캐시에 있는 이름은 기한과 무관하게 바로 답한다 (deadlineMs가 0이어도 pending으로 남지 않는다)
+    destination_key = _canonical_place_key(destination)
+    by_key: dict[str, dict] = {}
+    for key in representatives:
+        cache_key = _place_details_cache_key(key, destination_key)
+        cached = await _cache_lookup(place_details_cache, cache_key)
+        cache_prewarmer.observe("place", cache_key, bool(cached))
+        if cached:
+            by_key[key] = cached
+    center_task = (
+        asyncio.ensure_future(_resolve_destination_center(destination, headers))
+        if destination and len(by_key) < len(representatives) else None
+    )
+
+    async def resolve(place_name: str, priority: int) -> dict:
+        destination_center = None
+        if center_task is not None:
+            try:
+                destination_center = await asyncio.shield(center_task)
+            except Exception:
+                # 중심 좌표 없이도 조회는 가능하다 (거리 점수만 빠진다)
+                pass
+        try:
+            return await _resolve_place_details(
+                place_name, destination, headers, destination_center, priority, cache_checked=True
+            )
+        except Exception as e:
+            return _place_lookup_error(e)
+
+    # 동시 실행 수와 초당 호출 수는 _search_text에서 제한하므로 전부 한 번에 띄운다
+    lookups = {
+        key: asyncio.ensure_future(resolve(
+            place_name,
+            PLACES_PRIORITY_INTERACTIVE if idx < priority_count else PLACES_PRIORITY_BULK,
+        ))
+        for idx, (key, place_name) in enumerate(representatives.items())
+        if key not in by_key
+    }
+    pending = set()
+    if lookups:
+        timeout = None if deadline is None else max(0.0, deadline - loop.time())
+        _, pending = await asyncio.wait(lookups.values(), timeout=timeout)
+    # 기한을 넘긴 조회는 취소하지 않고 끝까지 돌려 캐시를 채운다. 후속 요청은 캐시나 single-flight로 받는다.
+    for task in pending:
+        _spawn_background(task)
+    if center_task is not None and center_task.done() and not center_task.cancelled() and center_task.exception():
+        print(f"Destination center lookup failed for {destination}: {center_task.exception()}")
+
+    by_key.update({
+        key: {"found": False, "pending": True} if task in pending else task.result()
+        for key, task in lookups.items()
+    })
+    results = {name: by_key.get(key, {"found": False}) for name, key in name_keys.items()}
+    pending_names = [name for name, result in results.items() if result.get("pending")]
+    return _json_response({"results": results, "pending": pending_names}, http_request)
+
+
+@app.get("/api/photos/{photo_ref:path}")
+async def get_place_photo(photo_ref: str, http_request: Request):
+    if not _PHOTO_REF_RE.fullmatch(photo_ref):
+        raise HTTPException(status_code=404, detail="Unknown photo")
+
+    cached = await photo_cache.read(photo_ref)
+    if cached is None:
+        if not MAPS_API_KEY:
+            raise HTTPException(status_code=500, detail="API Key missing")
+        try:
+            cached = await photo_flight.do(photo_ref, lambda: _fetch_photo(photo_ref))
+        except httpx.HTTPStatusError as e:
+            status = 404 if e.response.status_code in {400, 404} else 502
+            raise HTTPException(status_code=status, detail="Photo unavailable")
+        except (httpx.HTTPError, ValueError) as e:
+            print(f"Photo fetch failed for {photo_ref}: {e}")
+            raise HTTPException(status_code=502, detail="Photo unavailable")
+
+    body, content_type, etag = cached
+    headers = {"ETag": etag, "Cache-Control": PHOTO_CACHE_CONTROL}
+    if _if_none_match_hit(http_request.headers.get("if-none-match", ""), {etag}):
+        return Response(status_code=304, headers=headers)
+    # 파일 경로 대신 읽어 둔 본문을 보낸다. 그 사이 다른 워커가 파일을 지워도 응답이 깨지지 않는다.
+    return Response(content=body, media_type=content_type, headers=headers)
+
+
+def _enrich_place(place: dict, details: dict | None) -> dict:
+    """장소 조회 결과를 일정의 장소 항목에 합친다 (클라이언트 Place 타입의 필드명 기준)."""
+    if not details or not details.get("found"):
+        return place
+    location = details.get("location") or {}
+    return {
+        **place,
+        "canonicalName": details.get("canonicalName"),
+        "address": details.get("address"),
+        "rating": details.get("rating"),
+        "userRatingCount": details.get("userRatingCount"),
+        "googlePlaceId": details.get("googlePlaceId"),
+        "location": {"lat": location.get("latitude"), "lng": location.get("longitude")},
+        "photoUrl": details.get("photoUrl"),
+        "hashtags": details.get("hashtags"),
+    }
+
+
+@app.post("/api/plans/generate-and-resolve")
+async def generate_and_resolve_plan(request: PlanRequest):
+    """SSE: 일정 생성과 장소 조회를 겹쳐서 진행하고, 조회까지 끝난 일자부터 `day` 이벤트로 보낸다.
+
+    목적지 중심 좌표 조회는 요청 직후 시작하고, 각 장소 조회는 모델 출력에 그 장소가 완성되는 즉시 시작한다.
+    마지막 `plan` 이벤트는 /api/plans/generate와 같은 정규화를 거친 뒤 장소 정보를 합친 전체 계획이다.
+    """
+    print(f"[Pipelined Request] {request.destination}, {request.month}, {request.transportation}")
+    _log_request("plan", request.destination)
+
+    if not await _ensure_genai_client():
+        raise HTTPException(status_code=500, detail="Gen AI Client not initialized")
+    if not MAPS_API_KEY:
+        raise HTTPException(status_code=500, detail="API Key missing")
+
+    headers = _build_places_headers()
+    destination = request.destination.strip()
+    cached_plan_data = _lookup_cached_plan(request)
+    ticket = None
+    if cached_plan_data is None:
+        try:
+            ticket = _generation_controller(request.useWebSearch).enter()
+        except GenerationOverloaded as e:
+            raise _overloaded_error(e)
+
+    async def event_stream():
+        center_task = asyncio.ensure_future(_resolve_destination_center(destination, headers))
+        lookups: dict[str, asyncio.Task] = {}
+
+        async def resolve(place_name: str, priority: int):
+            try:
+                destination_center = await asyncio.shield(center_task)
+            except Exception:
+                destination_center = None
+            try:
+                return await _resolve_place_details(place_name, destination, headers, destination_center, priority)
+            except Exception as e:
+                print(f"Place lookup failed for {place_name}: {e}")
+                return _place_lookup_error(e)
+
+        def start_lookup(place_name: str, priority: int = PLACES_PRIORITY_BULK):
+            place_name = (place_name or "").strip()
+            key = _canonical_place_key(place_name)
+            if key and key not in lookups:
+                lookups[key] = asyncio.ensure_future(resolve(place_name, priority))
+
+        def on_place(day_index: int, raw_place: dict):
+            # 정규화에서 빠질 숙소/항공 항목은 조회하지 않는다
+            if not _is_excluded_place(raw_place.get("placeName", ""), raw_place.get("description", "")):
+                priority = PLACES_PRIORITY_INTERACTIVE if day_index <= 1 else PLACES_PRIORITY_BULK
+                start_lookup(raw_place.get("placeName", ""), priority)
+
+        async def enrich_day(day: dict) -> dict:
+            for place in day["places"]:
+                start_lookup(place["placeName"])
+            keys = [_canonical_place_key(place["placeName"]) for place in day["places"]]
+            await asyncio.gather(*[lookups[key] for key in keys if key in lookups])
+            return {
+                **day,
+                "places": [
+                    _enrich_place(place, lookups[key].result() if key in lookups else None)
+                    for place, key in zip(day["places"], keys)
+                ],
+            }
+
+        raw_days: asyncio.Queue = asyncio.Queue()
+        extractor = _JsonStreamExtractor(on_place=on_place)
+
+        async def consume_model():
+            try:
+                if cached_plan_data is not None:
+                    extractor.feed(json.dumps(cached_plan_data, ensure_ascii=False))
+                    for raw_day in cached_plan_data.get("days", []):
+                        await raw_days.put(raw_day)
+                    await raw_days.put(None)
+                    return
+
+                async for text in _stream_plan_text(request):
+                    for raw_day in extractor.feed(text):
+                        await raw_days.put(raw_day)
+                ticket.release()
+                _remember_plan(request, extractor.result())
+                await raw_days.put(None)
+            except Exception as e:
+                await raw_days.put(e)
+
+        consumer = None
+        seen_non_hub: set[str] = set()
+        emitted_days = 0
+        try:
+            if ticket is not None:
+                async for event in _wait_for_generation_slot(ticket):
+                    yield event
+            # 모델 스트림 소비는 별도 태스크로 돌려, 앞 일자의 조회를 기다리는 동안에도 생성 결과를 계속 받는다
+            consumer = asyncio.ensure_future(consume_model())
+            while True:
+                item = await raw_days.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                if request.days > 0 and emitted_days >= request.days:
+                    continue
+                emitted_days += 1
+                day = _normalize_day(item, emitted_days)
+                day["dayNumber"] = emitted_days
+                _de_duplicate_non_hub_places([day], seen_non_hub)
+                yield _sse_event("day", await enrich_day(day))
+
+            normalized_plan = _normalize_plan_schema(
+                plan_data=extractor.result(),
+                requested_days=request.days,
+                destination=request.destination,
+                style=request.style
+            )
+            normalized_plan["days"] = [await enrich_day(day) for day in normalized_plan["days"]]
+            _log_request("places", destination, [place["placeName"] for day in normalized_plan["days"] for place in day["places"]])
+            yield _sse_event("plan", normalized_plan)
+        except Exception as e:
+            print(f"Error during pipelined generation: {e}")
+            yield _sse_event("error", {"detail": str(e)})
+        finally:
+            if consumer is not None:
+                consumer.cancel()
+            if ticket is not None:
+                ticket.release()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(ticket.release) if ticket is not None else None,
+    )
+
+def _edit_int_field(value, field: str) -> int:
+    # plan은 검증 없는 dict로 받으므로 숫자 필드가 이상하면 500 대신 400으로 돌려준다
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail=f"{field} must be an integer")
+
+
+def _edit_target_day(request: PlanEditRequest) -> tuple[list[dict], int]:
+    days = request.plan.get("days")
+    if not isinstance(days, list):
+        raise HTTPException(status_code=400, detail="plan.days is required")
+    for day in days:
+        places = day.get("places", []) if isinstance(day, dict) else None
+        if not isinstance(places, list) or not all(
+            isinstance(place, dict)
+            and isinstance(place.get("placeName", ""), str)
+            and isinstance(place.get("description", ""), str)
+            for place in places
+        ):
+            raise HTTPException(status_code=400, detail="plan.days must be objects with a places list of place objects")
+    day_index = next(
+        (
+            idx for idx, day in enumerate(days)
+            if _edit_int_field(day.get("dayNumber", idx + 1), "plan.days[].dayNumber") == request.dayNumber
+        ),
+        None
+    )
+    if day_index is None:
+        raise HTTPException(status_code=400, detail=f"Day {request.dayNumber} not found in plan")
+    return days, day_index
+
+
+async def _resolve_new_places(request: PlanEditRequest, places: list[dict]) -> list[dict]:
+    # 사용자가 보고 있는 화면을 채우는 조회이므로 interactive 우선순위로 보낸다
+    if not request.resolvePlaces or not MAPS_API_KEY or not places:
+        return places
+    headers = _build_places_headers()
+    destination = request.destination.strip()
+    try:
+        destination_center = await _resolve_destination_center(destination, headers)
+    except Exception:
+        destination_center = None
+
+    async def resolve(place: dict) -> dict:
+        try:
+            details = await _resolve_place_details(
+                place["placeName"], destination, headers, destination_center, PLACES_PRIORITY_INTERACTIVE
+            )
+        except Exception as e:
+            print(f"Place lookup failed for {place['placeName']}: {e}")
+            return place
+        return _enrich_place(place, details)
+
+    return list(await asyncio.gather(*[resolve(place) for place in places]))
+
+
+def _edit_collisions(places: list[dict], used_keys: set[str]) -> list[dict]:
+    """used_keys(편집하지 않는 부분에서 이미 쓴 허브가 아닌 장소 키)와 겹치는 새 장소.
+
+    전체 생성의 _de_duplicate_non_hub_places와 달리 일자 길이와 무관하게 보고, 새 장소끼리나
+    기존 장소끼리는 비교하지 않는다.
+    """
+    collisions = []
+    for place in places:
+        place_name = place.get("placeName", "")
+        key = _normalize_place_key(place_name)
+        if key in used_keys and not _is_repeatable_hub(place_name, place.get("description", "")):
+            collisions.append(place)
+    return collisions
+
+
+@app.post("/api/plans/regenerate-day")
+async def regenerate_plan_day(request: DayRegenerateRequest, http_request: Request):
+    """일정에서 dayNumber 일자만 다시 만든다.
+
+    프롬프트에는 다른 일자에서 쓴 장소, 이 일자의 지역만 싣는다. 새 장소가 다른 일자와 겹치면 그 이름을 금지 목록에
+    더해 PLAN_EDIT_MAX_ATTEMPTS까지 다시 묻고, 마지막 시도에서는 겹치는 장소만 빼고 쓴다. 쓸 장소가 하나도 없으면
+    원래 일자를 그대로 돌려준다. 응답은 `{"plan": 전체 계획, "day": 새 일자, "changed": 바뀌었는지}`.
+    """
+    print(f"[Regenerate Day] {request.destination}, day {request.dayNumber}")
+    days, day_index = _edit_target_day(request)
+    if not await _ensure_genai_client():
+        raise HTTPException(status_code=500, detail="Gen AI Client not initialized")
+
+    other_days = days[:day_index] + days[day_index + 1:]
+    used_keys = _non_hub_place_keys(other_days)
+    area = _dominant_area(days[day_index])
+    rejected: list[str] = []
+    day = None
+    try:
+        async with _generation_controller(request.useWebSearch).slot():
+            for attempt in range(PLAN_EDIT_MAX_ATTEMPTS):
+                prompt = _build_day_regenerate_prompt(request, other_days, area, rejected)
+                raw = await _generate_json(prompt, request.useWebSearch, stage="regenerate_day", expected_key="places")
+                raw_day = raw if isinstance(raw.get("places"), list) else next(iter(raw.get("days") or []), {})
+                candidate = _normalize_day({"places": raw_day.get("places") or []}, request.dayNumber)
+                collisions = _edit_collisions(candidate["places"], used_keys)
+                kept = [place for place in candidate["places"] if not any(place is c for c in collisions)]
+                if kept and (not collisions or attempt == PLAN_EDIT_MAX_ATTEMPTS - 1):
+                    for idx, place in enumerate(kept):
+                        place["order"] = idx
+                    day = {**candidate, "places": kept, "dayNumber": request.dayNumber}
+                    break
+                rejected.extend(place["placeName"] for place in collisions)
+    except GenerationOverloaded as e:
+        raise _overloaded_error(e)
+    except Exception as e:
+        print(f"Error during day regeneration: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if day is None:
+        print(f"[Regenerate Day] no usable places after {PLAN_EDIT_MAX_ATTEMPTS} attempts; keeping day {request.dayNumber}")
+        return _json_response({"plan": request.plan, "day": days[day_index], "changed": False}, http_request)
+
+    day["places"] = await _resolve_new_places(request, day["places"])
+    updated_days = list(days)
+    updated_days[day_index] = day
+    return _json_response({"plan": {**request.plan, "days": updated_days}, "day": day, "changed": True}, http_request)
+
+
+@app.post("/api/plans/replace-place")
+async def replace_plan_place(request: PlaceReplaceRequest, http_request: Request):
+    """dayNumber 일자의 placeIndex 장소 하나만 바꾼다.
+
+    프롬프트에는 앞뒤 장소, 일자의 지역, 이미 쓴 장소만 싣는다. 새 장소가 일정의 다른 장소(바꾸는 장소 포함)와
+    겹치면 그 이름을 금지 목록에 더해 PLAN_EDIT_MAX_ATTEMPTS까지 다시 묻고, 끝내 겹치면 원래 장소를 둔다.
+    응답은 `{"plan": 전체 계획, "place": 새 장소 또는 원래 장소, "changed": 바뀌었는지}`.
+    """
+    print(f"[Replace Place] {request.destination}, day {request.dayNumber}, place {request.placeIndex}")
+    days, day_index = _edit_target_day(request)
+    places = days[day_index].get("places") or []
+    place_index = next(
+        (
+            idx for idx, place in enumerate(places)
+            if _edit_int_field(place.get("order", idx), "plan.days[].places[].order") == request.placeIndex
+        ),
+        None
+    )
+    if place_index is None:
+        raise HTTPException(status_code=400, detail=f"Place {request.placeIndex} not found in day {request.dayNumber}")
+    if not await _ensure_genai_client():
+        raise HTTPException(status_code=500, detail="Gen AI Client not initialized")
+
+    target = places[place_index]
+    target_key = _normalize_place_key(target.get("placeName", ""))
+    used_keys = _non_hub_place_keys(
+        days[:day_index] + days[day_index + 1:]
+        + [{"places": [place for idx, place in enumerate(places) if idx != place_index]}]
+    )
+    rejected: list[str] = []
+    replacement = None
+    try:
+        async with _generation_controller(request.useWebSearch).slot():
+            for _ in range(PLAN_EDIT_MAX_ATTEMPTS):
+                prompt = _build_place_replace_prompt(
+                    request,
+                    target,
+                    places[place_index - 1] if place_index > 0 else None,
+                    places[place_index + 1] if place_index + 1 < len(places) else None,
+                    days,
+                    _dominant_area(days[day_index]),
+                    rejected,
+                )
+                raw = await _generate_json(prompt, request.useWebSearch, stage="replace_place", expected_key="placeName")
+                raw_place = raw if raw.get("placeName") else next(iter(raw.get("places") or []), {})
+                normalized = _normalize_day({"places": [raw_place]}, request.dayNumber)["places"]
+                if not normalized or not normalized[0]["placeName"]:
+                    continue
+                candidate = normalized[0]
+                # 바꾸려는 장소를 그대로 다시 제안한 것도 (허브여도) 교체가 아니다
+                if _normalize_place_key(candidate["placeName"]) == target_key or _edit_collisions([candidate], used_keys):
+                    rejected.append(candidate["placeName"])
+                    continue
+                replacement = candidate
+                break
+    except GenerationOverloaded as e:
+        raise _overloaded_error(e)
+    except Exception as e:
+        print(f"Error during place replacement: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if replacement is None:
+        print(f"[Replace Place] no new place after {PLAN_EDIT_MAX_ATTEMPTS} attempts (rejected: {rejected}); keeping it")
+        return _json_response({"plan": request.plan, "place": target, "changed": False}, http_request)
+
+    resolved = (await _resolve_new_places(request, [replacement]))[0]
+    day_places = [resolved if idx == place_index else dict(place) for idx, place in enumerate(places)]
+    for idx, place in enumerate(day_places):
+        place["order"] = idx
+    updated_days = list(days)
+    updated_days[day_index] = {**days[day_index], "places": day_places}
+    return _json_response(
+        {"plan": {**request.plan, "days": updated_days}, "place": resolved, "changed": True}, http_request
+    )
+
+
+# 계획 일괄 생성 작업 (캠페인용 사전 생성). 요청 처리와 분리된 워커가 돌고, 결과는 디스크에 남아 재시작 후 이어서 한다.
+# 재시작과 여러 워커/인스턴스에 걸쳐 이어서 하려면 모든 프로세스가 함께 보는 영속 볼륨이어야 하고, 작업 주인을 정하는 데
+# flock을 쓰므로 POSIX 잠금을 지원해야 한다 (예: Filestore NFS). Cloud Run의 /tmp는 인스턴스와 함께 사라지므로 기본값을 두지
+# 않는다. 비우면 작업 API가 503을 돌려준다.
+PLAN_JOBS_DIR = os.getenv("PLAN_JOBS_DIR", "").strip()
+# 동시에 생성하는 계획 수 = 작업이 쓰는 Gemini 동시 호출 상한
+PLAN_JOB_CONCURRENCY = max(1, int(os.getenv("PLAN_JOB_CONCURRENCY", "2")))
+# 작업이 동시에 보내는 장소 조회 수. 조회는 bulk 우선순위라 대화형 요청이 먼저 Places 토큰을 받는다.
+PLAN_JOB_PLACES_CONCURRENCY = max(1, int(os.getenv("PLAN_JOB_PLACES_CONCURRENCY", "4")))
+PLAN_JOB_MAX_ITEMS = int(os.getenv("PLAN_JOB_MAX_ITEMS", "1000"))
+# 끝나거나 취소된 작업은 마지막 변경 후 이 시간이 지나면 디렉터리째 지운다. 0 이하이면 지우지 않는다.
+PLAN_JOB_RETENTION_SEC = int(os.getenv("PLAN_JOB_RETENTION_SEC", str(60 * 60 * 24 * 7)))
+PLAN_JOB_PRUNE_INTERVAL_SEC = 60 * 10
+# 주인이 죽은 작업을 넘겨받고, 다른 프로세스가 돌리는 작업의 진행 상황과 취소 여부를 디스크에서 다시 읽는 간격
+PLAN_JOB_RESCAN_INTERVAL_SEC = float(os.getenv("PLAN_JOB_RESCAN_INTERVAL_SEC", "30"))
+# GET .../results 한 번에 주는 최대 결과 수
+PLAN_JOB_RESULTS_PAGE = 100
+_PLAN_JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_PLAN_JOB_FINISHED = {"done", "cancelled"}
+
+
+class PlanJob:
+    def __init__(
+        self,
+        job_id: str,
+        requests: list[dict],
+        resolve_places: bool,
+        created_at: float,
+        cancelled: bool = False,
+        updated_at: float | None = None,
+    ):
+        self.id = job_id
+        self.requests = requests
+        self.resolve_places = resolve_places
+        self.created_at = created_at
+        self.updated_at = created_at if updated_at is None else updated_at
+        self.cancelled = cancelled
+        self.completed: set[int] = set()
+        self.failed = 0
+        self.active = 0
+        # results.jsonl의 줄마다 끝 바이트 위치. offset번째 결과부터 읽을 때 파일을 처음부터 훑지 않는다.
+        self.line_ends: list[int] = []
+        # index.jsonl에서 반영한 바이트 수. 남이 돌리는 작업은 여기부터 이어 읽는다.
+        self.index_bytes = 0
+        # owner.lock을 flock으로 잡은 파일. 잡고 있는 프로세스만 항목을 돌리고 결과를 덧붙인다.
+        self.owner_lock = None
+
+    @property
+    def total(self) -> int:
+        return len(self.requests)
+
+    @property
+    def owned(self) -> bool:
+        return self.owner_lock is not None
+
+    @property
+    def status(self) -> str:
+        if len(self.completed) >= self.total:
+            return "done"
+        if self.cancelled:
+            return "cancelled"
+        return "running" if self.active or self.completed else "queued"
+
+    def record(self, result: dict):
+        index = result.get("index")
+        if not isinstance(index, int) or index in self.completed:
+            return
+        self.completed.add(index)
+        if not result.get("ok"):
+            self.failed += 1
+        self.updated_at = max(self.updated_at, result.get("finishedAt", 0))
+
+    def describe(self) -> dict:
+        return {
+            "jobId": self.id,
+            "status": self.status,
+            "total": self.total,
+            "completed": len(self.completed),
+            "succeeded": len(self.completed) - self.failed,
+            "failed": self.failed,
+            "active": self.active,
+            "resolvePlaces": self.resolve_places,
+            "createdAt": self.created_at,
+            "updatedAt": self.updated_at,
+        }
+
+
+class PlanJobManager:
+    """작업마다 디렉터리 하나에 job.json(요청 목록), results.jsonl(끝난 항목, 한 줄에 하나),
+    index.jsonl(결과 줄마다 항목 번호/성공 여부/바이트 위치), owner.lock을 둔다.
+
+    디렉터리는 여러 워커 프로세스와 인스턴스가 함께 쓴다. 작업은 owner.lock을 비차단 flock으로 먼저 잡은 프로세스
+    하나만 돌리고 결과를 덧붙이며, 주인이 죽으면 잠금이 풀려 다음 스캔에서 다른 프로세스가 넘겨받는다. 주인은 넘겨받을 때
+    index.jsonl을 읽어 결과가 없는 항목만 다시 큐에 넣고, 색인에 없는 결과 꼬리를 잘라 낸다. 주인이 아닌 프로세스는
+    같은 색인을 이어 읽어 상태와 결과를 돌려주고, 취소는 job.json에 남겨 주인이 다음 스캔에서 알게 한다.
+    실패한 항목도 오류와 함께 기록되어 다시 돌리지 않는다. 끝난 작업은 PLAN_JOB_RETENTION_SEC 뒤에 지운다.
+    파일 입출력은 스레드에서 한다.
+    """
+
+    def __init__(self, directory: str, concurrency: int, places_concurrency: int, retention_sec: int):
+        self.directory = directory
+        self.concurrency = concurrency
+        self.places_semaphore = asyncio.Semaphore(places_concurrency)
+        self.retention_sec = retention_sec
+        self.jobs: dict[str, PlanJob] = {}
+        self.pruned = 0
+        self.taken_over = 0
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        # 같은 작업의 항목을 여러 워커 태스크가 동시에 덧붙여도 줄 위치가 어긋나지 않게 한다
+        self._write_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory)
+
+    def start(self):
+        self.jobs = {}
+        self._queue = asyncio.Queue()
+        if not self.enabled:
+            return
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._scan_periodically()))
+        if self.retention_sec > 0:
+            self._tasks.append(asyncio.create_task(self._prune_periodically()))
+
+    async def stop(self):
+        # 진행 중이던 항목은 결과 파일에 없으므로 넘겨받는 프로세스(또는 다음 시작)가 다시 돌린다
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        for job in self.jobs.values():
+            self._release(job)
+
+    def _job_dir(self, job_id: str) -> str:
+        return os.path.join(self.directory, job_id)
+
+    async def _scan_periodically(self):
+        while True:
+            try:
+                await self.scan()
+            except OSError as e:
+                print(f"Plan job scan failed: {e}")
+            await asyncio.sleep(PLAN_JOB_RESCAN_INTERVAL_SEC)
+
+    async def scan(self):
+        """디렉터리의 작업을 읽어 들이고, 주인 없는 미완료 작업을 맡아 큐에 넣는다."""
+        job_ids = await asyncio.to_thread(self._list_job_ids)
+        for job_id in job_ids:
+            known = self.jobs.get(job_id)
+            if known is not None and known.status in _PLAN_JOB_FINISHED and not known.owned:
+                continue
+            try:
+                job = await asyncio.to_thread(self._sync_job, job_id, known, True)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Skipping plan job {job_id}: {e}")
+                continue
+            # 읽는 사이에 이 프로세스가 제출했거나 넘겨받은 작업은 그대로 둔다
+            current = self.jobs.get(job_id)
+            if current is not None and current is not known:
+                self._release(job)
+                continue
+            self.jobs[job_id] = job
+            if job.owned and job is not known:
+                if known is not None or job.completed:
+                    self.taken_over += 1
+                    print(f"Resuming plan job {job.id}: {len(job.completed)}/{job.total} done")
+                self._enqueue(job)
+            elif job.owned and job.cancelled and not job.active:
+                self._release(job)
+
+    def _list_job_ids(self) -> list[str]:
+        if not os.path.isdir(self.directory):
+            return []
+        entries = [
+            (entry.stat().st_mtime, entry.name) for entry in os.scandir(self.directory)
+            if entry.is_dir() and _PLAN_JOB_ID_RE.match(entry.name)
+        ]
+        return [name for _, name in sorted(entries)]
+
+    def _read_spec(self, job_id: str) -> dict:
+        with open(os.path.join(self._job_dir(job_id), "job.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def _sync_job(self, job_id: str, job: PlanJob | None, claim: bool) -> PlanJob:
+        """디스크에서 작업 상태를 읽는다. claim이면 주인 없는 미완료 작업을 맡아, 새로 읽은 PlanJob으로 돌려준다.
+
+        이벤트 루프가 보고 있는 job은 이어 읽기만 하고, 상태를 새로 만드는 경우(넘겨받기)에는 다른 객체를 돌려준다.
+        """
+        spec = self._read_spec(job_id)
+        if job is None:
+            job = PlanJob(
+                job_id,
+                spec["requests"],
+                spec.get("resolvePlaces", False),
+                spec.get("createdAt", 0.0),
+                spec.get("cancelled", False),
+                spec.get("updatedAt"),
+            )
+        elif spec.get("cancelled") and not job.cancelled:
+            job.cancelled = True
+            job.updated_at = max(job.updated_at, spec.get("updatedAt") or 0)
+        if job.owned:
+            return job
+
+        self._read_index_tail(job)
+        if not claim or job.status in _PLAN_JOB_FINISHED:
+            return job
+        owned = PlanJob(
+            job_id, job.requests, job.resolve_places, job.created_at, job.cancelled, spec.get("updatedAt")
+        )
+        if not self._claim(owned):
+            return job
+        # 잠금을 잡은 뒤에 다시 읽어야 그 사이 이전 주인이 덧붙인 결과까지 본다
+        self._repair_index(owned)
+        if owned.status in _PLAN_JOB_FINISHED:
+            self._release(owned)
+        return owned
+
+    def _claim(self, job: PlanJob) -> bool:
+        if fcntl is None:
+            # 잠금이 없는 플랫폼(Windows 개발 환경)에서는 한 프로세스만 디렉터리를 쓴다고 본다
+            job.owner_lock = True
+            return True
+        lock_file = open(os.path.join(self._job_dir(job.id), "owner.lock"), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        job.owner_lock = lock_file
+        return True
+
+    @staticmethod
+    def _release(job: PlanJob):
+        if job.owner_lock is not None:
+            if job.owner_lock is not True:
+                job.owner_lock.close()
+            job.owner_lock = None
+
+    def _read_index_tail(self, job: PlanJob):
+        """index.jsonl에서 아직 반영하지 않은 완결된 줄만 읽는다 (주인이 아닌 프로세스용, 파일을 고치지 않는다)."""
+        try:
+            with open(os.path.join(self._job_dir(job.id), "index.jsonl"), "rb") as f:
+                f.seek(job.index_bytes)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        consumed = 0
+        end = job.line_ends[-1] if job.line_ends else 0
+        for line in data.split(b"\n")[:-1]:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                break
+            offset, length = entry.get("offset"), entry.get("length")
+            if offset != end or not isinstance(length, int) or length <= 0:
+                break
+            job.record(entry)
+            end = offset + length
+            job.line_ends.append(end)
+            consumed += len(line) + 1
+        job.index_bytes += consumed
+
+    def _repair_index(self, job: PlanJob):
+        """주인이 된 직후 한 번. 색인을 처음부터 읽고, 어긋난 색인과 색인에 없는 결과 꼬리를 정리한다."""
+        index_path = os.path.join(self._job_dir(job.id), "index.jsonl")
+        results_path = os.path.join(self._job_dir(job.id), "results.jsonl")
+        entries = self._read_jsonl(index_path)
+        rewrite = entries is None
+        if entries is None:
+            # 색인이 없던 예전 작업은 결과 파일을 한 번 훑어 만든다
+            entries = self._index_from_results(results_path)
+
+        end = 0
+        for entry in entries:
+            offset, length = entry.get("offset"), entry.get("length")
+            if offset != end or not isinstance(length, int) or length <= 0:
+                # 색인이 어긋났다. 여기까지만 믿고 색인을 다시 쓴다.
+                rewrite = True
+                break
+            job.record(entry)
+            end = offset + length
+            job.line_ends.append(end)
+        valid = entries[:len(job.line_ends)]
+
+        # 색인에 없는 결과 꼬리(기록 도중 종료)는 잘라 내고, 그 항목은 다시 돈다
+        try:
+            if os.path.getsize(results_path) > end:
+                os.truncate(results_path, end)
+        except FileNotFoundError:
+            pass
+        index_body = b"".join(_dump_json(entry) + b"\n" for entry in valid)
+        if rewrite:
+            tmp_path = f"{index_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(index_body)
+            os.replace(tmp_path, index_path)
+            job.index_bytes = len(index_body)
+        else:
+            job.index_bytes = os.path.getsize(index_path)
+            if job.index_bytes > len(index_body):
+                # 쓰다 만 색인 줄은 잘라 내야 다음 줄이 그 뒤에 붙지 않는다
+                os.truncate(index_path, len(index_body))
+                job.index_bytes = len(index_body)
+
+    @staticmethod
+    def _read_jsonl(path: str) -> list[dict] | None:
+        try:
+            with open(path, "rb") as f:
+                lines = f.read().split(b"\n")
+        except FileNotFoundError:
+            return None
+        entries = []
+        # 마지막 원소는 개행 뒤의 빈 문자열이거나 쓰다 만 줄이다
+        for line in lines[:-1]:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                break
+        return entries
+
+    @staticmethod
+    def _index_from_results(results_path: str) -> list[dict]:
+        entries = []
+        offset = 0
+        try:
+            with open(results_path, "rb") as f:
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        result = json.loads(line)
+                    except ValueError:
+                        break
+                    entries.append({
+                        "index": result.get("index"),
+                        "ok": result.get("ok"),
+                        "finishedAt": result.get("finishedAt", 0),
+                        "offset": offset,
+                        "length": len(line),
+                    })
+                    offset += len(line)
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def _create(self, job: PlanJob):
+        # job.json보다 잠금을 먼저 잡아야 다른 프로세스의 스캔이 새 작업을 주인 없는 작업으로 보지 않는다
+        os.makedirs(self._job_dir(job.id), exist_ok=True)
+        if not self._claim(job):
+            raise OSError(f"could not lock new plan job {job.id}")
+        self._write_spec(job)
+
+    def _write_spec(self, job: PlanJob):
+        job_dir = self._job_dir(job.id)
+        os.makedirs(job_dir, exist_ok=True)
+        spec = {
+            "requests": job.requests,
+            "resolvePlaces": job.resolve_places,
+            "createdAt": job.created_at,
+            "updatedAt": job.updated_at,
+            "cancelled": job.cancelled,
+        }
+        tmp_path = os.path.join(job_dir, f"job.json.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(_dump_json(spec))
+        os.replace(tmp_path, os.path.join(job_dir, "job.json"))
+
+    def _append_result(self, job: PlanJob, result: dict):
+        if not job.owned:
+            # 넘겨받은 뒤 주인이 바뀐 작업에 덧붙이면 두 프로세스의 색인이 어긋난다
+            raise OSError(f"plan job {job.id} is not owned by this process")
+        results_path = os.path.join(self._job_dir(job.id), "results.jsonl")
+        line = _dump_json(result) + b"\n"
+        with self._write_lock:
+            offset = job.line_ends[-1] if job.line_ends else 0
+            entry = {
+                "index": result["index"],
+                "ok": result["ok"],
+                "finishedAt": result["finishedAt"],
+                "offset": offset,
+                "length": len(line),
+            }
+            entry_line = _dump_json(entry) + b"\n"
+            try:
+                with open(results_path, "ab") as f:
+                    f.write(line)
+                with open(os.path.join(self._job_dir(job.id), "index.jsonl"), "ab") as f:
+                    f.write(entry_line)
+            except OSError:
+                # 반쯤 쓴 결과 줄을 지워 다음 줄의 위치가 어긋나지 않게 한다
+                try:
+                    os.truncate(results_path, offset)
+                except OSError:
+                    pass
+                raise
+            job.line_ends.append(offset + len(line))
+            job.index_bytes += len(entry_line)
+
+    def _enqueue(self, job: PlanJob):
+        if job.cancelled:
+            return
+        for index in range(job.total):
+            if index not in job.completed:
+                self._queue.put_nowait((job, index))
+
+    async def get(self, job_id: str) -> PlanJob | None:
+        """이 프로세스가 모르는 작업(다른 인스턴스가 제출한 작업)도 디스크에서 읽어 돌려준다."""
+        if not self.enabled or not _PLAN_JOB_ID_RE.match(job_id):
+            return None
+        job = self.jobs.get(job_id)
+        if job is not None and (job.owned or job.status in _PLAN_JOB_FINISHED):
+            return job
+        try:
+            synced = await asyncio.to_thread(self._sync_job, job_id, job, False)
+        except FileNotFoundError:
+            return job
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Plan job {job_id} could not be read: {e}")
+            return job
+        self.jobs.setdefault(job_id, synced)
+        return self.jobs[job_id]
+
+    async def submit(self, requests: list[dict], resolve_places: bool) -> PlanJob:
+        job = PlanJob(uuid.uuid4().hex, requests, resolve_places, time.time())
+        await asyncio.to_thread(self._create, job)
+        self.jobs[job.id] = job
+        self._enqueue(job)
+        return job
+
+    async def cancel(self, job: PlanJob):
+        # 이미 워커가 잡은 항목은 끝까지 돌고, 큐에 남은 항목은 꺼낼 때 건너뛴다.
+        # 다른 프로세스가 주인이면 job.json을 보고 다음 스캔에서 멈춘다.
+        job.cancelled = True
+        job.updated_at = time.time()
+        await asyncio.to_thread(self._write_spec, job)
+        if job.owned and not job.active:
+            self._release(job)
+
+    async def results(self, job: PlanJob, offset: int, limit: int) -> tuple[list[bytes], int]:
+        """offset번째 결과부터 최대 limit줄과 다음 offset. 그 구간의 바이트만 읽는다."""
+        if not job.owned and len(job.line_ends) < offset + limit:
+            await asyncio.to_thread(self._read_index_tail, job)
+        line_ends = job.line_ends
+        stop = min(len(line_ends), offset + limit)
+        if offset >= stop:
+            return [], len(line_ends)
+        start_byte = line_ends[offset - 1] if offset else 0
+        stop_byte = line_ends[stop - 1]
+
+        def read() -> bytes:
+            with open(os.path.join(self._job_dir(job.id), "results.jsonl"), "rb") as f:
+                f.seek(start_byte)
+                return f.read(stop_byte - start_byte)
+
+        data = await asyncio.to_thread(read)
+        return data.split(b"\n")[:-1], stop
+
+    def _expired(self, job: PlanJob, now: float) -> bool:
+        return (
+            self.retention_sec > 0
+            and job.status in _PLAN_JOB_FINISHED
+            and not job.active
+            and now - job.updated_at > self.retention_sec
+        )
+
+    def _remove_job(self, job: PlanJob) -> bool:
+        # 다른 프로세스가 아직 주인이면(취소 후 마지막 항목을 도는 중) 지우지 않는다
+        if not job.owned and not self._claim(job):
+            return False
+        shutil.rmtree(self._job_dir(job.id), ignore_errors=True)
+        self._release(job)
+        return True
+
+    async def _prune_periodically(self):
+        while True:
+            await asyncio.sleep(PLAN_JOB_PRUNE_INTERVAL_SEC)
+            now = time.time()
+            for job in [job for job in self.jobs.values() if self._expired(job, now)]:
+                if await asyncio.to_thread(self._remove_job, job):
+                    self.jobs.pop(job.id, None)
+                    self.pruned += 1
+
+    async def _worker(self):
+        while True:
+            job, index = await self._queue.get()
+            if job.cancelled or index in job.completed or not job.owned:
+                continue
+            job.active += 1
+            try:
+                result = await self._run_item(job, index)
+                await asyncio.to_thread(self._append_result, job, result)
+                job.record(result)
+            except OSError as e:
+                # 기록하지 못한 항목은 작업을 넘겨받는 프로세스가 다시 돌린다
+                print(f"Plan job {job.id} item {index} could not be saved: {e}")
+            finally:
+                job.active -= 1
+            if job.status in _PLAN_JOB_FINISHED and not job.active:
+                self._release(job)
+
+    async def _run_item(self, job: PlanJob, index: int) -> dict:
+        started = time.perf_counter()
+        try:
+            request = PlanRequest(**job.requests[index])
+            if not await _ensure_genai_client():
+                raise RuntimeError("Gen AI Client not initialized")
+            plan = await _generate_normalized_plan(request)
+            if job.resolve_places and MAPS_API_KEY:
+                plan = await _resolve_job_plan_places(plan, request.destination.strip(), self.places_semaphore)
+            result = {"index": index, "ok": True, "plan": plan}
+        except Exception as e:
+            print(f"Plan job {job.id} item {index} failed: {e}")
+            result = {"index": index, "ok": False, "error": str(e)}
+        result["elapsedMs"] = round((time.perf_counter() - started) * 1e3, 1)
+        result["finishedAt"] = time.time()
+        return result
+
+    def stats(self) -> dict:
+        statuses: dict[str, int] = {}
+        for job in self.jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "enabled": self.enabled,
+            "jobs": len(self.jobs),
+            "owned": sum(job.owned for job in self.jobs.values()),
+            "byStatus": statuses,
+            "queuedItems": self._queue.qsize() if self._queue is not None else 0,
+            "activeItems": sum(job.active for job in self.jobs.values()),
+            "workers": self.concurrency,
+            "retentionSec": self.retention_sec,
+            "pruned": self.pruned,
+            "takenOver": self.taken_over,
+        }
+
+
+plan_jobs = PlanJobManager(PLAN_JOBS_DIR, PLAN_JOB_CONCURRENCY, PLAN_JOB_PLACES_CONCURRENCY, PLAN_JOB_RETENTION_SEC)
+
+
+async def _resolve_job_plan_places(plan: dict, destination: str, semaphore: asyncio.Semaphore) -> dict:
+    headers = _build_places_headers()
+    try:
+        destination_center = await _resolve_destination_center(destination, headers)
+    except Exception:
+        destination_center = None
+
+    async def resolve(place_name: str):
+        async with semaphore:
+            try:
+                return await _resolve_place_details(place_name, destination, headers, destination_center, PLACES_PRIORITY_BULK)
+            except Exception as e:
+                return _place_lookup_error(e)
+
+    lookups: dict[str, asyncio.Task] = {}
+    for day in plan["days"]:
+        for place in day["places"]:
+            key = _canonical_place_key(place["placeName"])
+            if key and key not in lookups:
+                lookups[key] = asyncio.ensure_future(resolve(place["placeName"]))
+    await asyncio.gather(*lookups.values())
+
+    def enrich(place: dict) -> dict:
+        key = _canonical_place_key(place["placeName"])
+        return _enrich_place(place, lookups[key].result() if key in lookups else None)
+
+    return {**plan, "days": [{**day, "places": [enrich(place) for place in day["places"]]} for day in plan["days"]]}
+
+
+def _require_plan_jobs():
+    if not plan_jobs.enabled:
+        raise HTTPException(status_code=503, detail="Plan jobs are disabled (PLAN_JOBS_DIR is not set)")
+
+
+async def _get_plan_job(job_id: str) -> PlanJob:
+    _require_plan_jobs()
+    job = await plan_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.post("/api/plans/jobs", status_code=202)
+async def create_plan_job(request: PlanJobRequest):
+    """계획 여러 개를 백그라운드로 생성한다. 진행 상황은 GET /api/plans/jobs/{jobId}, 결과는 .../results로 받는다."""
+    _require_plan_jobs()
+    if not request.requests:
+        raise HTTPException(status_code=400, detail="requests must not be empty")
+    if len(request.requests) > PLAN_JOB_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {PLAN_JOB_MAX_ITEMS} requests per job")
+    job = await plan_jobs.submit([item.model_dump() for item in request.requests], request.resolvePlaces)
+    print(f"[Plan Job] {job.id}: {job.total} plans")
+    return job.describe()
+
+
+@app.get("/api/plans/jobs/{job_id}")
+async def get_plan_job(job_id: str):
+    return (await _get_plan_job(job_id)).describe()
+
+
+@app.get("/api/plans/jobs/{job_id}/results")
+async def get_plan_job_results(job_id: str, offset: int = 0):
+    """끝난 항목을 끝난 순서대로 JSON Lines로 준다 (`{"index", "ok", "plan" | "error", ...}`).
+
+    한 번에 최대 PLAN_JOB_RESULTS_PAGE개이다. X-Next-Offset 헤더 값을 다음 요청의 offset으로 넘기면
+    이어지는 항목만 받는다.
+    """
+    job = await _get_plan_job(job_id)
+    lines, next_offset = await plan_jobs.results(job, max(0, offset), PLAN_JOB_RESULTS_PAGE)
+    return Response(
+        content=b"".join(line + b"\n" for line in lines),
+        media_type="application/x-ndjson",
+        headers={"X-Next-Offset": str(next_offset), "X-Job-Status": job.status},
+    )
+
+
+@app.delete("/api/plans/jobs/{job_id}")
+async def cancel_plan_job(job_id: str):
+    job = await _get_plan_job(job_id)
+    await plan_jobs.cancel(job)
+    return job.describe()
+
+
+# 요청 로그와 캐시 프리워밍. 배포나 스케일아웃 직후 인기 목적지의 첫 사용자가 콜드 캐시 비용(중심 좌표 + 장소 수십 건)을
+# 치르지 않도록, 지난 요청 로그에서 자주/최근에 나온 목적지와 장소를 골라 시작할 때 백그라운드로 캐시를 채운다.
+# 로그에는 시각, 목적지, 장소 이름만 남긴다. 비우면 기록하지 않는다.
+REQUEST_LOG_PATH = os.getenv("REQUEST_LOG_PATH", "").strip()
+# 넘으면 `{경로}.1`로 한 번 돌린다 (프리워밍은 두 파일을 모두 읽는다)
+REQUEST_LOG_MAX_BYTES = int(os.getenv("REQUEST_LOG_MAX_BYTES", str(64 * 1024 * 1024)))
+REQUEST_LOG_FLUSH_INTERVAL_SEC = 1.0
+
+PREWARM_LOG_PATH = os.getenv("PREWARM_LOG_PATH", REQUEST_LOG_PATH).strip()
+# 프리워밍이 보내는 초당 조회 수 상한. 0 이하이면 프리워밍하지 않는다.
+PREWARM_QPS = float(os.getenv("PREWARM_QPS", "2"))
+# 요청마다 0.5 ** (경과 시간 / 반감기)를 더해 순위를 매긴다. 이보다 오래된 요청은 보지 않는다.
+PREWARM_HALF_LIFE_HOURS = float(os.getenv("PREWARM_HALF_LIFE_HOURS", "72"))
+PREWARM_MAX_AGE_DAYS = float(os.getenv("PREWARM_MAX_AGE_DAYS", "14"))
+PREWARM_MAX_DESTINATIONS = int(os.getenv("PREWARM_MAX_DESTINATIONS", "50"))
+PREWARM_MAX_PLACES = int(os.getenv("PREWARM_MAX_PLACES", "500"))
+# 라이브 요청이 Places 토큰을 기다리거나 동시 호출 슬롯이 다 찼으면 이 간격으로 다시 확인하며 쉰다
+PREWARM_IDLE_POLL_SEC = 0.25
+# 같은 호스트의 uvicorn 워커 중 이 파일을 먼저 잠근 하나만 프리워밍한다. 나머지 워커는 PLACE_CACHE_DB_PATH를
+# 함께 쓰면 영속 캐시에서 채운 항목을 받아 쓴다.
+PREWARM_LOCK_PATH = os.getenv("PREWARM_LOCK_PATH", os.path.join(tempfile.gettempdir(), "triplo-prewarm.lock"))
+
+
+@contextmanager
+def _file_lock(path: str):
+    """워커 프로세스 사이의 배타 잠금. fcntl이 없으면 잠그지 않는다."""
+    if fcntl is None:
+        yield
+        return
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class RequestLog:
+    """요청 요약을 JSONL로 덧붙인다. 쓰기는 전용 스레드가 모아서 하므로 요청 경로에 지연을 더하지 않는다."""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._queue: queue.Queue = queue.Queue()
+        self.records = 0
+        self.write_errors = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._writer = threading.Thread(target=self._write_loop, name="request-log-writer", daemon=True)
+        self._writer.start()
+
+    def record(self, kind: str, destination: str, place_names: list[str] | None = None):
+        entry = {"ts": round(time.time(), 3), "kind": kind, "destination": destination}
+        if place_names:
+            entry["placeNames"] = place_names
+        self._queue.put(entry)
+
+    def close(self):
+        self._queue.put(None)
+        self._writer.join(timeout=5)
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "records": self.records,
+            "writeErrors": self.write_errors,
+            "pendingWrites": self._queue.qsize(),
+        }
+
+    def _write_loop(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = time.monotonic() + REQUEST_LOG_FLUSH_INTERVAL_SEC
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                # 여러 워커 프로세스가 같은 파일을 쓴다. 돌리기와 덧붙이기를 한 잠금 안에서 해서 한 워커가 돌린
+                # 직후 다른 워커가 다시 돌려 .1을 덮어쓰거나, 돌려진 파일에 덧붙이는 일이 없게 한다.
+                with _file_lock(f"{self.path}.lock"):
+                    self._rotate_if_full()
+                    with open(self.path, "ab") as f:
+                        f.write(b"".join(_dump_json(entry) + b"\n" for entry in batch))
+                self.records += len(batch)
+            except OSError as e:
+                self.write_errors += len(batch)
+                print(f"Request log write failed: {e}")
+
+    def _rotate_if_full(self):
+        try:
+            if os.path.getsize(self.path) < self.max_bytes:
+                return
+        except FileNotFoundError:
+            return
+        os.replace(self.path, f"{self.path}.1")
+
+
+request_log: RequestLog | None = None
+if REQUEST_LOG_PATH:
+    try:
+        request_log = RequestLog(REQUEST_LOG_PATH, REQUEST_LOG_MAX_BYTES)
+        print(f"Request log enabled ({REQUEST_LOG_PATH})")
+    except Exception as e:
+        print(f"Request log init failed: {e}")
+
+
+def _log_request(kind: str, destination: str, place_names: list[str] | None = None):
+    destination = (destination or "").strip()
+    if request_log is not None and destination:
+        request_log.record(kind, destination, place_names)
+
+
+def _load_prewarm_targets(path: str, now: float) -> tuple[list[str], list[tuple[str, str]]]:
+    """로그에서 프리워밍할 목적지와 (목적지, 장소 이름)을 점수 높은 순으로 고른다.
+
+    표기만 다른 이름은 _canonical_place_key로 묶어 점수를 합치고, 조회에는 가장 최근 표기를 쓴다.
+    장소는 고른 목적지에 속한 것만 본다.
+    """
+    half_life_sec = PREWARM_HALF_LIFE_HOURS * 3600
+    max_age_sec = PREWARM_MAX_AGE_DAYS * 86400
+    # key -> [점수, 최근 표기]
+    destinations: dict[str, list] = {}
+    places: dict[tuple[str, str], list] = {}
+
+    def bump(scores: dict, key, label: str, weight: float):
+        entry = scores.get(key)
+        if entry is None:
+            scores[key] = [weight, label]
+        else:
+            entry[0] += weight
+            entry[1] = label
+
+    # 돌려 둔 예전 파일부터 읽어 최근 표기가 마지막에 남게 한다
+    for file_path in (f"{path}.1", path):
+        try:
+            f = open(file_path, "rb")
+        except FileNotFoundError:
+            continue
+        with f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    age = now - float(entry["ts"])
+                    destination = str(entry["destination"]).strip()
+                    place_names = entry.get("placeNames") or []
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue
+                destination_key = _canonical_place_key(destination)
+                if not destination_key or age > max_age_sec:
+                    continue
+                weight = 0.5 ** (max(0.0, age) / half_life_sec)
+                bump(destinations, destination_key, destination, weight)
+                for name in place_names:
+                    name_key = _canonical_place_key(name) if isinstance(name, str) else ""
+                    if name_key:
+                        bump(places, (destination_key, name_key), name.strip(), weight)
+
+    def ranked(scores: dict) -> list:
+        return sorted(scores.items(), key=lambda item: item[1][0], reverse=True)
+
+    top_destinations = {key: label for key, (_, label) in ranked(destinations)[:PREWARM_MAX_DESTINATIONS]}
+    top_places = [
+        (top_destinations[destination_key], label)
+        for (destination_key, _), (_, label) in ranked(places)
+        if destination_key in top_destinations
+    ][:PREWARM_MAX_PLACES]
+    return list(top_destinations.values()), top_places
+
+
+class CachePrewarmer:
+    """시작할 때 로그에서 고른 목적지 중심 좌표와 장소를 점수 순으로 한 건씩 조회해 캐시를 채운다.
+
+    조회는 가장 낮은 Places 우선순위로 PREWARM_QPS 이하만 보내고, 라이브 요청이 토큰을 기다리거나
+    동시 호출 슬롯이 다 차 있으면 빌 때까지 쉰다. 채운 키를 기억해 두고 라이브 조회 중 그 항목에 적중한
+    비율(coverage)을 센다. 워커가 여럿이면 lock_path를 잠근 워커만 프리워밍하고 나머지는 "standby"로 남는다.
+    """
+
+    def __init__(self, path: str, qps: float, lock_path: str = PREWARM_LOCK_PATH):
+        self.path = path
+        self.qps = qps
+        self.lock_path = lock_path
+        self._lock_file = None
+        self.status = "idle"
+        self.planned = {"center": 0, "place": 0}
+        self.filled = {"center": 0, "place": 0}
+        self.already_cached = 0
+        self.failed = 0
+        self.deferred = 0
+        self.elapsed_ms: float | None = None
+        # "종류:캐시 키" -> 채운 시각. 캐시 TTL이 지났으면 그 뒤에 다시 조회된 항목이므로 세지 않는다.
+        self._prewarmed: dict[str, float] = {}
+        self._used: set[str] = set()
+        self.lookups = {"center": 0, "place": 0}
+        self.hits = {"center": 0, "place": 0}
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if not self.path or self.qps <= 0 or not MAPS_API_KEY:
+            self.status = "disabled"
+            return
+        if not self._elect():
+            self.status = "standby"
+            return
+        self.status = "loading"
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _elect(self) -> bool:
+        """잠금 파일을 비차단으로 잡아 보고, 잡았으면 프로세스가 멈출 때까지 쥔다.
+
+        잡은 워커가 죽으면 운영체제가 잠금을 풀어 다음에 시작하는 워커가 이어받는다. 잠금 파일을 열 수 없으면
+        선출 없이 프리워밍한다.
+        """
+        if fcntl is None:
+            return True
+        try:
+            lock_file = open(self.lock_path, "a")
+        except OSError as e:
+            print(f"Cache prewarm lock unavailable ({self.lock_path}): {e}")
+            return True
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def observe(self, kind: str, key: str, hit: bool):
+        """라이브 조회 한 건. 프리워밍이 채운 항목에 적중했으면 coverage에 센다."""
+        self.lookups[kind] += 1
+        if not hit:
+            return
+        prewarm_key = f"{kind}:{key}"
+        filled_at = self._prewarmed.get(prewarm_key)
+        if filled_at is None or time.monotonic() - filled_at > PLACE_CACHE_TTL_SEC:
+            return
+        self.hits[kind] += 1
+        self._used.add(prewarm_key)
+        metrics.inc("cache_prewarm_hits_total", cache=kind)
+
+    async def _run(self):
+        started = time.perf_counter()
+        try:
+            destinations, places = await asyncio.to_thread(_load_prewarm_targets, self.path, time.time())
+        except OSError as e:
+            print(f"Cache prewarm could not read {self.path}: {e}")
+            self.status = "failed"
+            return
+        self.planned = {"center": len(destinations), "place": len(places)}
+        self.status = "running"
+
+        headers = _build_places_headers()
+        # 장소 조회가 위치 편향에 쓸 수 있게 중심 좌표부터 채운다
+        for destination in destinations:
+            await self._fill(
+                "center", _canonical_place_key(destination), destination_center_cache,
+                lambda: _resolve_destination_center(destination, headers, PLACES_PRIORITY_PREWARM),
+            )
+        for destination, place_name in places:
+            destination_key = _canonical_place_key(destination)
+            destination_center = destination_center_cache.peek(destination_key)
+            await self._fill(
+                "place", _place_details_cache_key(_canonical_place_key(place_name), destination_key), place_details_cache,
+                lambda: _resolve_place_details(place_name, destination, headers, destination_center, PLACES_PRIORITY_PREWARM),
+            )
+
+        self.status = "done"
+        self.elapsed_ms = round((time.perf_counter() - started) * 1e3, 1)
+        print(
+            f"Cache prewarm done in {self.elapsed_ms / 1e3:.1f}s: "
+            f"{self.filled['center']}/{len(destinations)} centers, {self.filled['place']}/{len(places)} places"
+        )
+
+    async def _fill(self, kind: str, key: str, cache: TTLCache, lookup):
+        if cache.peek(key) is not None:
+            self.already_cached += 1
+            return
+        if places_governor.waiting or _places_semaphore.locked():
+            self.deferred += 1
+            while places_governor.waiting or _places_semaphore.locked():
+                await asyncio.sleep(PREWARM_IDLE_POLL_SEC)
+
+        started = time.monotonic()
+        try:
+            value = await lookup()
+        except Exception as e:
+            self.failed += 1
+            print(f"Cache prewarm lookup failed ({kind} {key}): {e}")
+        else:
+            if value and cache.peek(key) is not None:
+                self.filled[kind] += 1
+                self._prewarmed[f"{kind}:{key}"] = time.monotonic()
+        await asyncio.sleep(max(0.0, 1 / self.qps - (time.monotonic() - started)))
+
+    def stats(self) -> dict:
+        return {
+            "status": self.status,
+            "logPath": self.path,
+            "lockPath": self.lock_path,
+            "qps": self.qps,
+            "planned": self.planned,
+            "filled": self.filled,
+            "alreadyCached": self.already_cached,
+            "failed": self.failed,
+            "deferred": self.deferred,
+            "elapsedMs": self.elapsed_ms,
+            "usedEntries": len(self._used),
+            "coverage": {
+                kind: {
+                    "lookups": self.lookups[kind],
+                    "prewarmedHits": self.hits[kind],
+                    "rate": round(self.hits[kind] / self.lookups[kind], 4) if self.lookups[kind] else 0.0,
+                }
+                for kind in ("center", "place")
+            },
+            "requestLog": request_log.stats() if request_log is not None else None,
+        }
+
+
+cache_prewarmer = CachePrewarmer(PREWARM_LOG_PATH, PREWARM_QPS)
+
+
+@app.post("/api/plans/optimize-route")
+async def optimize_plan_route(request: RouteOptimizeRequest, http_request: Request):
+    days = request.plan.get("days", [])
+    optimized_days = [_optimize_day_route(day, request.placeDetails) for day in days]
+    return _json_response({
+        **request.plan,
+        "days": optimized_days,
+        "totalKm": round(sum(day["route"]["totalKm"] for day in optimized_days), 3),
+    }, http_request)
+
+@app.get("/api/cache/stats")
+def get_cache_stats():
+    return {
+        "placeDetails": place_details_cache.stats(),
+        "destinationCenter": destination_center_cache.stats(),
+        "persistent": place_cache_store.stats() if place_cache_store is not None else None,
+        "generatedPlans": {
+            "enabled": PLAN_CACHE_ENABLED,
+            **plan_cache.stats(),
+            **plan_cache_counters,
+        },
+        "singleFlight": {
+            "placeDetails": place_details_flight.stats(),
+            "destinationCenter": destination_center_flight.stats(),
+        },
+        "placesGovernor": places_governor.stats(),
+        "generationAdmission": {mode: controller.stats() for mode, controller in generation_admission.items()},
+        "placesHedging": {
+            "enabled": PLACES_HEDGE_ENABLED,
+            **places_hedge_counters,
+            **{
+                f"p{round(q * 100)}Ms": round(places_search_latency.quantile(q) * 1e3, 1) if len(places_search_latency) else None
+                for q in (0.5, 0.95, 0.99)
+            },
+        },
+        "planJobs": plan_jobs.stats(),
+        "prewarm": cache_prewarmer.stats(),
+        "photos": {
+            **photo_cache.stats(),
+            "singleFlight": photo_flight.stats(),
+        },
+        "placeLookup": {
+            **place_lookup_counters,
+            "searchCallsPerFetch": (
+                round(place_lookup_counters["searchCalls"] / place_lookup_counters["fetches"], 4)
+                if place_lookup_counters["fetches"] else 0.0
+            ),
+            "fallback": place_fallback_policy.stats(),
+            "catalog": place_catalog.stats(),
+        },
+    }
+
+@app.get("/api/startup-timings")
+def get_startup_timings():
+    """import부터 요청 수신 가능 시점까지의 단계별 소요 시간(ms). warm-up 항목은 끝난 뒤에 채워진다."""
+    return {
+        **startup_timings,
+        "genaiClientReady": client is not None,
+    }
+
+
+@metrics.register_collector
+def _collect_cache_metrics():
+    caches = {
+        "place_details": place_details_cache,
+        "destination_center": destination_center_cache,
+        "generated_plans": plan_cache,
+    }
+    snapshots = {name: cache.stats() for name, cache in caches.items()}
+    flights = {
+        "place_details": place_details_flight.stats(),
+        "destination_center": destination_center_flight.stats(),
+    }
+    yield ("cache_hits_total", "counter", "Cache lookups answered from memory.",
+           [({"cache": name}, stats["hits"]) for name, stats in snapshots.items()])
+    yield ("cache_misses_total", "counter", "Cache lookups not answered from memory.",
+           [({"cache": name}, stats["misses"]) for name, stats in snapshots.items()])
+    yield ("cache_hit_ratio", "gauge", "Cache hit ratio since start.",
+           [({"cache": name}, stats["hitRate"]) for name, stats in snapshots.items()])
+    yield ("cache_entries", "gauge", "Entries currently held in the cache.",
+           [({"cache": name}, stats["entries"]) for name, stats in snapshots.items()])
+    yield ("cache_bytes", "gauge", "Approximate bytes held in the cache.",
+           [({"cache": name}, stats["bytes"]) for name, stats in snapshots.items()])
+    yield ("cache_evictions_total", "counter", "Entries evicted to stay within the cache budget.",
+           [({"cache": name}, stats["evictions"]) for name, stats in snapshots.items()])
+    yield ("singleflight_calls_total", "counter", "Lookups entering single-flight coalescing.",
+           [({"flight": name}, stats["calls"]) for name, stats in flights.items()])
+    yield ("singleflight_coalesced_total", "counter", "Lookups that joined an in-flight upstream call.",
+           [({"flight": name}, stats["coalesced"]) for name, stats in flights.items()])
+
+
+@app.get("/metrics")
+async def get_metrics():
+    # 이벤트 루프에서 렌더링해 지표 갱신과 동시에 딕셔너리를 순회하지 않게 한다
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# 1. React 빌드 결과물 경로 설정 (Dockerfile 구조 기준)
+# catch-all 라우트가 API GET 라우트를 가리지 않도록 모든 라우트를 등록한 뒤 마지막에 둔다.
+# 나중에 Dockerfile에서 client/dist 폴더를 server/static으로 복사할 예정입니다.
+build_dir = os.path.join(os.path.dirname(__file__), "static")
+
+# 시작할 때 빌드 결과물 전체를 메모리 매니페스트로 읽어 두고, 압축 변형도 미리 만들어 둔다.
+# 요청 처리 중에는 디스크 조회나 압축 없이 바이트를 그대로 돌려준다.
+# Vite가 파일명에 해시를 붙이는 assets/ 아래 파일은 내용이 바뀌면 이름도 바뀌므로 immutable로 캐시한다.
+STATIC_IMMUTABLE_PREFIX = "assets/"
+STATIC_IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+STATIC_REVALIDATE_CACHE_CONTROL = "no-cache"
+# 이보다 큰 파일(영상 등)은 메모리에 올리지 않고 디스크에서 보낸다
+STATIC_INMEMORY_MAX_FILE_BYTES = 8 * 1024 * 1024
+STATIC_COMPRESS_MIN_BYTES = 1024
+STATIC_BROTLI_QUALITY = int(os.getenv("STATIC_BROTLI_QUALITY", "9"))
+_COMPRESSIBLE_CONTENT_TYPES = (
+    "text/",
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/xml",
+    "application/wasm",
+    "image/svg+xml",
+)
+
+
+class StaticAsset:
+    """매니페스트 항목. variants는 Content-Encoding -> (본문, ETag)이며 "identity"를 항상 포함한다."""
+
+    __slots__ = ("file_path", "content_type", "cache_control", "compressible", "variants", "etags")
+
+    def __init__(
+        self,
+        file_path: str,
+        content_type: str,
+        cache_control: str,
+        compressible: bool,
+        variants: dict[str, tuple[bytes | None, str]],
+    ):
+        self.file_path = file_path
+        self.content_type = content_type
+        self.cache_control = cache_control
+        self.compressible = compressible
+        self.variants = variants
+        self.etags = {etag for _, etag in variants.values()}
+
+
+def _load_static_asset(file_path: str, relative_path: str) -> StaticAsset:
+    content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+    compressible = content_type.startswith(_COMPRESSIBLE_CONTENT_TYPES)
+    if content_type.startswith("text/") or content_type in {"application/javascript", "application/json"}:
+        content_type += "; charset=utf-8"
+    cache_control = (
+        STATIC_IMMUTABLE_CACHE_CONTROL
+        if relative_path.startswith(STATIC_IMMUTABLE_PREFIX)
+        else STATIC_REVALIDATE_CACHE_CONTROL
+    )
+
+    if os.path.getsize(file_path) > STATIC_INMEMORY_MAX_FILE_BYTES:
+        stat = os.stat(file_path)
+        etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        return StaticAsset(file_path, content_type, cache_control, False, {"identity": (None, etag)})
+
+    with open(file_path, "rb") as f:
+        body = f.read()
+    digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+    compressible = compressible and len(body) >= STATIC_COMPRESS_MIN_BYTES
+    return StaticAsset(file_path, content_type, cache_control, compressible, {"identity": (body, f'"{digest}"')})
+
+
+def _precompress_static_asset(asset: StaticAsset):
+    body, etag = asset.variants["identity"]
+    digest = etag.strip('"')
+    variants = dict(asset.variants)
+    compressed = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressed["br"] = brotli.compress(body, quality=STATIC_BROTLI_QUALITY)
+    for encoding, data in compressed.items():
+        # 거의 줄지 않는 변형은 두지 않는다
+        if len(data) < len(body) * 0.9:
+            variants[encoding] = (data, f'"{digest}-{encoding}"')
+    # 요청 처리 중인 이벤트 루프가 읽고 있으므로 속성 단위로 통째로 바꾼다
+    asset.etags = {etag for _, etag in variants.values()}
+    asset.variants = variants
+
+
+def _precompress_static_manifest():
+    """압축 변형은 시작 경로에서 빼 서버가 뜬 뒤 백그라운드에서 만든다. 그 전까지는 원본을 그대로 보낸다."""
+    started = time.perf_counter()
+    for asset in static_manifest.values():
+        if asset.compressible and len(asset.variants) == 1:
+            _precompress_static_asset(asset)
+    startup_timings["staticPrecompressMs"] = round((time.perf_counter() - started) * 1e3, 1)
+
+
+def _build_static_manifest(root: str) -> dict[str, StaticAsset]:
+    manifest = {}
+    for directory, _, file_names in os.walk(root):
+        for file_name in file_names:
+            file_path = os.path.join(directory, file_name)
+            relative_path = os.path.relpath(file_path, root).replace(os.sep, "/")
+            manifest[relative_path] = _load_static_asset(file_path, relative_path)
+    return manifest
+
+
+def _static_response(asset: StaticAsset, request: Request) -> Response:
+    headers = {"Cache-Control": asset.cache_control}
+    if len(asset.variants) > 1:
+        headers["Vary"] = "Accept-Encoding"
+
+    encoding = "identity"
+    accepted = _accepted_encodings(request.headers.get("accept-encoding", ""))
+    for candidate in ("br", "gzip"):
+        if candidate in asset.variants and candidate in accepted:
+            encoding = candidate
+            break
+    body, etag = asset.variants[encoding]
+    headers["ETag"] = etag
+
+    # 어떤 변형의 ETag든 내용은 같으므로 모두 유효한 검증자로 본다
+    if _if_none_match_hit(request.headers.get("if-none-match", ""), asset.etags):
+        return Response(status_code=304, headers=headers)
+    if body is None:
+        return FileResponse(asset.file_path, media_type=asset.content_type, headers=headers)
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=asset.content_type, headers=headers)
+
+
+# 빌드 폴더가 존재할 때만 실행 (로컬 개발 시 에러 방지)
+static_manifest: dict[str, StaticAsset] = {}
+
+if os.path.isdir(build_dir):
+    _manifest_started = time.perf_counter()
+    static_manifest = _build_static_manifest(build_dir)
+    startup_timings["staticManifestMs"] = round((time.perf_counter() - _manifest_started) * 1e3, 1)
+    print(
+        f"Static manifest: {len(static_manifest)} files, "
+        f"{sum(len(body or b'') for a in static_manifest.values() for body, _ in a.variants.values()) / 1024:.0f} KiB "
+        f"in {startup_timings['staticManifestMs']:.0f} ms"
+    )
+
+    # 2. SPA 라우팅 처리 (새로고침 시 404 방지 -> index.html 반환)
+    @app.api_route("/{full_path:path}", methods=["GET", "HEAD"])
+    async def serve_react_app(full_path: str, request: Request):
+        # API 요청이 아닌 경우 index.html 반환
+        if full_path.startswith("api"):
+            return {"error": "Not Found"}
+
+        asset = static_manifest.get(full_path)
+        if asset is None:
+            # 없는 해시 자산에 index.html을 주면 브라우저가 HTML을 JS로 해석하려다 실패한다
+            if full_path.startswith(STATIC_IMMUTABLE_PREFIX):
+                raise HTTPException(status_code=404, detail="Not Found")
+            asset = static_manifest["index.html"]
+        return _static_response(asset, request)
+else:
+    @app.get("/")
+    def read_root():
+        return {"message": "triplo API is running"}
+startup_timings["moduleLoadMs"] = round((time.perf_counter() - _module_started) * 1e3, 1)
 
-    try:
-        headers = _build_places_headers()
-        destination = (request.destination or "").strip()
-        destination_center = _resolve_destination_center(destination, headers) if destination else None
-        unique_names = list(dict.fromkeys([name.strip() for name in request.placeNames if name.strip()]))
-
-        results = {}
-        for place_name in unique_names:
-            results[place_name] = _resolve_place_details(
-                place_name=place_name,
-                destination=destination,
-                headers=headers,
-                destination_center=destination_center
-            )
 
-        return {"results": results}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
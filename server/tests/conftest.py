@@ -0,0 +1,17 @@
+"""main을 import하기 전에 디스크/외부 서비스를 건드리는 설정을 테스트용 임시 위치로 돌린다.
+
+    cd server && python -m pytest tests
+"""
+import os
+import sys
+import tempfile
+
+_TEST_ROOT = tempfile.mkdtemp(prefix="triplo-tests-")
+os.environ.setdefault("PHOTO_CACHE_DIR", os.path.join(_TEST_ROOT, "photos"))
+os.environ.setdefault("PLAN_JOBS_DIR", os.path.join(_TEST_ROOT, "plan-jobs"))
+os.environ.setdefault("PREWARM_LOCK_PATH", os.path.join(_TEST_ROOT, "prewarm.lock"))
+os.environ["REQUEST_LOG_PATH"] = ""
+os.environ["PLACE_CACHE_DB_PATH"] = ""
+os.environ["GENAI_WARMUP"] = "false"
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+import main
+
+
+def test_admission_is_fifo_and_rejects_when_queue_is_full():
+    async def run():
+        controller = main.AdmissionController("test", limit=1, max_queue=2, initial_latency_sec=1.0)
+        running = controller.enter()
+        queued = [controller.enter(), controller.enter()]
+        with pytest.raises(main.GenerationOverloaded):
+            controller.enter()
+        # 백그라운드 요청은 대화형 대기열이 가득 차도 거절되지 않고 그 뒤에 선다
+        background = controller.enter(background=True)
+        assert [ticket.position for ticket in queued + [background]] == [1, 2, 3]
+        assert controller.stats()["waiting"] == 2
+
+        running.release()
+        assert queued[0].admitted and not queued[1].admitted
+        assert controller.active == 1
+        return controller
+
+    controller = asyncio.run(run())
+    assert controller.stats()["rejected"] == 1
+
+
+def test_released_waiter_gives_up_its_place():
+    async def run():
+        controller = main.AdmissionController("test", limit=1, max_queue=4, initial_latency_sec=1.0)
+        running = controller.enter()
+        leaving, staying = controller.enter(), controller.enter()
+        leaving.release()
+        assert staying.position == 1
+        assert not await staying.wait(timeout=0.01)
+
+        running.release()
+        assert await staying.wait(timeout=0.01)
+        staying.release()
+        return controller
+
+    controller = asyncio.run(run())
+    assert controller.active == 0
+    assert controller.stats()["waiting"] == 0
+
+
+def test_background_work_yields_to_interactive_and_is_capped():
+    async def run():
+        controller = main.AdmissionController("test", limit=2, max_queue=1, initial_latency_sec=1.0, background_limit=1)
+        jobs = [controller.enter(background=True) for _ in range(3)]
+        # 자리가 둘이어도 백그라운드는 하나만 들어가고, 남은 자리는 대화형 요청 몫이다
+        assert [ticket.admitted for ticket in jobs] == [True, False, False]
+        interactive = controller.enter()
+        assert interactive.admitted
+
+        waiting = controller.enter()
+        assert waiting.position == 1 and jobs[1].position == 2
+        jobs[0].release()
+        # 풀린 자리는 먼저 온 백그라운드가 아니라 대화형 대기자에게 간다
+        assert waiting.admitted and not jobs[1].admitted
+
+        interactive.release()
+        assert jobs[1].admitted and not jobs[2].admitted
+        waiting.release()
+        assert not jobs[2].admitted
+        jobs[1].release()
+        assert jobs[2].admitted
+        jobs[2].release()
+        return controller
+
+    controller = asyncio.run(run())
+    stats = controller.stats()
+    assert stats["active"] == 0 and stats["backgroundActive"] == 0
+    assert stats["rejected"] == 0
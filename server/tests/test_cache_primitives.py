@@ -0,0 +1,103 @@
+import asyncio
+
+import main
+
+
+def _cache(**kwargs) -> main.TTLCache:
+    options = {"max_entries": 100, "max_bytes": 1 << 20, "ttl_sec": 60, "negative_ttl_sec": 0}
+    options.update(kwargs)
+    return main.TTLCache("test", **options)
+
+
+def test_ttl_cache_hit_miss_and_expiry():
+    cache = _cache()
+    cache.set("a", {"found": True})
+    cache.set("gone", {"found": True}, ttl_sec=0)
+    cache.set("negative", {"found": False})
+
+    assert cache.get("a") == {"found": True}
+    assert cache.get("gone") is None
+    assert cache.peek("negative") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = _cache(max_entries=2)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    cache.get("a")
+    cache.set("c", {"v": 3})
+
+    assert cache.peek("b") is None
+    assert cache.peek("a") == {"v": 1}
+    assert cache.peek("c") == {"v": 3}
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_cache_respects_byte_budget():
+    value = {"text": "x" * 100}
+    cache = _cache(max_bytes=3 * main._approx_size("k0", value))
+    for i in range(10):
+        cache.set(f"k{i}", value)
+    assert len(cache) == 3
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    async def run():
+        flight = main.SingleFlight("test")
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"value": len(calls)}
+
+        results = await asyncio.gather(*(flight.do("k", fetch) for _ in range(5)))
+        return flight, calls, results
+
+    flight, calls, results = asyncio.run(run())
+    assert len(calls) == 1
+    assert results == [{"value": 1}] * 5
+    assert flight.stats()["coalesced"] == 4
+    assert flight.stats()["inflight"] == 0
+
+
+def test_single_flight_live_callers_do_not_join_background_flights():
+    async def run():
+        flight = main.SingleFlight("test")
+        started = []
+
+        async def fetch(tag):
+            started.append(tag)
+            await asyncio.sleep(0.01)
+            return tag
+
+        background = asyncio.ensure_future(flight.do("k", lambda: fetch("prewarm"), background=True))
+        await asyncio.sleep(0)
+        live = [asyncio.ensure_future(flight.do("k", lambda i=i: fetch(f"live{i}"))) for i in range(2)]
+        await asyncio.sleep(0)
+        late_background = flight.do("k", lambda: fetch("prewarm2"), background=True)
+        return started, await asyncio.gather(background, *live, late_background)
+
+    started, results = asyncio.run(run())
+    assert started == ["prewarm", "live0"]
+    assert results == ["prewarm", "live0", "live0", "live0"]
+
+
+def test_single_flight_keeps_running_when_a_caller_is_cancelled():
+    async def run():
+        flight = main.SingleFlight("test")
+
+        async def fetch():
+            await asyncio.sleep(0.01)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("k", fetch))
+        second = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert asyncio.run(run()) == ("done", True)
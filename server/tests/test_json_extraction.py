@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+import main
+
+
+PLAN = {
+    "title": "Lisbon {classic}",
+    "days": [
+        {"day": 1, "places": [{"placeName": "Belém Tower", "description": "say \"hi\" \\ {not a brace}"}]},
+        {"day": 2, "places": [{"placeName": "Alfama", "description": "[brackets] and : colons"}, {"placeName": "LX Factory"}]},
+    ],
+}
+PLAN_TEXT = json.dumps(PLAN, ensure_ascii=False)
+WRAPPED = f"Sure! Example {{\"a\": 1}} first.\n```json\n{PLAN_TEXT}\n```\nHope {{this}} helps."
+
+
+def _feed_in_chunks(text: str, size: int, on_place=None):
+    extractor = main._JsonStreamExtractor(on_place=on_place)
+    days = []
+    for start in range(0, len(text), size):
+        days.extend(extractor.feed(text[start:start + size]))
+    return extractor, days
+
+
+def test_decode_prefers_object_with_expected_key():
+    assert main._decode_first_json_object(WRAPPED) == PLAN
+
+
+def test_decode_falls_back_to_first_dict():
+    assert main._decode_first_json_object('noise {"a": 1} {"b": 2}', expected_key="days") == {"a": 1}
+    assert main._extract_json_object('x {"placeName": "A"}', expected_key="placeName") == {"placeName": "A"}
+
+
+def test_decode_rejects_text_without_object():
+    with pytest.raises(ValueError):
+        main._extract_json_object("no json here")
+    with pytest.raises(ValueError):
+        main._extract_json_object("   ")
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, len(WRAPPED)])
+def test_stream_extractor_is_chunk_boundary_independent(size):
+    places = []
+    extractor, days = _feed_in_chunks(WRAPPED, size, on_place=lambda day, place: places.append((day, place["placeName"])))
+
+    assert extractor.done
+    assert extractor.result() == PLAN
+    assert days == PLAN["days"]
+    assert places == [(1, "Belém Tower"), (2, "Alfama"), (2, "LX Factory")]
+
+
+def test_stream_extractor_handles_escape_split_across_chunks():
+    text = json.dumps({"days": [{"places": [{"placeName": 'a\\"b'}]}]})
+    split = text.index("\\") + 1
+    extractor = main._JsonStreamExtractor()
+    assert extractor.feed(text[:split]) == []
+    assert extractor.feed(text[split:]) == [{"places": [{"placeName": 'a\\"b'}]}]
+    assert extractor.result()["days"][0]["places"][0]["placeName"] == 'a\\"b'
+
+
+def test_stream_extractor_ignores_text_after_result():
+    extractor, _ = _feed_in_chunks(PLAN_TEXT, 5)
+    assert extractor.feed('{"days": []}') == []
+    assert extractor.result() == PLAN
+
+
+def test_stream_extractor_result_recovers_from_unbalanced_preamble():
+    # 짝 없는 `{` 때문에 구조 추적이 어긋나도 result()는 전체 텍스트에서 계획을 찾는다
+    extractor, _ = _feed_in_chunks("Note: { unbalanced\n" + PLAN_TEXT, 4)
+    assert extractor.result() == PLAN
@@ -0,0 +1,77 @@
+"""_keyword_classifier가 예전 `any(k in text ...)` 검사와 같은 결과를 내는지 고정한다."""
+import random
+
+import pytest
+
+import main
+
+
+def reference_activity_type(value: str) -> str:
+    lowered = (value or "").strip().lower()
+    if lowered in {"meal", "sightseeing", "activity"}:
+        return lowered
+    if any(k in lowered for k in main._MEAL_KEYWORDS):
+        return "meal"
+    if any(k in lowered for k in main._ACTIVITY_KEYWORDS):
+        return "activity"
+    return "sightseeing"
+
+
+def reference_hashtags(text: str) -> list[str]:
+    tags = [tag for tag, keywords in main._HASHTAG_RULES if any(k in text for k in keywords)][:3]
+    return tags or ["#MustVisit"]
+
+
+KEYWORDS = sorted({
+    *main._MEAL_KEYWORDS,
+    *main._ACTIVITY_KEYWORDS,
+    *(k for _, keywords in main._HASHTAG_RULES for k in keywords),
+})
+FILLER = "old town harbour gallery 전통 시장 tram chapel fortress sauna design view".split()
+
+
+def random_texts(count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(0, 12)):
+            roll = rng.random()
+            if roll < 0.15:
+                parts.append(rng.choice(KEYWORDS))
+            elif roll < 0.25:
+                # 단어 경계에 걸친 부분 문자열 (e.g. "bar" + "bakery" -> "arbak")
+                parts.append(rng.choice(KEYWORDS)[1:] + rng.choice(KEYWORDS)[:3])
+            else:
+                parts.append(rng.choice(FILLER))
+        texts.append(" ".join(parts))
+    return texts
+
+
+@pytest.mark.parametrize("text", [
+    "",
+    "cafeteria",
+    "night market food_court",
+    "barbecue pub-crawl",
+    "맛집 체험",
+    "parking garage",
+    "airport 카페",
+])
+def test_known_overlaps(text):
+    assert main._normalize_activity_type(text) == reference_activity_type(text)
+    assert main._hashtags_from_place({"displayName": {"text": text}}) == reference_hashtags(text)
+
+
+def test_random_texts_match_reference():
+    for text in random_texts(5000, seed=11):
+        assert main._normalize_activity_type(text) == reference_activity_type(text), text
+        assert main._hashtags_from_place({"editorialSummary": {"text": text}}) == reference_hashtags(text), text
+
+
+def test_excluded_and_hub_checks():
+    assert main._is_excluded_place("Grand Hotel", "")
+    assert main._is_excluded_place("Incheon", "항공편 체크인")
+    assert not main._is_excluded_place("Hostile Territory Bar", "")
+    assert main._is_repeatable_hub("Central Station", "")
+    assert main._is_repeatable_hub("Ferry pier", "waterfront")
+    assert not main._is_repeatable_hub("Gyeongbokgung", "palace")
@@ -0,0 +1,63 @@
+"""같은 디렉터리를 쓰는 두 워커(PhotoDiskCache 두 개)를 흉내 낸다."""
+import asyncio
+import os
+
+import main
+
+
+def _ref(i: int) -> str:
+    return f"places/p{i}/photos/ph{i}"
+
+
+def _dir_bytes(directory) -> int:
+    return sum(entry.stat().st_size for entry in os.scandir(directory) if not entry.name.startswith("."))
+
+
+def test_workers_share_files_and_one_budget(tmp_path):
+    async def run():
+        first = main.PhotoDiskCache(str(tmp_path), max_bytes=2500)
+        second = main.PhotoDiskCache(str(tmp_path), max_bytes=2500)
+
+        body, content_type, etag = await first.put(_ref(0), b"a" * 1000, "image/jpeg")
+        assert content_type == "image/jpeg"
+        # 다른 워커가 받은 사진도 디스크에서 찾는다
+        assert await second.read(_ref(0)) == (body, content_type, etag)
+
+        await second.put(_ref(1), b"b" * 1000, "image/png")
+        await first.put(_ref(2), b"c" * 1000, "image/webp")
+        return first, second
+
+    first, second = asyncio.run(run())
+    # 두 워커가 각자 예산을 세지 않고 디렉터리 전체로 지킨다
+    assert _dir_bytes(tmp_path) <= 2500
+    assert first.stats()["evictions"] == 1
+
+
+def test_file_removed_by_another_worker_is_a_miss(tmp_path):
+    async def run():
+        first = main.PhotoDiskCache(str(tmp_path), max_bytes=10_000)
+        second = main.PhotoDiskCache(str(tmp_path), max_bytes=1500)
+
+        await first.put(_ref(0), b"a" * 1000, "image/jpeg")
+        assert await first.read(_ref(0)) is not None
+        # second의 예산 정리가 first가 색인해 둔 파일을 지운다
+        await second.put(_ref(1), b"b" * 1000, "image/jpeg")
+        return await first.read(_ref(0)), first.stats()
+
+    cached, stats = asyncio.run(run())
+    assert cached is None
+    assert stats["misses"] == 1
+
+
+def test_read_refreshes_eviction_order(tmp_path):
+    async def run():
+        cache = main.PhotoDiskCache(str(tmp_path), max_bytes=2500)
+        await cache.put(_ref(0), b"a" * 1000, "image/jpeg")
+        await cache.put(_ref(1), b"b" * 1000, "image/jpeg")
+        os.utime(tmp_path / (cache._digest(_ref(1)) + ".jpg"), (1, 1))
+        os.utime(tmp_path / (cache._digest(_ref(0)) + ".jpg"), (2, 2))
+        await cache.read(_ref(1))
+        await cache.put(_ref(2), b"c" * 1000, "image/jpeg")
+        return [await cache.read(_ref(i)) is not None for i in range(3)]
+
+    assert asyncio.run(run()) == [False, True, True]
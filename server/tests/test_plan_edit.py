@@ -0,0 +1,103 @@
+"""일자 재생성/장소 교체의 중복 처리. 모델은 정해 둔 응답을 차례로 돌려주는 가짜 클라이언트로 대신한다."""
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+TRIP = {"destination": "Helsinki", "resolvePlaces": False}
+
+
+class ScriptedModels:
+    def __init__(self, responses: list[dict]):
+        self.responses = list(responses)
+        self.prompts: list[str] = []
+
+    async def generate_content(self, *, model, contents, config=None):
+        self.prompts.append(contents)
+        return SimpleNamespace(text=json.dumps(self.responses.pop(0)))
+
+
+@pytest.fixture
+def scripted(monkeypatch):
+    def install(*responses: dict) -> ScriptedModels:
+        models = ScriptedModels(list(responses))
+        monkeypatch.setattr(main, "client", SimpleNamespace(aio=SimpleNamespace(models=models)))
+        return models
+    return install
+
+
+def _place(name: str, activity_type: str = "sightseeing") -> dict:
+    return {"placeName": name, "activityType": activity_type, "description": "", "durationMin": 60}
+
+
+def _plan() -> dict:
+    return {"days": [
+        {"dayNumber": 1, "places": [_place("Suomenlinna"), _place("Kamppi Chapel")]},
+        {"dayNumber": 2, "places": [_place("Oodi Library"), _place("Temppeliaukio Church")]},
+    ]}
+
+
+def test_regenerate_short_day_drops_places_used_on_other_days(scripted):
+    # 두 장소짜리 짧은 일자여도 다른 일자와 겹치는 장소를 받지 않는다
+    models = scripted(
+        {"places": [_place("Suomenlinna"), _place("Design Museum")]},
+        {"places": [_place("Kamppi Chapel"), _place("Sibelius Monument")]},
+    )
+    response = TestClient(main.app).post("/api/plans/regenerate-day", json={"plan": _plan(), "dayNumber": 2, **TRIP})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["changed"] is True
+    assert [place["placeName"] for place in body["day"]["places"]] == ["Sibelius Monument"]
+    assert "Suomenlinna" in models.prompts[1].split("Do not use these places")[1]
+
+
+def test_regenerate_day_keeps_original_when_nothing_usable(scripted):
+    scripted({"places": [_place("Suomenlinna")]}, {"places": []})
+    plan = _plan()
+    response = TestClient(main.app).post("/api/plans/regenerate-day", json={"plan": plan, "dayNumber": 2, **TRIP})
+
+    assert response.status_code == 200
+    assert response.json() == {"plan": plan, "day": plan["days"][1], "changed": False}
+
+
+def test_replace_place_retries_after_collision(scripted):
+    models = scripted(_place("Oodi Library"), _place("Design Museum"))
+    response = TestClient(main.app).post(
+        "/api/plans/replace-place", json={"plan": _plan(), "dayNumber": 1, "placeIndex": 1, **TRIP}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["changed"] is True
+    assert [place["placeName"] for place in body["plan"]["days"][0]["places"]] == ["Suomenlinna", "Design Museum"]
+    assert len(models.prompts) == 2
+    assert "Do not suggest: Oodi Library;" in models.prompts[1]
+
+
+def test_replace_place_ignores_existing_duplicates_in_the_day(scripted):
+    # 일자에 원래 같은 키의 장소가 둘 있어도 새 장소와 무관하면 건드리지 않는다
+    plan = _plan()
+    plan["days"][0]["places"] = [_place("Market Square"), _place("Market  square!"), _place("Kamppi Chapel")]
+    scripted(_place("Design Museum"))
+    response = TestClient(main.app).post(
+        "/api/plans/replace-place", json={"plan": plan, "dayNumber": 1, "placeIndex": 2, **TRIP}
+    )
+
+    assert response.status_code == 200
+    names = [place["placeName"] for place in response.json()["plan"]["days"][0]["places"]]
+    assert names == ["Market Square", "Market  square!", "Design Museum"]
+
+
+def test_replace_place_keeps_original_after_repeated_collisions(scripted):
+    scripted(_place("Kamppi Chapel"), _place("Temppeliaukio Church"))
+    plan = _plan()
+    response = TestClient(main.app).post(
+        "/api/plans/replace-place", json={"plan": plan, "dayNumber": 1, "placeIndex": 1, **TRIP}
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"plan": plan, "place": plan["days"][0]["places"][1], "changed": False}
@@ -0,0 +1,155 @@
+"""PlanJobManager 여러 개가 같은 PLAN_JOBS_DIR을 쓰는 경우 (재시작, 여러 워커/인스턴스)를 흉내 낸다."""
+import asyncio
+import json
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+def _manager(directory) -> main.PlanJobManager:
+    return main.PlanJobManager(str(directory), concurrency=2, places_concurrency=1, retention_sec=0)
+
+
+def _script(manager, ran: list, gate: asyncio.Event | None = None, open_items: int = 0):
+    """항목 번호만 돌려주는 _run_item. gate가 있으면 open_items번 이후 항목은 gate가 열릴 때까지 멈춘다."""
+    async def run_item(job, index):
+        if gate is not None and index >= open_items:
+            await gate.wait()
+        ran.append(index)
+        return {"index": index, "ok": True, "plan": {"n": index}, "finishedAt": time.time()}
+
+    manager._run_item = run_item
+
+
+async def _until(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+async def _all_results(manager, job, page: int) -> list[dict]:
+    results, offset = [], 0
+    while True:
+        lines, offset = await manager.results(job, offset, page)
+        if not lines:
+            return results
+        results.extend(json.loads(line) for line in lines)
+
+
+def test_restart_resumes_only_missing_items(tmp_path):
+    async def run():
+        first, first_ran = _manager(tmp_path), []
+        _script(first, first_ran, asyncio.Event(), open_items=2)
+        first.start()
+        job = await first.submit([{}] * 5, False)
+        await _until(lambda: len(job.completed) == 2)
+        await first.stop()
+
+        # 기록 도중 종료된 것처럼 결과와 색인 끝에 쓰다 만 줄을 남긴다
+        job_dir = tmp_path / job.id
+        with open(job_dir / "results.jsonl", "ab") as f:
+            f.write(b'{"index": 4, "ok": tr')
+        with open(job_dir / "index.jsonl", "ab") as f:
+            f.write(b'{"index": 4')
+
+        second, second_ran = _manager(tmp_path), []
+        _script(second, second_ran)
+        second.start()
+        await _until(lambda: job.id in second.jobs and second.jobs[job.id].status == "done")
+        resumed = second.jobs[job.id]
+        results = await _all_results(second, resumed, page=2)
+        await second.stop()
+        return sorted(first_ran), sorted(second_ran), resumed, results
+
+    first_ran, second_ran, resumed, results = asyncio.run(run())
+    assert first_ran == [0, 1]
+    assert second_ran == [2, 3, 4]
+    assert not resumed.owned
+    assert sorted(result["index"] for result in results) == [0, 1, 2, 3, 4]
+
+
+def test_results_pages_follow_the_index(tmp_path):
+    async def run():
+        manager = _manager(tmp_path)
+        _script(manager, [])
+        manager.start()
+        job = await manager.submit([{}] * 7, False)
+        await _until(lambda: job.status == "done")
+        pages = [await manager.results(job, offset, 3) for offset in (0, 3, 6, 7)]
+        await manager.stop()
+        return job, pages
+
+    job, pages = asyncio.run(run())
+    assert [next_offset for _, next_offset in pages] == [3, 6, 7, 7]
+    assert [len(lines) for lines, _ in pages] == [3, 3, 1, 0]
+    indexes = [json.loads(line)["index"] for lines, _ in pages for line in lines]
+    assert sorted(indexes) == list(range(7))
+    assert len(job.line_ends) == 7
+
+
+def test_only_the_owner_runs_a_shared_job(tmp_path):
+    async def run():
+        gate = asyncio.Event()
+        owner, owner_ran = _manager(tmp_path), []
+        other, other_ran = _manager(tmp_path), []
+        _script(owner, owner_ran, gate, open_items=1)
+        _script(other, other_ran)
+        owner.start()
+        other.start()
+        job = await owner.submit([{}] * 3, False)
+        await _until(lambda: len(job.completed) == 1)
+
+        # 다른 인스턴스는 스캔해도 잠금을 못 잡아 돌리지 않고, 디스크에서 진행 상황을 읽는다
+        await other.scan()
+        seen = await other.get(job.id)
+        seen_completed = len(seen.completed)
+        gate.set()
+        await _until(lambda: job.status == "done")
+        seen = await other.get(job.id)
+        results = await _all_results(other, seen, page=2)
+        await owner.stop()
+        await other.stop()
+        return owner_ran, other_ran, seen, seen_completed, results
+
+    owner_ran, other_ran, seen, seen_completed, results = asyncio.run(run())
+    assert sorted(owner_ran) == [0, 1, 2]
+    assert other_ran == []
+    assert seen_completed == 1
+    assert seen.status == "done" and not seen.owned
+    assert sorted(result["index"] for result in results) == [0, 1, 2]
+
+
+def test_cancel_on_another_instance_stops_the_owner(tmp_path):
+    async def run():
+        gate = asyncio.Event()
+        owner, owner_ran = _manager(tmp_path), []
+        other = _manager(tmp_path)
+        _script(owner, owner_ran, gate, open_items=1)
+        owner.concurrency = 1
+        owner.start()
+        other.start()
+        job = await owner.submit([{}] * 4, False)
+        await _until(lambda: len(job.completed) == 1)
+
+        await other.cancel(await other.get(job.id))
+        await owner.scan()
+        gate.set()
+        await _until(lambda: not job.active and not job.owned)
+        await owner.stop()
+        await other.stop()
+        return owner_ran, job
+
+    owner_ran, job = asyncio.run(run())
+    assert job.status == "cancelled"
+    # 취소를 알기 전에 워커가 잡고 있던 항목 하나만 끝까지 돈다
+    assert sorted(owner_ran) == [0, 1]
+
+
+def test_jobs_api_is_disabled_without_a_directory(monkeypatch):
+    monkeypatch.setattr(main, "plan_jobs", main.PlanJobManager("", 1, 1, 0))
+    client = TestClient(main.app)
+    assert client.get("/api/plans/jobs/" + "0" * 32).status_code == 503
+    assert client.post("/api/plans/jobs", json={"requests": []}).status_code == 503
@@ -0,0 +1,64 @@
+import itertools
+import math
+import random
+
+import main
+
+
+def _distances(points):
+    lat, lng = zip(*points)
+    return main._haversine_matrix_km(lat, lng).tolist()
+
+
+def test_haversine_matrix_matches_scalar_formula():
+    points = [(37.5665, 126.978), (35.1796, 129.0756), (33.4996, 126.5312)]
+    dist = _distances(points)
+    for (i, a), (j, b) in itertools.product(enumerate(points), repeat=2):
+        assert math.isclose(dist[i][j], main._haversine_km(*a, *b), abs_tol=1e-6)
+
+
+def test_optimize_route_keeps_start_and_fixed_slots():
+    rng = random.Random(7)
+    points = [(rng.uniform(37.4, 37.7), rng.uniform(126.8, 127.1)) for _ in range(8)]
+    dist = _distances(points)
+    fixed = [False, False, False, True, False, False, True, False]
+
+    route = main._optimize_route(dist, fixed)
+
+    assert sorted(route) == list(range(8))
+    assert route[0] == 0
+    assert route[3] == 3 and route[6] == 6
+    assert main._route_length(route, dist) <= main._route_length(list(range(8)), dist) + 1e-9
+
+
+def test_optimize_route_finds_optimum_for_small_days():
+    rng = random.Random(3)
+    for _ in range(20):
+        points = [(rng.uniform(0, 1), rng.uniform(0, 1)) for _ in range(6)]
+        dist = _distances(points)
+        best = min(
+            main._route_length([0, *rest], dist) for rest in itertools.permutations(range(1, 6))
+        )
+        route = main._optimize_route(dist, [False] * 6)
+        # nearest-neighbour + 2-opt는 휴리스틱이다. 작은 문제에서는 최적에서 크게 벗어나지 않아야 한다.
+        assert main._route_length(route, dist) <= best * 1.1 + 1e-9
+
+
+def test_optimize_day_route_leaves_meals_and_unresolved_places_in_place():
+    day = {
+        "day": 1,
+        "places": [
+            {"placeName": "A", "location": {"lat": 0.0, "lng": 0.0}},
+            {"placeName": "Far", "location": {"lat": 0.0, "lng": 0.3}},
+            {"placeName": "Lunch", "activityType": "meal", "location": {"lat": 0.0, "lng": 0.2}},
+            {"placeName": "Unknown"},
+            {"placeName": "Near", "location": {"lat": 0.0, "lng": 0.1}},
+        ],
+    }
+    optimized = main._optimize_day_route(day, {})
+
+    names = [place["placeName"] for place in optimized["places"]]
+    assert names[2] == "Lunch" and names[3] == "Unknown"
+    assert names == ["A", "Near", "Lunch", "Unknown", "Far"]
+    assert [place["order"] for place in optimized["places"]] == list(range(5))
+    assert optimized["route"]["totalKm"] <= optimized["route"]["originalTotalKm"]
@@ -0,0 +1,76 @@
+"""콜드 스타트 경로에 무거운 작업이 다시 들어오지 않는지 확인한다.
+
+시간을 재는 대신 결과로 검사한다: import만으로는 Gen AI 클라이언트와 numpy를 불러오지 않고,
+정적 파일 압축 변형도 만들지 않는다. 실제 시간은 bench/cold_start.py로 잰다.
+"""
+import json
+import os
+import subprocess
+import sys
+
+import main
+
+SERVER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+_PROBE = """
+import json, sys
+import main
+print(json.dumps({
+    "client": main.client is not None,
+    "failures": main._genai_client_failures,
+    "modules": sorted(m for m in ("google.genai", "numpy") if m in sys.modules),
+    "precompressed": sum(len(asset.variants) > 1 for asset in main.static_manifest.values()),
+}))
+"""
+
+
+def test_import_defers_heavy_startup_work():
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE], cwd=SERVER_DIR, env=dict(os.environ),
+        capture_output=True, text=True, check=True, timeout=60,
+    )
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    assert probe == {"client": False, "failures": 0, "modules": [], "precompressed": 0}
+
+
+def test_static_manifest_keeps_only_identity_until_precompressed(tmp_path):
+    (tmp_path / "index.html").write_text("<html>" + "x" * 4096 + "</html>")
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "app.js").write_text("console.log(1);" * 200)
+
+    manifest = main._build_static_manifest(str(tmp_path))
+    assert {path: list(asset.variants) for path, asset in manifest.items()} == {
+        "index.html": ["identity"],
+        "assets/app.js": ["identity"],
+    }
+
+    for asset in manifest.values():
+        main._precompress_static_asset(asset)
+    assert "gzip" in manifest["assets/app.js"].variants
+
+
+def test_genai_client_init_retries_after_backoff(monkeypatch):
+    attempts = []
+    created = object()
+
+    def create():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("metadata server unavailable")
+        return created
+
+    monkeypatch.setattr(main, "client", None)
+    monkeypatch.setattr(main, "_genai_client_failures", 0)
+    monkeypatch.setattr(main, "_genai_client_next_attempt_at", 0.0)
+    monkeypatch.setattr(main, "_create_genai_client", create)
+
+    assert main._get_genai_client() is None
+    # 백오프 중에는 다시 만들지 않는다
+    assert main._get_genai_client() is None
+    assert len(attempts) == 1
+    assert main._genai_client_next_attempt_at > 0
+
+    monkeypatch.setattr(main, "_genai_client_next_attempt_at", 0.0)
+    assert main._get_genai_client() is created
+    assert main._genai_client_failures == 0
+    assert len(attempts) == 2